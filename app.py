@@ -1,6 +1,11 @@
+from scripts.startup import startup
+
+import argparse
+import functools
 import pygame
 import sys
 import math
+import numpy as np
 
 
 from scripts.engine import Engine
@@ -10,8 +15,19 @@ from scripts.bounce import Bounce
 from scripts.wind import Wind
 from scripts.logger import get_logger_info
 from scripts.ar import AR
+from scripts.tracking import MAX_NUM_HANDS, create_hands
+from scripts.hand_collision import HandCollider
+from scripts.simulation import Simulation, FixedStepper
+from scripts.snapshots import SnapshotRing
+from scripts.recording import LandmarkRecorder, ReplaySource
+from scripts.profiler import profiler
+from scripts.text_cache import text_cache, get_font
 
 INDEX_TIP_IDX   = 8
+REPLAY_SPEED    = 0.25    # slow-motion factor when rewinding (R in simulation mode)
+SEEK_SECONDS    = 1.0     # left / right arrow jump while replaying
+
+startup.mark("imports")
 
 class Slider:
     def __init__(self, s_type="", pos=[0,0], size=[10, 10], inc=0.01, max_val=1):
@@ -30,10 +46,12 @@ class Slider:
     def rect(self):
         return pygame.Rect(*self.pos, *self.size)
     
-    def render(self, surf : pygame.Surface):
+    def render_track(self, surf : pygame.Surface):
         center_y = self.rect().centery
-        pygame.draw.line(surf, (255, 255, 255), [self.start_pos[0], center_y], [self.start_pos[0] + (self.max_val/self.inc), center_y])
-        surf.blit(self.surf, self.pos)
+        return pygame.draw.line(surf, (255, 255, 255), [self.start_pos[0], center_y], [self.start_pos[0] + (self.max_val/self.inc), center_y])
+
+    def render(self, surf : pygame.Surface):
+        return surf.blit(self.surf, self.pos)
 
 class Switch:
     def __init__(self, pos, size=[20, 20], text="Flip"):
@@ -42,57 +60,61 @@ class Switch:
         self.surf = pygame.Surface((size))
         self.flip = False
         self.text = text
-        self.font = pygame.font.Font(size=15)
-        pygame.font.init()
+        self.font = get_font(15)
+        self.drawn_flip = None      # state self.surf currently shows
     
 
     def rect(self):
         return pygame.Rect(*self.pos, *self.size)
     
     def update(self):
+        if self.flip == self.drawn_flip:
+            return
+        self.drawn_flip = self.flip
+
         if self.flip:
             self.surf.fill((0, 255, 0))
-            font_surf = self.font.render(self.text, True, (0, 0, 0))
+            font_surf = text_cache.render(self.font, self.text, (0, 0, 0))
             font_rect = font_surf.get_rect(center=(self.size[0] // 2, self.size[1] // 2))
             self.surf.blit(font_surf, font_rect)
         else:
             self.surf.fill((255, 0, 0))
 
     def render(self, surf):
-        surf.blit(self.surf, self.pos)
+        return surf.blit(self.surf, self.pos)
 
 class Popup:
     def __init__(self, text="", pos=[0,0], color=(0,0,0), rotation=0):
         self.text = text
         self.pos = pos
-        self.font_surf = pygame.font.Font(size=15).render(self.text, True, color=color)
-        self.size = self.font_surf.get_size()
-        self.surf = pygame.Surface((self.size))
-        self.surf_rect = self.surf.get_rect(center=self.pos)
-        self.surf.fill((0, 0, 0))
-        self.surf.blit(self.font_surf, (0, 0))
+        self.color = color
+        self.font = get_font(15)
+        self.size = self.font.size(self.text)
         self.rotation = rotation
-        
-        pygame.font.init()
     
     def render(self, surf):
-        img = pygame.transform.rotate(self.surf, self.rotation)
+        # rendered + rotated once, then served from the text cache
+        img = text_cache.render(self.font, self.text, self.color, self.rotation, (0, 0, 0))
         img_rect = img.get_rect(center=(self.pos[0] + math.cos(self.rotation) * 10, self.pos[1] + math.sin(self.rotation) * 10))
-        surf.blit(img, img_rect)
+        return surf.blit(img, img_rect)
 
 class App(Engine):
 
 
-    def __init__(self, dim=..., font_size=20):
+    def __init__(self, dim=..., font_size=20, tracker=None, recorder=None, max_hands=MAX_NUM_HANDS):
         super().__init__(dim, font_size)
         pygame.display.set_caption('AIM')
+        startup.mark("window")
         self.ball = Ball([self.display.get_width()//2, self.display.get_height()//2], (30, 30), (10, 10), {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")})
+        self.sim = Simulation(self.ball, self.display.get_width(), self.display.get_height())
+        self.stepper = FixedStepper()
         self.sliders : dict[str, Slider] = {"gravity" : {"slider": Slider("gravity", pos=[0, 30]), "switch" : Switch([self.display.get_width() - 20, 30])}, 
                                             "bounce" : {"slider": Slider("bounce", pos=[0, 60]), "switch" : Switch([self.display.get_width() - 20, 60])}, 
                                             "wind_x" : {"slider": Slider("wind_x", pos=[0, 90]), "switch" : Switch([self.display.get_width() - 20, 90])}, 
                                             "wind_y" : {"slider": Slider("wind_y", pos=[0, 120]), "switch" : Switch([self.display.get_width() - 20, 120])}}
 
         self.hide_switch = Switch((0, 0), text="Show")
+        self.popup_loading = Popup("Starting camera...", (self.display.get_width()//2 , self.display.get_height()//2), (255, 255, 0))
         self.popup = Popup("No Hands Detected, Show your hands to the camera", (self.display.get_width()//2 , self.display.get_height()//2), (255, 0, 0))
         self.popup_inverse = Popup("INVERT FORCES", (418, 73), (0, 255, 0), 90)
 
@@ -100,129 +122,220 @@ class App(Engine):
         self.popup_setup_mode = Popup("SETUP MODE", (self.display.get_width()//2 , 20), (0, 255, 0), 0)
         self.popup_start = Popup("START", (30, 10), (0, 255, 0), 0)
         self.popup_stop = Popup("STOP", (30, 10), (255, 0, 0), 0)
+        self.popup_replay = Popup(f"REPLAY x{REPLAY_SPEED:g}  (R: resume here, arrows: seek)", (self.display.get_width()//2 , 40), (255, 255, 0), 0)
 
         self.clicking = False
         self.hide = False
+        self.snapshots = SnapshotRing()
+        self.replay_cursor = None     # fractional snapshot number while replaying
+        self.fps = 60
 
-        self.ar = AR()
-        self.just_clicked = {"LEFT" : False, "RIGHT" : False}
-
-
-    def run(self):
-
-        while True:
-            args : set[str] = set()
-            self.display.fill((0, 0, 0))
-            just_click = False
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        self.clicking = True
-                        just_click = True
-                
-                if event.type == pygame.MOUSEBUTTONUP:
-                    if event.button == 1:
-                        self.clicking = False
-                
-            
-            mpos = pygame.mouse.get_pos()
-            mpos = [mpos[0] / 2, mpos[1] / 2]
+        self.ar = AR(tracker, recorder, max_hands)
+        self.hand_collider = HandCollider()
+        self.hud_font = pygame.font.Font(size=14)
+        startup.mark("app_init")
 
-            b_rect = self.ball.rect()
-            b_rect.center = self.ball.pos.copy()
 
-            if self.hide_switch.rect().collidepoint(mpos) and just_click:
-                self.hide = not self.hide
-                self.hide_switch.flip = not self.hide_switch.flip
+    def run(self, frames=None):
+        count = 0
+        while frames is None or count < frames:
+            self.frame()
+            count += 1
 
-            self.hide_switch.update()
-            self.hide_switch.render(self.display)
-            
-            try:
-                ar_data = self.ar.render(self.display)
-            except:
-                pass
+    def quit(self):
+        self.ar.close()
+        pygame.quit()
+        sys.exit()
+
+    def handle_events(self) -> bool:
+        just_click = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit()
             
-            if not self.hide:
-                self.popup_start.render(self.display)
-                click_pos = {'LEFT' : None, 'RIGHT' : None}
-                for key in ['LEFT', 'RIGHT']:
-                    if ar_data['CLICK_FLAG'][key]:
-                        pos = ar_data['POSITION_DATA'][key][INDEX_TIP_IDX ]
-                        if b_rect.collidepoint(pos):
-                            self.ball.pos = list(pos).copy()
-                        click_pos[key] = pos
-
-                
-                
-                for label, objs in self.sliders.items():
-                    slider : Slider = objs['slider']
-                    switch : Switch = objs['switch']
-                    if self.clicking:
-                        if pygame.Rect(*slider.start_pos, 0 + (slider.max_val/slider.inc), slider.size[1]).collidepoint(mpos):
-                            slider.pos[0] = mpos[0]
-                        if switch.rect().collidepoint(mpos) and just_click:
-                            switch.flip = not switch.flip
-                    self.display.blit(self.font.render(f'{slider.pos[0] / slider.max_val_in_dist : 0.2f} {label}', True, (255, 255, 255)), [0 + (slider.max_val/slider.inc) + 20, slider.pos[1]])
-                    switch.update()
-                    switch.render(self.display)
-                    slider.render(self.display)
-                    self.ball.forces[label].force = (slider.pos[0] / slider.max_val_in_dist) * (-1 if switch.flip else 1)
-                    self.popup_inverse.render(self.display)
-
-                    self.popup_setup_mode.render(self.display)
-            else:
-                self.popup_stop.render(self.display)
-                self.popup_simulation_mode.render(self.display)
-                    
-                for key in ['LEFT', 'RIGHT']:
-                    collided = False
-                    for point in ar_data['POSITION_DATA'][key]:
-                        if not self.ball.collider_cooldown:
-                            if b_rect.collidepoint(point):
-                                self.ball.velocities[0] = 10 * (1 if self.ball.velocities[0] < 0 else -1)
-                                self.ball.velocities[1] = 10 * (1 if self.ball.velocities[1] < 0 else -1)
-                                self.ball.collider_cooldown = 5
-                                collided = True
-                                break
-                        else:
-                            collided = True
-                            break
-                    if collided:
-                        break
-                            
-
-                if self.ball.pos[0] + self.ball.size[0] // 2 >= self.display.get_width():
-                    self.ball.pos[0] = self.display.get_width() - self.ball.size[0] // 2 - 1
-                    args.add("apply_bounce_x")
-                if self.ball.pos[0] - self.ball.size[0] // 2 <= 0:
-                    self.ball.pos[0] = self.ball.size[0] 
-                    args.add("apply_bounce_x")
-                
-                if (self.ball.pos[1] + self.ball.size[1] // 2) >= self.display.get_height():
-                    self.ball.pos[1] = self.display.get_height() - self.ball.size[1] // 2 - 1
-                    args.add("apply_bounce_y")
-                if self.ball.pos[1] - self.ball.size[1] // 2 <= 0:
-                    self.ball.pos[1] = self.ball.size[1] // 2
-                    args.add("apply_bounce_y")
-
-                self.ball.update(args=args)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:
+                    self.clicking = True
+                    just_click = True
             
-            pygame.draw.circle(self.display, (255, 255, 255), self.ball.pos, self.ball.size[0] // 2)
-            pygame.draw.circle(self.display, (255, 0, 0), self.ball.pos, 2)
+            if event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    self.clicking = False
 
-            if not ar_data["HAND_PRESENCE"]:
-                self.popup.render(self.display)
-                print("No hands detected")
-            
-            print(mpos)
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                self.compositor.force_full()
+
+            if event.type == pygame.KEYDOWN:
+                # F3: timing overlay on/off, F4: dump the recorded spans as a Chrome trace
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                if event.key == pygame.K_F4:
+                    get_logger_info('APP', f'TRACE SAVED TO {profiler.export_trace()}', True)
+                # R: rewind and replay the last HISTORY_SECONDS in slow motion / resume from there
+                if event.key == pygame.K_r and self.hide:
+                    if self.replay_cursor is None:
+                        self.start_replay()
+                    else:
+                        self.stop_replay()
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT) and self.replay_cursor is not None:
+                    step = SEEK_SECONDS / self.stepper.dt * (1 if event.key == pygame.K_RIGHT else -1)
+                    self.replay_cursor = min(max(self.replay_cursor + step, self.snapshots.oldest), self.snapshots.newest)
+        return just_click
+
+    def get_mouse_pos(self) -> list[float]:
+        mpos = pygame.mouse.get_pos()
+        return [mpos[0] / 2, mpos[1] / 2]
+
+    def draw_static(self, surf):
+        """
+        Everything that only changes with the mode, cached by the compositor.
+        """
+        self.hide_switch.update()
+        self.hide_switch.render(surf)
+
+        if not self.hide:
+            self.popup_start.render(surf)
+            for objs in self.sliders.values():
+                objs['slider'].render_track(surf)
+            self.popup_inverse.render(surf)
+            self.popup_setup_mode.render(surf)
+        else:
+            self.popup_stop.render(surf)
+            self.popup_simulation_mode.render(surf)
+
+    def update_setup(self, ar_data, b_rect, mpos, just_click):
+        mark = self.compositor.mark
+        for track, clicked in ar_data['CLICK_FLAG'].items():
+            if clicked:
+                pos = ar_data['POSITION_DATA'][track][INDEX_TIP_IDX]
+                if b_rect.collidepoint(pos):
+                    self.ball.pos = pos.tolist()
+
+        for label, objs in self.sliders.items():
+            slider : Slider = objs['slider']
+            switch : Switch = objs['switch']
+            if self.clicking:
+                if pygame.Rect(*slider.start_pos, 0 + (slider.max_val/slider.inc), slider.size[1]).collidepoint(mpos):
+                    slider.pos[0] = mpos[0]
+                if switch.rect().collidepoint(mpos) and just_click:
+                    switch.flip = not switch.flip
+            mark(self.display.blit(text_cache.render(self.font, f'{slider.pos[0] / slider.max_val_in_dist : 0.2f} {label}', (255, 255, 255)), [0 + (slider.max_val/slider.inc) + 20, slider.pos[1]]))
+            switch.update()
+            mark(switch.render(self.display))
+            mark(slider.render(self.display))
+            self.ball.forces[label].force = (slider.pos[0] / slider.max_val_in_dist) * (-1 if switch.flip else 1)
+
+    def step(self, dt):
+        self.sim.step(dt)
+        self.snapshots.capture(self.sim, self.sliders)
+
+    def start_replay(self):
+        if len(self.snapshots):
+            self.replay_cursor = float(self.snapshots.oldest)
+            self.compositor.invalidate()
+
+    def stop_replay(self):
+        # continue live from the snapshot on screen, later history is dropped
+        seq = min(round(self.replay_cursor), self.snapshots.newest)
+        self.snapshots.restore(seq, self.sim, self.sliders)
+        self.snapshots.truncate(seq)
+        self.sim.sync()
+        self.hand_collider.reset()
+        self.replay_cursor = None
+        self.compositor.invalidate()
+
+    def update_simulation(self, ar_data, frame_time):
+        # hand bones swept since last frame against the ball, impulse from the hand's velocity
+        pos = np.array([self.ball.pos], dtype=np.float64)
+        vel = np.array([self.ball.velocities], dtype=np.float64)
+        radius = np.array([self.ball.size[0] / 2])
+        if self.hand_collider.collide(ar_data['POSITION_DATA'], pos, vel, radius, frame_time):
+            self.ball.pos[:] = pos[0].tolist()
+            self.ball.velocities[:] = vel[0].tolist()
+
+    def present(self):
+        with profiler.span("present"):
+            self.compositor.present()
+
+    def frame(self):
+        with profiler.span("frame"):
+            self.frame_body()
+
+    def frame_body(self):
+        frame_time = self.clock.tick(self.fps) / 1000
+        ball_pos = self.ball.pos
+        just_click = self.handle_events()
+        mpos = self.get_mouse_pos()
+
+        b_rect = self.ball.rect()
+        b_rect.center = self.ball.pos.copy()
+
+        if self.hide_switch.rect().collidepoint(mpos) and just_click:
+            if self.replay_cursor is not None:
+                self.stop_replay()
+            self.hide = not self.hide
+            self.hide_switch.flip = not self.hide_switch.flip
+            self.sim.sync()
+            self.hand_collider.reset()
+            self.compositor.invalidate()
+
+        mark = self.compositor.mark
+        self.compositor.begin(self.draw_static)
+        
+        try:
+            with profiler.span("ar.render"):
+                ar_data = self.ar.render(self.display)
+        except:
+            ar_data = self.ar.empty_ar_data()
+        for rect in self.ar.drawn_rects:
+            mark(rect)
+        
+        if not self.hide:
+            with profiler.span("setup_ui"):
+                self.update_setup(ar_data, b_rect, mpos, just_click)
+        elif self.replay_cursor is not None:
+            # recorded states, not re-simulated: hand hits replay exactly as they happened
+            self.replay_cursor = min(self.replay_cursor + frame_time / self.stepper.dt * REPLAY_SPEED, self.snapshots.newest)
+            ball_pos = self.snapshots.interpolated_pos(self.replay_cursor)
+            mark(self.popup_replay.render(self.display))
+        else:
+            with profiler.span("sim_ui"):
+                self.update_simulation(ar_data, frame_time)
+
+            # fixed-dt physics, drawn between the last two states
+            alpha = self.stepper.advance(frame_time, self.step)
+            ball_pos = self.sim.interpolated_pos(alpha)
+        
+        mark(pygame.draw.circle(self.display, (255, 255, 255), ball_pos, self.ball.size[0] // 2))
+        pygame.draw.circle(self.display, (255, 0, 0), ball_pos, 2)
+
+        if self.ar.loading:
+            mark(self.popup_loading.render(self.display))
+        elif not ar_data["HAND_PRESENCE"]:
+            mark(self.popup.render(self.display))
+
+        mark(profiler.render_hud(self.display, self.hud_font))
+        self.present()
+        startup.mark("first_frame")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AIM physics demo")
+    parser.add_argument("--record", metavar="PATH", help="save hand landmarks to a recording")
+    parser.add_argument("--replay", metavar="PATH", help="play hands back from a recording instead of the camera")
+    parser.add_argument("--fast", action="store_true", help="with --replay, one recorded frame per rendered frame")
+    parser.add_argument("--cameras", metavar="INDEX", type=int, nargs="+", help="track hands from several cameras in worker processes")
+    parser.add_argument("--workers", type=int, default=2, help="with --cameras, number of inference processes")
+    parser.add_argument("--hands", type=int, default=MAX_NUM_HANDS, help="number of hands tracked at once")
+    cli = parser.parse_args()
 
-            self.screen.blit(pygame.transform.scale(self.display, self.screen.get_size()), (0, 0))
-            self.clock.tick(60)
-            pygame.display.update()
+    tracker = None
+    if cli.replay:
+        tracker = ReplaySource(cli.replay, realtime=not cli.fast)
+    elif cli.cameras:
+        from scripts.inference_pool import InferencePool, CameraSource
+        tracker = InferencePool([functools.partial(CameraSource, i) for i in cli.cameras], cli.workers,
+                                functools.partial(create_hands, cli.hands))
+    recorder = LandmarkRecorder(cli.record, cli.hands) if cli.record else None
 
-App((900, 1000)).run()  
\ No newline at end of file
+    #(width, height)
+    App((900, 1000), tracker=tracker, recorder=recorder, max_hands=cli.hands).run()
@@ -0,0 +1,254 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pygame
+
+from app import App
+from scripts.tracking import TrackingResult
+
+# --- CONFIGURATION ---
+DIM           = (900, 1000)
+WARMUP_FRAMES = 30
+STAGES        = ("events", "ar", "setup_ui", "sim_ui", "physics", "present")
+
+# hand shape in display pixels around its centre, 21 landmarks
+HAND_OFFSETS = [(math.cos(i * 0.3) * (4 + i), math.sin(i * 0.3) * (4 + i) - 10) for i in range(21)]
+
+
+class ScriptedTracker:
+    """
+    Tracker stand-in: returns script(frame) as a fresh result on every poll.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.frame = 0
+
+    def start(self):
+        return self
+
+    def poll(self):
+        hands = self.script(self.frame)
+        self.frame += 1
+        return TrackingResult(self.frame, time.perf_counter(), hands)
+
+    def close(self):
+        pass
+
+
+class FixedClock:
+    """
+    Never sleeps and always reports a 60 FPS frame, so physics steps
+    the same way on every machine.
+    """
+
+    def tick(self, framerate=0):
+        return 1000 / 60
+
+
+class BenchApp(App):
+    """
+    App whose mouse is driven by the scenario instead of the OS.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.mouse = (0, 0)
+        super().__init__(*args, **kwargs)
+
+    def get_mouse_pos(self):
+        return [self.mouse[0] / 2, self.mouse[1] / 2]
+
+    def click(self, down):
+        event = pygame.MOUSEBUTTONDOWN if down else pygame.MOUSEBUTTONUP
+        pygame.event.post(pygame.event.Event(event, button=1, pos=self.mouse))
+
+
+def hand_at(app, center, label="RIGHT"):
+    W, H = app.display.get_width(), app.display.get_height()
+    return (label, np.array([((W - (center[0] + dx)) / W, (center[1] + dy) / H) for dx, dy in HAND_OFFSETS], dtype=np.float32))
+
+
+# --- SCENARIOS ---
+# each returns (hand script, per-frame driver) for a freshly built app
+def setup_drag(app):
+    def hands(frame):
+        return (hand_at(app, (300, 300)),)
+
+    def drive(frame):
+        # sweep every slider back and forth with the button held
+        row = (frame // 60) % len(app.sliders)
+        x = abs((frame % 120) - 60) / 60 * 200
+        app.mouse = (x * 2, (30 + row * 30 + 5) * 2)
+        if frame == 0:
+            app.click(True)
+    return hands, drive
+
+def simulation_contact(app):
+    app.hide = True
+    app.hide_switch.flip = True
+
+    def hands(frame):
+        return (hand_at(app, app.ball.pos, "LEFT"), hand_at(app, app.ball.pos, "RIGHT"))
+
+    def drive(frame):
+        pass
+    return hands, drive
+
+def no_hands(app):
+    def hands(frame):
+        return ()
+
+    def drive(frame):
+        pass
+    return hands, drive
+
+SCENARIOS = {"setup_drag" : setup_drag, "simulation_contact" : simulation_contact, "no_hands" : no_hands}
+
+
+def timed(stage, fn, times):
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            times[stage] += time.perf_counter() - t0
+    return wrapper
+
+def percentiles(samples_ms):
+    a = np.asarray(samples_ms)
+    return {"mean" : float(a.mean()), "p50" : float(np.percentile(a, 50)),
+            "p95" : float(np.percentile(a, 95)), "p99" : float(np.percentile(a, 99))}
+
+def run_scenario(name, frames):
+    tracker = ScriptedTracker(lambda frame: ())
+    app = BenchApp(DIM, tracker=tracker)
+    app.clock = FixedClock()
+    hands, drive = SCENARIOS[name](app)
+    tracker.script = hands
+
+    times = dict.fromkeys(STAGES, 0.0)
+    app.handle_events = timed("events", app.handle_events, times)
+    app.ar.render = timed("ar", app.ar.render, times)
+    app.update_setup = timed("setup_ui", app.update_setup, times)
+    app.update_simulation = timed("sim_ui", app.update_simulation, times)
+    app.stepper.advance = timed("physics", app.stepper.advance, times)
+    app.present = timed("present", app.present, times)
+
+    frame_ms = []
+    stage_ms = {stage : [] for stage in STAGES + ("other",)}
+    for frame in range(WARMUP_FRAMES + frames):
+        drive(frame)
+        for stage in STAGES:
+            times[stage] = 0.0
+        t0 = time.perf_counter()
+        app.frame()
+        total = time.perf_counter() - t0
+
+        if frame >= WARMUP_FRAMES:
+            frame_ms.append(total * 1000)
+            for stage in STAGES:
+                stage_ms[stage].append(times[stage] * 1000)
+            stage_ms["other"].append((total - sum(times.values())) * 1000)
+    app.ar.close()
+
+    return {"frames" : frames,
+            "frame_ms" : percentiles(frame_ms),
+            "stages_ms" : {stage : percentiles(samples) for stage, samples in stage_ms.items()}}
+
+# cold start in a fresh interpreter: real Hands model, synthetic camera frames
+STARTUP_PROBE = """
+import time
+t0 = time.perf_counter()
+import os, sys, json, contextlib
+import numpy as np
+
+class SyntheticCamera:
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    def read(self):
+        time.sleep(1 / 30)
+        return True, self.frame
+    def release(self):
+        pass
+
+with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+    import app
+    from scripts.tracking import TrackingWorker
+    t_import = time.perf_counter()
+    tracker = TrackingWorker(SyntheticCamera)
+    a = app.App((900, 1000), tracker=tracker)
+    t_init = time.perf_counter()
+    a.frame()
+    t_frame = time.perf_counter()
+    while tracker.frames_processed == 0 and time.perf_counter() - t0 < 60:
+        a.frame()
+    t_result = time.perf_counter()
+    a.ar.close()
+print("STARTUP", json.dumps({"import" : t_import - t0, "app_init" : t_init - t0,
+                  "first_frame" : t_frame - t0, "first_result" : t_result - t0}))
+"""
+
+def run_startup(runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        samples.append(json.loads(next(l for l in out.splitlines() if l.startswith("STARTUP "))[8:]))
+    return {phase : percentiles([s[phase] * 1000 for s in samples]) for phase in samples[0]}
+
+def report(results, baseline=None):
+    for name, res in results["scenarios"].items():
+        f = res["frame_ms"]
+        line = f"{name:<20} p50 {f['p50']:6.2f}  p95 {f['p95']:6.2f}  p99 {f['p99']:6.2f} ms"
+        if baseline and name in baseline["scenarios"]:
+            old = baseline["scenarios"][name]["frame_ms"]
+            line += f"   (p50 {100 * (f['p50'] / old['p50'] - 1):+.1f}%, p95 {100 * (f['p95'] / old['p95'] - 1):+.1f}%)"
+        print(line)
+        print("    " + "  ".join(f"{stage} {s['mean']:.3f}" for stage, s in res["stages_ms"].items()))
+    if "startup_ms" in results:
+        print("startup (median ms after interpreter start)")
+        for phase, s in results["startup_ms"].items():
+            line = f"    {phase:<14} {s['p50']:8.0f}"
+            if baseline and phase in baseline.get("startup_ms", {}):
+                line += f"   ({s['p50'] - baseline['startup_ms'][phase]['p50']:+.0f} ms)"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless App frame benchmark")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="default: all")
+    parser.add_argument("--out", metavar="JSON", help="save results")
+    parser.add_argument("--compare", metavar="JSON", help="print deltas against saved results")
+    parser.add_argument("--startup", type=int, metavar="RUNS", default=0,
+                        help="also measure cold start (time to first frame / first hand result) over RUNS fresh processes")
+    cli = parser.parse_args()
+
+    import mediapipe
+    results = {
+        "meta" : {"time" : time.strftime("%Y-%m-%dT%H:%M:%S"), "python" : platform.python_version(),
+                  "pygame" : pygame.version.ver, "mediapipe" : mediapipe.__version__,
+                  "numpy" : np.__version__, "platform" : platform.platform(),
+                  "video_driver" : os.environ["SDL_VIDEODRIVER"], "dim" : DIM},
+        "scenarios" : {name : run_scenario(name, cli.frames) for name in (cli.scenario or SCENARIOS)},
+    }
+    if cli.startup:
+        results["startup_ms"] = run_startup(cli.startup)
+
+    baseline = None
+    if cli.compare:
+        with open(cli.compare) as fp:
+            baseline = json.load(fp)
+    report(results, baseline)
+
+    if cli.out:
+        with open(cli.out, "w") as fp:
+            json.dump(results, fp, indent=2)
@@ -1,230 +1,165 @@
-import math
-import cv2
-import mediapipe as mp
+import functools
+import time
+import numpy as np
 import pygame
 
-from collections import deque, namedtuple
 from scripts.logger import get_logger_info
+from scripts.tracking import TrackingWorker, NUM_LANDMARKS, MAX_NUM_HANDS, create_hands
+from scripts.hand_filter import HandFilter, LOST_TIMEOUT
+from scripts.hand_tracks import HandTracks
+from scripts.hand_collision import BONES
+from scripts.gestures import GestureEngine
+from scripts.startup import startup
+from scripts.profiler import profiler
 
 # --- CONFIGURATION & INDICES ---
-THUMB_TIP_IDX   = 4
-INDEX_TIP_IDX   = 8
-MIDDLE_MCP_IDX  = 9
-WRIST_IDX       = 0
-
-HISTOGRAM_SIZE     = 5
-PINCH_ON_THRESH    = 0.15    # normalized units 
-PINCH_OFF_THRESH   = 0.20
-PINCH_FRAMES_REQ   = 3       # debounce frames
-
-# Keep these if you still need them
-SCALE_SIZE    = 8
-ATTACK_COOLDOWN = 20
-
-
-# --- PINCH DETECTOR ---
-HandState = namedtuple("HandState", ["pos_hist", "pinch_count", "is_pinched"])
-
-class PinchDetector:
-    def __init__(self):
-        # one state per hand label
-        self.hands = {
-            "LEFT":  HandState(deque(maxlen=HISTOGRAM_SIZE), 0, False),
-            "RIGHT": HandState(deque(maxlen=HISTOGRAM_SIZE), 0, False),
-        }
-
-    @staticmethod
-    def euclid(a, b):
-        dx = b[0] - a[0]
-        dy = b[1] - a[1]
-        return math.hypot(dx, dy)
-
-    def update(self, label, landmarks_norm):
-        """
-        landmarks_norm: list of (x,y) in [0..1]
-        Returns dict: { scale, rel_dist, raw_dist, is_pinched }
-        """
-        state = self.hands[label]
-        state.pos_hist.append(landmarks_norm)
-
-        p_thumb = landmarks_norm[THUMB_TIP_IDX]
-        p_index = landmarks_norm[INDEX_TIP_IDX]
-        p_wrist = landmarks_norm[WRIST_IDX]
-        p_mcp   = landmarks_norm[MIDDLE_MCP_IDX]
-
-        raw_dist   = self.euclid(p_thumb, p_index)
-        hand_scale = self.euclid(p_wrist, p_mcp)
-        rel_dist   = raw_dist / hand_scale if hand_scale > 0 else float('inf')
+# Mediapipe's HAND_CONNECTIONS, without importing mediapipe on the render thread
+HAND_CONNECTIONS = BONES.tolist()
 
-        pc, pinched = state.pinch_count, state.is_pinched
 
-        # hysteresis + debounce
-        if pinched:
-            if rel_dist > PINCH_OFF_THRESH: 
-                pc -= 1
-        else:
-            if rel_dist < PINCH_ON_THRESH:
-                pc += 1
-
-        pc = max(-PINCH_FRAMES_REQ, min(PINCH_FRAMES_REQ, pc))
-
-        if not pinched and pc >= PINCH_FRAMES_REQ:
-            pinched = True
-        elif pinched and pc <= -PINCH_FRAMES_REQ:
-            pinched = False
-
-        # save state
-        self.hands[label] = HandState(state.pos_hist, pc, pinched)
+# --- AR CLASS ---
+class AR:
+    def __init__(self, tracker=None, recorder=None, max_hands=MAX_NUM_HANDS):
+        # hand source: live TrackingWorker by default, or e.g. a ReplaySource;
+        # camera capture + Mediapipe inference run on the tracker's own thread
+        self.tracker = tracker if tracker is not None else TrackingWorker(model_factory=functools.partial(create_hands, max_hands),
+                                                                               max_hands=max_hands)
+        self.tracker.start()
+        self.recorder = recorder
+
+        # detections -> persistent track IDs; all per-hand state below is indexed by track slot
+        self.tracks = HandTracks(max_hands)
+        slots = range(max_hands)
+
+        # pixel‐space points of the hands drawn this frame; the gesture engine keeps the history
+        self.pixels = np.zeros((max_hands, NUM_LANDMARKS, 2), dtype=np.float32)
+
+        # pinch and the other gestures, all hands at once
+        self.gestures = GestureEngine(labels=slots)
+
+        # per-hand predictive filter, fills the render ticks between inferences
+        # (and briefly covers dropouts)
+        self.filters = [HandFilter() for _ in slots]
+        self.captured = np.zeros(max_hands, dtype=np.float64)   # capture time of each slot's last measurement
+        self.slots = np.zeros(0, dtype=np.intp)      # track slot of each hand in the latest result
+        self.predicted = np.zeros((NUM_LANDMARKS, 2), dtype=np.float32)
+
+        # bounding rects of everything drawn by the latest render(), for dirty-rect presenting
+        self.drawn_rects = []
+
+    @property
+    def loading(self):
+        # camera / model still starting on the tracker's thread
+        return getattr(self.tracker, "loading", False)
+
+    def close(self):
+        self.tracker.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
+    @staticmethod
+    def empty_ar_data():
+        # every dict is keyed by track ID and holds the hands on screen this frame
         return {
-            "raw_dist":  raw_dist,
-            "scale":     hand_scale,
-            "rel_dist":  rel_dist,
-            "is_pinched": pinched
+            "POSITION_DATA": {},
+            "HANDEDNESS":    {},
+            "SCALE":         {},
+            "CLICK_DIST":    {},
+            "CLICK_FLAG":    {},
+            "GESTURES":      {},
+            "HAND_PRESENCE" : False
         }
 
-
-# --- AR CLASS ---
-class AR:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=0.2,
-            min_tracking_confidence=0.2
-        )
-
-        # pixel‐space histogram for smoothing & ghost‐frames
-        self.position_histogram = {'LEFT': [], 'RIGHT': []}
-        self.hands_tracker     = {'LEFT': 0,      'RIGHT': 0     }
-
-        # our new pinch detector
-        self.detector = PinchDetector()
-
-    def render_hands(self, surf, landmarks, label):
+    def draw_hand(self, surf, pts):
+        with profiler.span("render_hands"):
+            pts = pts.tolist()
+            rects = [pygame.draw.circle(surf, (255,255,255), (int(x_px),int(y_px)), 2)
+                     for x_px, y_px in pts]
+            for c in HAND_CONNECTIONS:
+                pygame.draw.line(surf, (0,0,255),
+                                 pts[c[0]], pts[c[1]], 1)
+            self.drawn_rects.append(rects[0].unionall(rects[1:]))
+
+    def render_hands(self, surf, landmarks_norm, slot):
         """
-        Draws landmarks→pixel & updates pixel histogram.
+        Draws landmarks→pixel & stores the pixel points.
+        landmarks_norm: (21, 2) float32 array of (x,y) in [0..1]
         """
         W, H = surf.get_width(), surf.get_height()
-        pts = []
-        for lm in landmarks.landmark:
-            x_px = -lm.x * W + W
-            y_px =  lm.y * H
-            pts.append((x_px, y_px))
-            pygame.draw.circle(surf, (255,255,255), (int(x_px),int(y_px)), 2)
-
-        # maintain sliding window
-        hist = self.position_histogram[label]
-        if len(hist) < HISTOGRAM_SIZE:
-            hist.append(pts)
-        else:
-            hist.pop(0)
-            hist.append(pts)
-
-        # draw connections
-        for c in self.mp_hands.HAND_CONNECTIONS:
-            pygame.draw.line(surf, (0,0,255),
-                             pts[c[0]], pts[c[1]], 1)
-
-    def calculate_velocity(self, label, dir=0):
+        # mirrored transform straight into the slot's pixel buffer
+        pts = self.pixels[slot]
+        np.multiply(landmarks_norm, (-W, H), out=pts)
+        pts[:, 0] += W
+
+        self.draw_hand(surf, pts)
+
+    def latest(self, slot):
         """
-        Pixel‐space velocity between oldest & newest in histogram.
-        dir=0 returns scalar dist, dir=1 returns [dx,dy] vector
+        Pixel points of a hand drawn this frame, a view into the buffer.
         """
-        hist = self.position_histogram[label]
-        if len(hist) == HISTOGRAM_SIZE:
-            start = hist[0][MIDDLE_MCP_IDX]
-            end   = hist[-1][MIDDLE_MCP_IDX]
-            dx = (end[0] - start[0]) / HISTOGRAM_SIZE
-            dy = (end[1] - start[1]) / HISTOGRAM_SIZE
-            return [dx, dy] if dir else math.hypot(dx, dy)
-        return [0,0] if dir else 0
-
-    def generate_frames(self, velocity, label):
+        return self.pixels[slot]
+
+    def ingest(self, result):
         """
-        Create a ghost HandLandmarks from last pixel positions + vel.
+        Matches a fresh tracker result to tracks and feeds it into the
+        gesture engine and the filters.
         """
-        class LM: 
-            def __init__(self,x,y): 
-                self.x, self.y = x, y
-        class HL: 
-            def __init__(self): 
-                self.landmark = []
-            def add(self,x,y): 
-                self.landmark.append(LM(x,y))
-
-        gen = HL()
-        for x,y in self.position_histogram[label][-1]:
-            gen.add(x + velocity[0], y + velocity[1])
-        return gen
+        if "first_result" not in startup.phases:
+            startup.mark("first_result")
+            get_logger_info('CORE', f'STARTUP {startup.report()}', True)
+        if not result.hands:
+            get_logger_info('ERROR', 'NO HANDS DETECTED', True)
 
-    def render(self, surf):
-        ar_data = {
-            "POSITION_DATA": {"LEFT": [], "RIGHT": []},
-            "SCALE":         {"LEFT": 1,    "RIGHT": 1},
-            "CLICK_DIST":    {"LEFT": 0,    "RIGHT": 0},
-            "CLICK_FLAG":    {"LEFT": False,"RIGHT": False},
-            "HAND_PRESENCE" : False
-        }
+        slots = self.slots = self.tracks.assign(result.hands, result.timestamp)
+        for slot in self.tracks.closed.tolist() + self.tracks.opened.tolist():
+            # a slot's previous hand must not leak into the new one
+            self.filters[slot].reset()
+            self.gestures.reset(slot)
 
-        ret, frame = self.cap.read()
-        if not ret:
-            return ar_data
-
-        # prep for Mediapipe
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = self.hands.process(rgb)
-
-        # keep track of which hands appear
-        seen = []
-
-        if res.multi_hand_landmarks:
-            for lm_set, handedness in zip(res.multi_hand_landmarks,
-                                          res.multi_handedness):
-                label = handedness.classification[0].label.upper()
-                seen.append(label)
-
-                # 1) pinch detection on normalized coords
-                landmarks_norm = [(lm.x, lm.y) for lm in lm_set.landmark]
-                d = self.detector.update(label, landmarks_norm)
-
-                # 2) draw & update pixel histogram
-                self.render_hands(surf, lm_set, label)
-
-                # 3) fill AR output
-                ar_data["POSITION_DATA"][label] = self.position_histogram[label][-1]
-                ar_data["SCALE"][label]         = d["scale"]
-                ar_data["CLICK_DIST"][label]    = d["rel_dist"]
-                ar_data["CLICK_FLAG"][label]    = d["is_pinched"]
-                ar_data["HAND_PRESENCE"]        = True
-
-                self.hands_tracker[label] = 0
-
-            # ghost frames for missing hands
-            for label in ("LEFT","RIGHT"):
-                if label not in seen:
-                    self.hands_tracker[label] += 1
-                    if (len(self.position_histogram[label]) >= 2
-                       and self.hands_tracker[label] < HISTOGRAM_SIZE):
-                        vel = self.calculate_velocity(label, dir=1)
-                        ghost = self.generate_frames(vel, label)
-                        self.render_hands(surf, ghost, label)
-                        get_logger_info('CORE',
-                            f'GENERATED HAND FRAMES FOR {label}', True)
-
-        else:
+        tracked = [(slot, landmarks_norm) for slot, (_, landmarks_norm) in zip(slots.tolist(), result.hands) if slot >= 0]
+        self.gestures.update(tracked, result.timestamp)
+        for slot, landmarks_norm in tracked:
+            self.filters[slot].correct(landmarks_norm, result.timestamp)
+            self.captured[slot] = result.timestamp
 
-            get_logger_info('ERROR', 'NO HANDS DETECTED', True)
-            # same ghost-frame logic if you like
-            for label in ("LEFT","RIGHT"):
-                if (len(self.position_histogram[label]) >= 2
-                       and self.hands_tracker[label] < HISTOGRAM_SIZE):
-                    vel = self.calculate_velocity(label, dir=1)
-                    ghost = self.generate_frames(vel, label)
-                    self.render_hands(surf, ghost, label)
-                else:
-                    ar_data["HAND_PRESENCE"] = False
-                    # no hands detected at all
+        if len(tracked) < len(result.hands):
+            get_logger_info('ERROR', f'MORE THAN {self.tracks.capacity} HANDS, {len(result.hands) - len(tracked)} IGNORED', True)
+        for slot in np.flatnonzero(self.tracks.active & (self.tracks.last_seen < result.timestamp)).tolist():
+            if self.filters[slot].active:
+                get_logger_info('CORE', f'PREDICTING HAND FRAMES FOR {self.tracks.ids[slot]}', True)
+
+        if self.recorder is not None:
+            self.recorder.write(result, [slot >= 0 and self.gestures.is_active(slot, "pinch") for slot in slots.tolist()])
+
+    def render(self, surf):
+        self.drawn_rects = []
+        now = time.perf_counter()
+        result = self.tracker.poll()
+        if result is not None:
+            self.ingest(result)
+
+        ar_data = self.empty_ar_data()
+        g = self.gestures
+        for slot, f in enumerate(self.filters):
+            if not f.active:
+                continue
+            # both on the perf_counter clock: the horizon covers the inference
+            # latency as well as the render ticks since the result arrived
+            age = now - self.captured[slot]
+            if age > LOST_TIMEOUT:
+                f.reset()
+                continue
+
+            # landmarks predicted for this tick, never waits on the tracker
+            self.render_hands(surf, f.predict(age, self.predicted), slot)
+
+            track = int(self.tracks.ids[slot])
+            ar_data["POSITION_DATA"][track] = self.latest(slot)
+            ar_data["HANDEDNESS"][track]    = self.tracks.label(slot)
+            ar_data["SCALE"][track]         = g.feature(slot, "scale")
+            ar_data["CLICK_DIST"][track]    = g.feature(slot, "pinch")
+            ar_data["CLICK_FLAG"][track]    = g.is_active(slot, "pinch")
+            ar_data["GESTURES"][track]      = g.active_names(slot)
+            ar_data["HAND_PRESENCE"]        = True
 
         return ar_data
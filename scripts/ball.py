@@ -1,7 +1,10 @@
+import math
 import pygame
 
-from scripts.physicsobj import PhysicsObj
+from scripts.physicsobj import PhysicsObj, REFERENCE_DT
+from scripts.ccd import advance_one, arena_bounds, NO_CONTACTS
 from scripts.forces import Force
+from scripts.sleep import SleepState
 
 class Ball(PhysicsObj):
     
@@ -9,38 +12,41 @@ class Ball(PhysicsObj):
         super().__init__(terminal_velocities)
         self.pos = pos
         self.size = size
-        self.collider_cooldown = 0
+        self.sleep = SleepState()
         for force, force_obj in forces.items():
             self.forces[force] = force_obj
     
     def rect(self) -> pygame.Rect:
         return pygame.Rect(*self.pos, *self.size)
     
-    def update(self, args : set[str]=set()) -> None:
+    @property
+    def asleep(self) -> bool:
+        return bool(self.sleep.asleep[0])
 
-        for force in self.forces.keys():
+    def acceleration(self) -> list[float]:
+        ax = ay = 0.0
+        for force in self.forces.values():
+            fx, fy = force.acceleration()
+            ax += fx
+            ay += fy
+        return [ax, ay]
 
-            self.forces[force].apply_force(self, args)
-        
-        if self.velocities[0] >= 0:
-            self.velocities[0] = min(self.terminal_velocities[0], self.velocities[0])
-        else:
-            self.velocities[0] = max(-self.terminal_velocities[0], self.velocities[0])
-
-        if self.velocities[1] >= 0:
-            self.velocities[1] = min(self.terminal_velocities[1], self.velocities[1])
-        else:
-            self.velocities[1] = max(-self.terminal_velocities[1], self.velocities[1])
+    def update(self, dt : float=REFERENCE_DT, arena=None):
+        """
+        Advances dt seconds, bouncing exactly off the walls of a
+        (width, height) arena (none when None). Returns the wall contacts
+        of the step as a ccd.CONTACT_DTYPE array. A sleeping ball is not
+        stepped at all. One body: stepped in plain floats (ccd.advance_one).
+        """
+        if not self.sleep.awake_one(self.pos, self.velocities, self.forces.values(), arena):
+            return NO_CONTACTS
 
-        if self.velocities[0] >= 0:
-            self.velocities[0] = max(0, self.velocities[0] - 0.1)
+        if arena is None:
+            lo, hi = (-math.inf, -math.inf), (math.inf, math.inf)
         else:
-            self.velocities[0] = min(0, self.velocities[0] + 0.1)
-        self.pos[0] += ((self.pos[0] + self.velocities[0]) - self.pos[0]) * 0.9
-        self.pos[1] += ((self.pos[1] + self.velocities[1]) - self.pos[1]) * 0.9
-
-        self.collider_cooldown = max(0, self.collider_cooldown - 1)
-        # if abs(self.velocities[0] <= 0.01):
-        #     self.velocities[0] = 0
-        # if abs(self.velocities[1] <= 0.01):
-        #     self.velocities[1] = 0
+            lo, hi = arena_bounds(self.size, *arena)
+            lo, hi = lo.tolist(), hi.tolist()
+        accel = self.acceleration()
+        contacts = advance_one(self.pos, self.velocities, accel, self.terminal_velocities, lo, hi, dt, self.forces.values())
+        self.sleep.settle_one(self.pos, self.velocities, accel, lo, hi, dt)
+        return contacts
@@ -0,0 +1,237 @@
+import numpy as np
+
+from scripts.broadphase import SpatialHash, circle_contacts, resolve_circle_contacts
+from scripts.forces import Force
+from scripts.ccd import advance, arena_bounds, NO_CONTACTS
+from scripts.physicsobj import REFERENCE_DT
+from scripts.sleep import SleepState
+
+
+class Bodies:
+    """
+    Structure-of-arrays store for many bodies sharing one set of forces.
+
+    Row i of pos / velocities / size / terminal_velocities is body i.
+    The public arrays are views over the first `count` rows of
+    preallocated storage, so forces can update them in place. Bodies that
+    come to rest are put to sleep and skipped by update() until something
+    wakes them (see SleepState). With collide, bodies are also circles of
+    diameter size[:, 0] that push apart and bounce off each other after
+    every step (scripts.broadphase); leave it off for stores of
+    independent runs such as a sweep.
+    """
+
+    def __init__(self, forces : dict[str, Force], capacity : int=64, collide : bool=False) -> None:
+        self.forces = dict(forces)
+        self.count = 0
+        self.collide = collide
+        self.grid = None
+        self.body_contacts = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))   # (a, b) of the last step
+        self.sleep = SleepState(max(1, capacity))
+        self._alloc(max(1, capacity))
+
+    def _alloc(self, capacity : int) -> None:
+        old = getattr(self, "_pos", None)
+        self.capacity = capacity
+
+        self._pos = np.zeros((capacity, 2), dtype=np.float64)
+        self._velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self._size = np.zeros((capacity, 2), dtype=np.float64)
+        self._terminal_velocities = np.zeros((capacity, 2), dtype=np.float64)
+
+        if old is not None:
+            n = self.count
+            self._pos[:n] = self.pos
+            self._velocities[:n] = self.velocities
+            self._size[:n] = self.size
+            self._terminal_velocities[:n] = self.terminal_velocities
+            self.sleep.resize(capacity, n)
+        self._views()
+
+    def _views(self) -> None:
+        n = self.count
+        self.pos = self._pos[:n]
+        self.velocities = self._velocities[:n]
+        self.size = self._size[:n]
+        self.terminal_velocities = self._terminal_velocities[:n]
+
+    def add(self, pos : list[float], size : list[int], terminal_velocities : list[float], velocities : list[float]=(0, 0)) -> int:
+        if self.count == self.capacity:
+            self._alloc(self.capacity * 2)
+
+        i = self.count
+        self._pos[i] = pos
+        self._size[i] = size
+        self._terminal_velocities[i] = terminal_velocities
+        self._velocities[i] = velocities
+        self.sleep.wake(i)
+        self.count += 1
+        self._views()
+        return i
+
+    def add_many(self, pos, size, terminal_velocities, velocities=(0, 0)) -> None:
+        """
+        Appends len(pos) bodies at once; the other arguments broadcast.
+        """
+        n = len(pos)
+        if self.count + n > self.capacity:
+            self._alloc(max(self.capacity * 2, self.count + n))
+
+        rows = slice(self.count, self.count + n)
+        self._pos[rows] = pos
+        self._size[rows] = size
+        self._terminal_velocities[rows] = terminal_velocities
+        self._velocities[rows] = velocities
+        self.sleep.wake(rows)
+        self.count += n
+        self._views()
+
+    def acceleration(self) -> np.ndarray:
+        accel = np.zeros((self.count, 2), dtype=np.float64)
+        for force in self.forces.values():
+            ax, ay = force.acceleration()
+            accel[:, 0] += ax
+            accel[:, 1] += ay
+        return accel
+
+    @property
+    def sleeping_count(self) -> int:
+        return self.sleep.sleeping(self.count)
+
+    @property
+    def awake_count(self) -> int:
+        return self.count - self.sleeping_count
+
+    def update(self, dt : float=REFERENCE_DT, arena=None) -> np.ndarray:
+        """
+        Same rules as Ball.update for every awake body in one pass, then
+        body-body contacts with collide. Returns the wall contacts of the
+        step, body indices are rows of this store.
+        """
+        rows = self.sleep.awake_rows(self.pos, self.velocities, self.forces.values(), arena)
+        if rows is not None and not len(rows):
+            contacts = NO_CONTACTS
+        else:
+            lo, hi = arena_bounds(self.size, *arena) if arena is not None else (-np.inf, np.inf)
+            accel = self.acceleration()
+            contacts = advance(self.pos, self.velocities, accel, self.terminal_velocities,
+                               lo, hi, dt, self.forces.values(), rows=rows)
+            self.sleep.settle(rows, self.pos, self.velocities, accel, lo, hi, dt)
+            if self.collide and self.count > 1:
+                self.collide_bodies()
+        return contacts
+
+    def collide_bodies(self) -> None:
+        """
+        Finds overlapping bodies through a spatial hash with cells as large
+        as the largest body and resolves them as equal-mass circles. A body
+        pushed through a wall is put back by the next step. Pairs of
+        sleepers are skipped (they came to rest as they are); both bodies
+        of every resolved contact are woken, so a body landing on a
+        sleeper sets it moving.
+        """
+        diameter = float(self.size[:, 0].max())
+        if self.grid is None or self.grid.cell_size < diameter:
+            self.grid = SpatialHash(diameter)
+        self.grid.update(self.pos)
+        a, b = self.grid.candidate_pairs()
+        asleep = self.sleep.asleep[:self.count]
+        if asleep.any():
+            awake = ~(asleep[a] & asleep[b])
+            a, b = a[awake], b[awake]
+        a, b, normal, depth = circle_contacts(self.pos, self.size[:, 0] / 2, a, b)
+        if len(a):
+            resolve_circle_contacts(self, a, b, normal, depth)
+            self.sleep.wake(np.concatenate((a, b)))
+        self.body_contacts = (a, b)
+
+
+if __name__ == "__main__":
+    # Benchmark: bodies advanced per millisecond, Ball loop vs Bodies; then
+    # step time in a settled scene with and without sleeping, and with and
+    # without body-body collisions.
+    import math
+    import time
+    from scripts.ball import Ball
+    from scripts.gravity import Gravity
+    from scripts.bounce import Bounce
+    from scripts.wind import Wind
+
+    W, H = 450, 500
+    STEPS = 50
+
+    def make_forces():
+        return {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}
+
+    def step_balls(balls):
+        for ball in balls:
+            ball.update(arena=(W, H))
+
+    rng = np.random.default_rng(0)
+    print(f"{'bodies':>8} {'Ball /ms':>10} {'Bodies /ms':>11} {'speedup':>8}")
+    for n in (10, 100, 1000, 5000):
+        starts = rng.uniform([20, 20], [W - 20, H - 20], size=(n, 2))
+
+        balls = [Ball(list(p), (30, 30), (10, 10), make_forces()) for p in starts]
+        t0 = time.perf_counter()
+        for _ in range(STEPS):
+            step_balls(balls)
+        ball_ms = (time.perf_counter() - t0) * 1000
+
+        bodies = Bodies(make_forces(), capacity=n)
+        for p in starts:
+            bodies.add(p, (30, 30), (10, 10))
+        t0 = time.perf_counter()
+        for _ in range(STEPS):
+            bodies.update(arena=(W, H))
+        bodies_ms = (time.perf_counter() - t0) * 1000
+
+        ball_rate = n * STEPS / ball_ms
+        bodies_rate = n * STEPS / bodies_ms
+        print(f"{n:>8} {ball_rate:>10.1f} {bodies_rate:>11.1f} {bodies_rate / ball_rate:>7.1f}x")
+
+    print(f"\nsettled scene: bodies dropped, 20 s simulated, then {STEPS * 4} steps timed")
+    print(f"{'bodies':>8} {'asleep':>7} {'no sleep ms/step':>17} {'sleep ms/step':>14} {'speedup':>8}")
+    for n in (100, 1000, 10000):
+        starts = rng.uniform([20, 20], [W - 20, H - 20], size=(n, 2))
+        speeds = rng.uniform(-5, 5, (n, 2))
+        times = []
+        for sleeping in (False, True):
+            bodies = Bodies({"gravity" : Gravity(0.3), "bounce" : Bounce(0.5)}, capacity=n)
+            if not sleeping:
+                bodies.sleep = SleepState(n, delay=math.inf)
+            bodies.add_many(starts, (30, 30), (10, 10), speeds)
+            for _ in range(round(20 / REFERENCE_DT)):
+                bodies.update(arena=(W, H))
+            t0 = time.perf_counter()
+            for _ in range(STEPS * 4):
+                bodies.update(arena=(W, H))
+            times.append((time.perf_counter() - t0) * 1000 / (STEPS * 4))
+        print(f"{n:>8} {bodies.sleeping_count:>7} {times[0]:>17.3f} {times[1]:>14.3f} {times[0] / times[1]:>7.1f}x")
+
+    n = 1000
+    starts = rng.uniform([20, 20], [W - 20, H - 20], size=(n, 2))
+    speeds = rng.uniform(-5, 5, (n, 2))
+    times = []
+    for collide in (False, True):
+        bodies = Bodies(make_forces(), capacity=n, collide=collide)
+        bodies.add_many(starts, (10, 10), (10, 10), speeds)
+        t0 = time.perf_counter()
+        for _ in range(STEPS):
+            bodies.update(arena=(W, H))
+        times.append((time.perf_counter() - t0) * 1000 / STEPS)
+    print(f"{n} moving bodies: {times[0]:.3f} ms/step, {times[1]:.3f} with collide ({len(bodies.body_contacts[0])} contacts)")
+
+    ball = Ball([W / 2, H / 2], (30, 30), (10, 10), make_forces())
+    for _ in range(round(20 / REFERENCE_DT)):
+        ball.update(arena=(W, H))
+    t0 = time.perf_counter()
+    for _ in range(STEPS * 20):
+        ball.update(arena=(W, H))
+    asleep_us = (time.perf_counter() - t0) * 1e6 / (STEPS * 20)
+    ball.sleep = SleepState(delay=math.inf)
+    t0 = time.perf_counter()
+    for _ in range(STEPS * 20):
+        ball.update(arena=(W, H))
+    awake_us = (time.perf_counter() - t0) * 1e6 / (STEPS * 20)
+    print(f"resting Ball.update: {awake_us:.1f} us awake, {asleep_us:.1f} us asleep")
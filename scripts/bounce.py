@@ -1,4 +1,5 @@
-from scripts.physicsobj import PhysicsObj
+import numpy as np
+
 from scripts.forces import Force
 
 class Bounce(Force):
@@ -6,9 +7,7 @@ class Bounce(Force):
     def __init__(self, damping_force : float):
         super().__init__(damping_force)
 
-    def apply_force(self, physics_obj :PhysicsObj, args : set[str]=()):
-
-        if "apply_bounce_x" in args:
-            physics_obj.velocities[0] *= -self.force
-        elif "apply_bounce_y" in args:
-            physics_obj.velocities[1] *= -self.force
\ No newline at end of file
+    def on_contact(self, velocities, body, axis):
+        # reflect the normal velocity, losing 1 - force of it
+        force = np.asarray(self.force)
+        velocities[body, axis] *= -(force[body] if force.ndim else force)
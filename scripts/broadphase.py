@@ -0,0 +1,175 @@
+import numpy as np
+
+# --- CONFIGURATION ---
+# cell keys pack (cx, cy) into one int64: cx * KEY_STRIDE + cy
+KEY_STRIDE = 1 << 21
+KEY_OFFSET = 1 << 20     # keeps cy positive for slightly negative positions
+
+# half stencil: every neighbouring cell pair is visited exactly once
+PAIR_STENCIL  = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+QUERY_STENCIL = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+
+def _ranges(lo, hi):
+    """
+    Expand per-row [lo, hi) ranges into (row, index) pairs without a Python loop.
+    """
+    cnt = np.maximum(hi - lo, 0)
+    total = int(cnt.sum())
+    rows = np.repeat(np.arange(len(lo)), cnt)
+    starts = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+    return rows, starts + np.arange(total)
+
+
+class SpatialHash:
+    """
+    Uniform grid broad phase over body centres.
+
+    Bodies are kept as a list of indices sorted by cell key. Each update
+    re-sorts starting from last step's order, so when only a few bodies
+    change cell the stable sort is close to a single linear pass.
+    cell_size should be at least the largest body diameter.
+    """
+
+    def __init__(self, cell_size : float) -> None:
+        self.cell_size = float(cell_size)
+        self.body_keys = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+
+    def cell_keys(self, points : np.ndarray) -> np.ndarray:
+        cells = np.floor(np.asarray(points) / self.cell_size).astype(np.int64)
+        return cells[:, 0] * KEY_STRIDE + (cells[:, 1] + KEY_OFFSET)
+
+    def update(self, pos : np.ndarray) -> None:
+        keys = self.cell_keys(pos)
+
+        if len(keys) != len(self.body_keys):
+            self.order = np.argsort(keys, kind="stable")
+        elif np.any(keys != self.body_keys):
+            self.order = self.order[np.argsort(keys[self.order], kind="stable")]
+
+        self.body_keys = keys
+        self.sorted_keys = keys[self.order]
+
+    def candidate_pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Body index pairs (a, b) sharing a cell or touching cells, each pair once.
+        """
+        n = len(self.order)
+        keys = self.sorted_keys
+        a_all, b_all = [], []
+
+        for dx, dy in PAIR_STENCIL:
+            target = keys + (dx * KEY_STRIDE + dy)
+            hi = np.searchsorted(keys, target, "right")
+            if dx == 0 and dy == 0:
+                lo = np.arange(1, n + 1)
+            else:
+                lo = np.searchsorted(keys, target, "left")
+            rows, idx = _ranges(lo, hi)
+            a_all.append(self.order[rows])
+            b_all.append(self.order[idx])
+
+        return np.concatenate(a_all), np.concatenate(b_all)
+
+    def query_points(self, points : np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate (point index, body index) pairs for arbitrary query points,
+        e.g. hand landmarks in display pixels.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        keys = self.sorted_keys
+        base = self.cell_keys(points)
+        p_all, b_all = [], []
+
+        for dx, dy in QUERY_STENCIL:
+            target = base + (dx * KEY_STRIDE + dy)
+            lo = np.searchsorted(keys, target, "left")
+            hi = np.searchsorted(keys, target, "right")
+            rows, idx = _ranges(lo, hi)
+            p_all.append(rows)
+            b_all.append(self.order[idx])
+
+        return np.concatenate(p_all), np.concatenate(b_all)
+
+
+# --- NARROW PHASE (circles) ---
+def circle_contacts(pos, radius, a, b):
+    """
+    Keeps the candidate pairs whose circles overlap.
+    Returns (a, b, normal from a to b, penetration depth).
+    """
+    delta = pos[b] - pos[a]
+    dist = np.hypot(delta[:, 0], delta[:, 1])
+    depth = radius[a] + radius[b] - dist
+    hit = depth > 0
+
+    a, b, delta, dist, depth = a[hit], b[hit], delta[hit], dist[hit], depth[hit]
+    normal = np.zeros_like(delta)
+    np.divide(delta, dist[:, None], out=normal, where=dist[:, None] > 0)
+    normal[dist == 0] = (1, 0)
+    return a, b, normal, depth
+
+def point_contacts(points, pos, radius, p, b):
+    """
+    Keeps the candidate (point, body) pairs where the point lies inside the circle.
+    """
+    delta = pos[b] - np.asarray(points, dtype=np.float64).reshape(-1, 2)[p]
+    hit = np.einsum("ij,ij->i", delta, delta) <= radius[b] ** 2
+    return p[hit], b[hit]
+
+def resolve_circle_contacts(bodies, a, b, normal, depth, restitution=0.9):
+    """
+    Equal-mass response: pushes overlapping bodies apart and exchanges the
+    approaching part of their velocity along the contact normal.
+    """
+    push = normal * (depth / 2)[:, None]
+    np.subtract.at(bodies.pos, a, push)
+    np.add.at(bodies.pos, b, push)
+
+    rel = np.einsum("ij,ij->i", bodies.velocities[b] - bodies.velocities[a], normal)
+    approaching = rel < 0
+    impulse = normal[approaching] * (-(1 + restitution) * rel[approaching] / 2)[:, None]
+    np.subtract.at(bodies.velocities, a[approaching], impulse)
+    np.add.at(bodies.velocities, b[approaching], impulse)
+
+
+if __name__ == "__main__":
+    # Benchmark: broad + narrow phase at constant density, growing body count.
+    import time
+
+    SIZE = 12
+    DENSITY = 1 / (4 * SIZE * SIZE)     # bodies per square pixel
+    STEPS = 20
+    rng = np.random.default_rng(0)
+
+    print(f"{'bodies':>8} {'step ms':>9} {'us/body':>9} {'contacts':>9} {'hand hits':>10} {'brute ms':>9}")
+    for n in (500, 1000, 2000, 4000, 8000):
+        side = np.sqrt(n / DENSITY)
+        pos = rng.uniform(0, side, size=(n, 2))
+        vel = rng.normal(0, 1, size=(n, 2))
+        radius = np.full(n, SIZE / 2)
+        hand = rng.uniform(0, side, size=(42, 2))
+
+        grid = SpatialHash(SIZE)
+        grid.update(pos)
+        t0 = time.perf_counter()
+        for _ in range(STEPS):
+            pos += vel
+            grid.update(pos)
+            a, b = grid.candidate_pairs()
+            a, b, normal, depth = circle_contacts(pos, radius, a, b)
+            p, hb = grid.query_points(hand)
+            p, hb = point_contacts(hand, pos, radius, p, hb)
+        step_ms = (time.perf_counter() - t0) * 1000 / STEPS
+
+        brute = "-"
+        if n <= 2000:
+            t0 = time.perf_counter()
+            d = np.linalg.norm(pos[:, None] - pos[None], axis=2)
+            ia, ib = np.nonzero(np.triu(d < radius[:, None] + radius[None], 1))
+            brute = f"{(time.perf_counter() - t0) * 1000:.2f}"
+            assert {tuple(sorted(x)) for x in zip(a, b)} == set(zip(ia, ib))
+
+        print(f"{n:>8} {step_ms:>9.2f} {step_ms * 1000 / n:>9.2f} {len(a):>9} {len(p):>10} {brute:>9}")
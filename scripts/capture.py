@@ -0,0 +1,196 @@
+import math
+import numpy as np
+
+from scripts.logger import get_logger_info
+
+# --- CONFIGURATION ---
+CAPTURE_SIZE    = (640, 480)          # (width, height) requested from the device
+CAPTURE_FPS     = 30
+CAPTURE_FORMATS = ("MJPG", "YUYV")    # tried in order; MJPG keeps 640x480 @ 30 within USB 2 bandwidth
+FRAME_SLOTS     = 2                   # a frame stays valid until the read after next
+
+
+def decode_fourcc(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+def negotiate(cap, size=CAPTURE_SIZE, fps=CAPTURE_FPS, formats=CAPTURE_FORMATS):
+    """
+    Asks the device for the first pixel format it accepts, then the frame
+    size and rate (V4L2 wants the format first). Returns what the driver
+    actually settled on as ((width, height), fps, fourcc); properties the
+    backend does not report fall back to the request.
+    """
+    import cv2
+    fourcc = ""
+    for name in formats:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*name))
+        if decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)) == name:
+            fourcc = name
+            break
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    # keep the driver queue short so we never run inference on stale frames
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or size[0], int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or size[1])
+    actual_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    fourcc = fourcc or decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)).strip("\x00")
+    if actual != tuple(size) or fourcc not in formats:
+        get_logger_info('CORE', f'CAMERA NEGOTIATED {actual[0]}x{actual[1]} @ {actual_fps:g} FPS {fourcc or "?"}', True)
+    return actual, actual_fps, fourcc
+
+
+class Scratch:
+    """
+    Reusable destination buffers for per-frame image ops. get(name, shape)
+    returns a contiguous view into a flat buffer that only ever grows, so
+    crops that change size every frame still reuse the same memory.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        size = math.prod(shape)
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(size, dtype=dtype)
+            self.allocations += 1
+        return buf[:size].reshape(shape)
+
+
+class Capture:
+    """
+    A negotiated VideoCapture reading into FRAME_SLOTS preallocated frames.
+
+    read() has the VideoCapture signature but returns read-only views of
+    the slots, so nothing downstream can scribble on a frame and nothing
+    allocates per frame. frames_copied counts frames the driver delivered
+    in a buffer of its own (size mismatch, backends that ignore the
+    destination) that had to be copied into a slot; allocations counts
+    frame-sized buffers created over the capture's lifetime.
+    """
+
+    def __init__(self, cap, size=CAPTURE_SIZE, fps=CAPTURE_FPS, formats=CAPTURE_FORMATS, slots=FRAME_SLOTS):
+        self.cap = cap
+        self.size, self.fps, self.format = negotiate(cap, size, fps, formats)
+        width, height = self.size
+        self._slots = list(np.empty((slots, height, width, 3), dtype=np.uint8))
+        self._views = []
+        for slot in self._slots:
+            view = slot.view()
+            view.flags.writeable = False
+            self._views.append(view)
+
+        self.frames_read = 0
+        self.frames_copied = 0
+        self.allocations = 1
+
+    def read(self):
+        i = self.frames_read % len(self._slots)
+        slot = self._slots[i]
+        ret, img = self.cap.read(slot)
+        if not ret:
+            return False, None
+        if img is not slot and not np.shares_memory(img, slot):
+            self.frames_copied += 1
+            if img.shape == slot.shape:
+                np.copyto(slot, img)
+            else:
+                import cv2
+                cv2.resize(img, (slot.shape[1], slot.shape[0]), dst=slot)
+        self.frames_read += 1
+        return True, self._views[i]
+
+    def release(self):
+        self.cap.release()
+
+
+if __name__ == "__main__":
+    # Per-frame cost of the old path (cap.read() allocating a frame, then
+    # cvtColor allocating the RGB copy) against Capture + Scratch, with a
+    # VideoCapture stand-in that behaves like cv2's: it fills the given
+    # image when it fits and allocates otherwise. Bytes allocated are
+    # measured with tracemalloc (numpy reports its buffers to it) on a
+    # separate pass: the heap peak above the baseline during each frame.
+    import time
+    import tracemalloc
+    import cv2
+
+    FRAMES = 600
+
+    class FakeVideoCapture:
+        def __init__(self):
+            self.props = {}
+            self.source = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+            self.allocations = 0
+
+        def set(self, prop, value):
+            self.props[prop] = value
+            return True
+
+        def get(self, prop):
+            return self.props.get(prop, 0)
+
+        def read(self, image=None):
+            if image is None or image.shape != self.source.shape:
+                image = np.empty_like(self.source)
+                self.allocations += 1
+            np.copyto(image, self.source)
+            return True, image
+
+        def release(self):
+            pass
+
+    def old_path(cap):
+        converted = [0]
+        def frame():
+            _, img = cap.read()
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            converted[0] += 1
+        return frame, lambda: converted[0]
+
+    def new_path(cap):
+        capture, scratch = Capture(cap), Scratch()
+        def frame():
+            _, img = capture.read()
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=scratch.get("rgb", img.shape))
+            assert not img.flags.writeable
+        return frame, lambda: capture.allocations + scratch.allocations
+
+    cap = FakeVideoCapture()
+    capture = Capture(cap)
+    assert (capture.size, capture.format) == ((640, 480), "MJPG"), (capture.size, capture.format)
+
+    print(f"{FRAMES} frames 640x480, fake VideoCapture (time: best of 3)")
+    print(f"{'path':>6} {'us/frame':>9} {'frame buffers':>14} {'MB allocated':>13} {'KB/frame':>9}")
+    allocated = {}
+    for name, path in (("old", old_path), ("new", new_path)):
+        best = None
+        for _ in range(3):
+            cap = FakeVideoCapture()
+            frame, allocations = path(cap)
+            t0 = time.perf_counter()
+            for _ in range(FRAMES):
+                frame()
+            elapsed = time.perf_counter() - t0
+            best = min(best or elapsed, elapsed)
+        buffers = allocations() + cap.allocations
+
+        cap = FakeVideoCapture()
+        frame, _ = path(cap)
+        frame()     # first-frame buffers are set-up, not per-frame cost
+        tracemalloc.start()
+        total = 0
+        for _ in range(FRAMES):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            frame()
+            total += tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        allocated[name] = total
+        print(f"{name:>6} {best / FRAMES * 1e6:>9.0f} {buffers:>14} {total / 1e6:>13.1f} {total / FRAMES / 1e3:>9.1f}")
+    assert allocated["new"] < allocated["old"] / 100, allocated
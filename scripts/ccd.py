@@ -0,0 +1,486 @@
+import math
+import numpy as np
+
+from scripts.physicsobj import REFERENCE_DT, DRAG, DAMPING
+
+# --- CONFIGURATION ---
+EPS_TIME    = 1e-9     # reference steps; roots closer than this are the contact just handled
+EPS_DIST    = 1e-9     # px; bodies closer than this to a wall are on it
+REST_SPEED  = 0.05     # px per reference step; slower bounces into a pushing force come to rest
+MAX_EVENTS  = 256      # events resolved per step before the rest of it is clamped (settling bounces need many)
+SCALAR_ROWS = 8        # bodies with events left at or below this count finish in plain floats
+
+# one row per wall contact: body index, seconds into the step, axis (0 x, 1 y),
+# side (-1 low wall, +1 high wall) and the normal speed before the response
+CONTACT_DTYPE = np.dtype([("body", "<i4"), ("time", "<f8"), ("axis", "u1"), ("side", "i1"), ("speed", "<f8")])
+NO_CONTACTS = np.zeros(0, dtype=CONTACT_DTYPE)
+
+
+# --- CONTINUOUS MODEL ---
+# Time runs in reference steps. Per axis, within one step:
+#   dx/dt = DAMPING * v
+#   dv/dt = a - drag * sign(v)         (drag on x only; at v = 0 it holds v unless |a| > drag)
+#   |v| <= terminal                    (saturates instead of overshooting)
+# The acceleration is piecewise constant between events (v reaches 0, v reaches
+# terminal, a wall is hit), so every segment is integrated exactly and the
+# result does not depend on how a stretch of time is cut into steps.
+
+def arena_bounds(size, width, height):
+    """
+    Low / high centre positions inside a width x height arena, the walls the
+    old overlap checks clamped to.
+    """
+    half = np.asarray(size, dtype=np.float64) // 2
+    lo = half
+    hi = np.array([width, height], dtype=np.float64) - half - 1
+    return lo, hi
+
+def _effective_accel(v, a, drag, terminal, at_lo, at_hi):
+    moving = v != 0
+    acc = a - drag * np.sign(v)
+    # stopped axes (rare while bodies fly): held by stiction unless pushed past it
+    still = ~moving
+    if still.any():
+        push = np.where(np.abs(a) > drag, a - drag * np.sign(a), 0.0)
+        acc = np.where(moving, acc, push)
+        # resting against a wall it is pushed into
+        acc[still & ((at_lo & (acc < 0)) | (at_hi & (acc > 0)))] = 0
+    # saturated at terminal velocity
+    acc[((v >= terminal) & (acc > 0)) | ((v <= -terminal) & (acc < 0))] = 0
+    return acc
+
+def at_rest(pos, vel, accel, lo, hi, speed, drag=(DRAG, 0.0)):
+    """
+    Bodies slower than `speed` on both axes that nothing would set moving
+    again once stopped: pushed into a wall, held by stiction or under no
+    net force. Shapes as in advance().
+    """
+    n = len(pos)
+    drag = np.broadcast_to(np.asarray(drag, dtype=np.float64), (n, 2))
+    accel = np.broadcast_to(accel, (n, 2))
+    stopped = np.zeros((n, 2))
+    acc = _effective_accel(stopped, accel, drag, np.inf, pos <= lo, pos >= hi)
+    return (np.abs(vel) < speed).all(axis=1) & (acc == 0).all(axis=1)
+
+def _first_root(acc, v, dist):
+    """
+    Smallest t > EPS_TIME with DAMPING * (v t + acc t^2 / 2) = dist, inf if none.
+    """
+    dist = dist / DAMPING
+    sign = np.where(v >= 0, 1.0, -1.0)
+    disc = v * v + 2 * acc * dist
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = -(v + sign * np.sqrt(np.maximum(disc, 0))) / 2
+        t1 = np.where(acc != 0, 2 * q / acc, np.inf)
+        t2 = np.where(q != 0, -dist / q, np.inf)
+    ok = disc >= 0
+    t1 = np.where(ok & (t1 > EPS_TIME), t1, np.inf)
+    t2 = np.where(ok & (t2 > EPS_TIME), t2, np.inf)
+    return np.minimum(t1, t2)
+
+def _wall_times(pos, v, acc, lo, hi, remaining):
+    """
+    First impact times with the low and high walls. Only bodies that could
+    reach a wall within remaining are solved for, the rest get inf.
+    """
+    t_lo = np.full(pos.shape, np.inf)
+    t_hi = np.full(pos.shape, np.inf)
+    rem = remaining[:, None]
+    reach = DAMPING * (np.abs(v) * rem + np.abs(acc) * rem * rem / 2)
+    near = np.nonzero((pos - lo <= reach) | (hi - pos <= reach))
+    if len(near[0]):
+        pn, vn, an = pos[near], v[near], acc[near]
+        t_lo[near] = _first_root(an, vn, lo[near] - pn)
+        t_hi[near] = _first_root(an, vn, hi[near] - pn)
+    return t_lo, t_hi
+
+def _velocity_events(v, acc, terminal):
+    """
+    Times until v comes to a stop against its motion and until it reaches
+    +-terminal, inf if never.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stop = np.where((v != 0) & (v * acc < 0), -v / acc, np.inf)
+        # a step may end a rounding error short of terminal: that is a
+        # saturation event at ~0, not one to skip
+        sat = np.where(acc != 0, np.maximum((np.sign(acc) * terminal - v) / acc, 0), np.inf)
+    return stop, sat
+
+def advance(pos, vel, accel, terminal, lo, hi, dt, forces=(), drag=(DRAG, 0.0), rows=None):
+    """
+    Advances pos / vel ((n, 2) float arrays, in place) by dt seconds under
+    constant accel ((n, 2), px per reference step squared) with exact
+    time-of-impact wall contacts between lo and hi (broadcast to (n, 2),
+    +-inf for no wall). Every contact calls force.on_contact(vel, body, axis)
+    on each force at the moment of impact, so several bounces per step come
+    out right. rows (sorted indices) limits the step to those bodies, the
+    others are left untouched. Returns the contacts as a CONTACT_DTYPE array.
+
+    Up to SCALAR_ROWS bodies are stepped in plain floats (see the scalar
+    path below), and so are the last few bodies still having events once
+    the rest have finished their step.
+    """
+    n = len(pos)
+    if n == 0 or (rows is not None and len(rows) == 0):
+        return NO_CONTACTS
+    lo = np.broadcast_to(lo, (n, 2))
+    hi = np.broadcast_to(hi, (n, 2))
+    terminal = np.broadcast_to(terminal, (n, 2))
+    drag = np.broadcast_to(np.asarray(drag, dtype=np.float64), (n, 2))
+    accel = np.broadcast_to(accel, (n, 2))
+
+    if rows is None:
+        idx = np.arange(n)
+        p, v, a, l, h, term, dr = pos, vel, accel, lo, hi, terminal, drag
+        if n <= SCALAR_ROWS:
+            return _scalar_rows(pos, vel, accel, terminal, lo, hi, drag, dt, idx, forces)
+    else:
+        idx = np.asarray(rows)
+        if len(idx) <= SCALAR_ROWS:
+            return _scalar_rows(pos, vel, accel, terminal, lo, hi, drag, dt, idx, forces)
+        p, v, a, l, h, term, dr = pos[idx], vel[idx], accel[idx], lo[idx], hi[idx], terminal[idx], drag[idx]
+    np.clip(v, -term, term, out=v)
+    events = []
+
+    # start inside the arena; bodies pushed through a wall hit it at time 0
+    contacts = _resolve_walls(p, v, a, l, h, dr, idx, vel, forces)
+    if contacts is not None:
+        events.append((*contacts, np.zeros(len(contacts[0]))))
+
+    # most bodies finish in one segment; later rounds only carry the ones
+    # with events left, copied out and written back as they finish
+    remaining = np.full(len(idx), dt / REFERENCE_DT)
+    for segment in range(MAX_EVENTS):
+        acc = _effective_accel(v, a, dr, term, p <= l, p >= h)
+        t_stop, t_sat = _velocity_events(v, acc, term)
+        t_lo, t_hi = _wall_times(p, v, acc, l, h, remaining)
+        tau = np.minimum(remaining, np.minimum(np.minimum(t_stop, t_sat), np.minimum(t_lo, t_hi)).min(axis=1))
+        t = tau[:, None]
+
+        p += DAMPING * (v * t + acc * t * t / 2)
+        sat_to = np.sign(acc) * term
+        v += acc * t
+        # snap the events that ended this segment, and bodies that ended it a
+        # hair from a wall, so rounding cannot skip the bounce
+        stopped, saturated = t_stop <= t, t_sat <= t
+        v[stopped] = 0
+        v[saturated] = sat_to[saturated]
+        on_lo = (t_lo <= t) | (np.abs(p - l) < EPS_DIST)
+        on_hi = (t_hi <= t) | (np.abs(p - h) < EPS_DIST)
+        p[on_lo] = l[on_lo]
+        p[on_hi] = h[on_hi]
+        np.clip(v, -term, term, out=v)
+
+        elapsed = (dt / REFERENCE_DT - remaining + tau) * REFERENCE_DT
+        remaining -= tau
+        contacts = _resolve_walls(p, v, a, l, h, dr, idx, vel, forces)
+        if contacts is not None:
+            events.append((*contacts, elapsed[np.searchsorted(idx, contacts[0])]))
+
+        keep = remaining > EPS_TIME
+        if not keep.all():
+            if p is not pos:
+                pos[idx] = p
+                vel[idx] = v
+            if not keep.any():
+                break
+            idx, remaining = idx[keep], remaining[keep]
+            if len(idx) <= SCALAR_ROWS:
+                tail = []
+                for body, left in zip(idx.tolist(), remaining.tolist()):
+                    pb, vb = pos[body].tolist(), vel[body].tolist()
+                    tail += _advance_one(pb, vb, accel[body].tolist(), terminal[body].tolist(), lo[body].tolist(),
+                                         hi[body].tolist(), drag[body].tolist(), dt / REFERENCE_DT, left, body,
+                                         vel, forces, MAX_EVENTS - segment - 1)
+                    pos[body], vel[body] = pb, vb
+                if tail:
+                    tail = np.array(tail, dtype=CONTACT_DTYPE)
+                    events.append((tail["body"], tail["axis"], tail["side"], tail["speed"], tail["time"]))
+                break
+            p, v, a, l, h, term, dr = pos[idx], vel[idx], accel[idx], lo[idx], hi[idx], terminal[idx], drag[idx]
+    else:
+        # event budget spent (e.g. a body jammed between two walls): finish the step clamped
+        t = remaining[:, None]
+        acc = _effective_accel(v, a, dr, term, p <= l, p >= h)
+        p += DAMPING * (v * t + acc * t * t / 2)
+        v += acc * t
+        np.clip(v, -term, term, out=v)
+        np.clip(p, l, h, out=p)
+        pos[idx] = p
+        vel[idx] = v
+
+    if not events:
+        return NO_CONTACTS
+    out = np.zeros(sum(len(e[0]) for e in events), dtype=CONTACT_DTYPE)
+    i = 0
+    for body, axis, side, speed, at in events:
+        j = i + len(body)
+        out["body"][i:j], out["axis"][i:j], out["side"][i:j] = body, axis, side
+        out["speed"][i:j], out["time"][i:j] = speed, at
+        i = j
+    return out
+
+def _resolve_walls(pos, vel, accel, lo, hi, drag, idx, velocities, forces):
+    """
+    Snaps bodies at or past a wall onto it and lets the forces respond to
+    the ones still moving outward. pos / vel ... are rows idx of the
+    caller's arrays; forces see the full velocities array and body indices.
+    Returns (body, axis, side, speed) or None.
+    """
+    low = (pos <= lo) & (vel < 0)
+    high = (pos >= hi) & (vel > 0)
+    np.clip(pos, lo, hi, out=pos)
+    hit = low | high
+    if not hit.any():
+        return None
+
+    row, axis = np.nonzero(hit)
+    body = idx[row]
+    side = np.where(high[row, axis], 1, -1).astype(np.int8)
+    speed = np.abs(vel[row, axis])
+    velocities[body, axis] = vel[row, axis]
+    for force in forces:
+        force.on_contact(velocities, body, axis)
+    vel[row, axis] = velocities[body, axis]
+
+    # a slow bounce against a force pushing into the wall comes to rest on it
+    pushed = accel[row, axis] * side > drag[row, axis]
+    rest = pushed & (np.abs(vel[row, axis]) < REST_SPEED)
+    vel[row[rest], axis[rest]] = 0
+    return body, axis, side, speed
+
+# --- SCALAR PATH ---
+# The same event loop for one body in plain Python floats, operation for
+# operation, so it lands on the same bits as the array path. A numpy round
+# costs tens of microseconds whatever its size: a single Ball, and the few
+# bodies of a Bodies step still bouncing after the first rounds, are
+# cheaper here.
+
+INF = math.inf
+
+def _sign(x):
+    return 1.0 if x > 0 else -1.0 if x < 0 else 0.0
+
+def _effective_accel_one(v, a, drag, terminal, at_lo, at_hi):
+    if v != 0:
+        acc = a - drag * _sign(v)
+    else:
+        acc = a - drag * _sign(a) if abs(a) > drag else 0.0
+    if (v >= terminal and acc > 0) or (v <= -terminal and acc < 0):
+        acc = 0.0
+    if v == 0 and ((at_lo and acc < 0) or (at_hi and acc > 0)):
+        acc = 0.0
+    return acc
+
+def at_rest_one(pos, vel, accel, lo, hi, speed, drag=(DRAG, 0.0)):
+    """
+    at_rest() for one body in plain floats.
+    """
+    return all(abs(vel[i]) < speed and
+               _effective_accel_one(0.0, accel[i], drag[i], INF, pos[i] <= lo[i], pos[i] >= hi[i]) == 0
+               for i in (0, 1))
+
+def _first_root_one(acc, v, dist):
+    dist = dist / DAMPING
+    disc = v * v + 2 * acc * dist
+    if not disc >= 0:
+        return INF
+    q = -(v + (1.0 if v >= 0 else -1.0) * math.sqrt(disc)) / 2
+    t1 = 2 * q / acc if acc != 0 else INF
+    t2 = -dist / q if q != 0 else INF
+    return min(t1 if t1 > EPS_TIME else INF, t2 if t2 > EPS_TIME else INF)
+
+def _resolve_walls_one(pos, vel, accel, lo, hi, drag, body, velocities, forces):
+    """
+    _resolve_walls for one body: pos / vel are [x, y] lists. Returns a list
+    of (axis, side, speed), empty when nothing hit.
+    """
+    hits = []
+    for axis in (0, 1):
+        p, v = pos[axis], vel[axis]
+        side = 1 if p >= hi[axis] and v > 0 else -1 if p <= lo[axis] and v < 0 else 0
+        pos[axis] = min(max(p, lo[axis]), hi[axis])
+        if side:
+            hits.append((axis, side, abs(v)))
+    if not hits:
+        return hits
+
+    if velocities is None:
+        velocities = np.zeros((body + 1, 2))
+    rows = np.full(len(hits), body)
+    axes = np.array([axis for axis, _, _ in hits])
+    velocities[rows, axes] = [vel[axis] for axis in axes.tolist()]
+    for force in forces:
+        force.on_contact(velocities, rows, axes)
+    for axis, side, _ in hits:
+        v = float(velocities[body, axis])
+        vel[axis] = 0.0 if accel[axis] * side > drag[axis] and abs(v) < REST_SPEED else v
+    return hits
+
+def _advance_one(pos, vel, accel, terminal, lo, hi, drag, total, remaining, body, velocities, forces, budget):
+    """
+    The advance() loop for one body from `remaining` reference steps before
+    the end of a step of `total`, for at most `budget` segments. pos / vel
+    are [x, y] lists updated in place, the rest per-axis sequences. Returns
+    the contacts as (body, time, axis, side, speed) tuples.
+    """
+    out = []
+    for _ in range(budget):
+        acc, t_stop, t_sat, t_lo, t_hi = [0.0, 0.0], [INF, INF], [INF, INF], [INF, INF], [INF, INF]
+        tau = remaining
+        for i in (0, 1):
+            p, v, l, h, term = pos[i], vel[i], lo[i], hi[i], terminal[i]
+            ac = acc[i] = _effective_accel_one(v, accel[i], drag[i], term, p <= l, p >= h)
+            if v != 0 and v * ac < 0:
+                t_stop[i] = -v / ac
+            if ac != 0:
+                t_sat[i] = max((_sign(ac) * term - v) / ac, 0.0)
+            reach = DAMPING * (abs(v) * remaining + abs(ac) * remaining * remaining / 2)
+            if p - l <= reach or h - p <= reach:
+                t_lo[i] = _first_root_one(ac, v, l - p)
+                t_hi[i] = _first_root_one(ac, v, h - p)
+            tau = min(tau, t_stop[i], t_sat[i], t_lo[i], t_hi[i])
+
+        t = tau
+        for i in (0, 1):
+            ac, term = acc[i], terminal[i]
+            p = pos[i] + DAMPING * (vel[i] * t + ac * t * t / 2)
+            v = vel[i] + ac * t
+            if t_stop[i] <= t:
+                v = 0.0
+            if t_sat[i] <= t:
+                v = _sign(ac) * term
+            on_lo = t_lo[i] <= t or abs(p - lo[i]) < EPS_DIST
+            on_hi = t_hi[i] <= t or abs(p - hi[i]) < EPS_DIST
+            if on_lo:
+                p = lo[i]
+            if on_hi:
+                p = hi[i]
+            pos[i], vel[i] = p, min(max(v, -term), term)
+
+        elapsed = (total - remaining + tau) * REFERENCE_DT
+        remaining -= tau
+        for axis, side, speed in _resolve_walls_one(pos, vel, accel, lo, hi, drag, body, velocities, forces):
+            out.append((body, elapsed, axis, side, speed))
+        if remaining <= EPS_TIME:
+            return out
+
+    # event budget spent: finish the step clamped
+    t = remaining
+    for i in (0, 1):
+        ac = _effective_accel_one(vel[i], accel[i], drag[i], terminal[i], pos[i] <= lo[i], pos[i] >= hi[i])
+        p = pos[i] + DAMPING * (vel[i] * t + ac * t * t / 2)
+        v = vel[i] + ac * t
+        vel[i] = min(max(v, -terminal[i]), terminal[i])
+        pos[i] = min(max(p, lo[i]), hi[i])
+    return out
+
+def _step_one(pos, vel, accel, terminal, lo, hi, drag, dt, body, velocities, forces):
+    for i in (0, 1):
+        vel[i] = min(max(vel[i], -terminal[i]), terminal[i])
+    contacts = [(body, 0.0, axis, side, speed)
+                for axis, side, speed in _resolve_walls_one(pos, vel, accel, lo, hi, drag, body, velocities, forces)]
+    total = dt / REFERENCE_DT
+    return contacts + _advance_one(pos, vel, accel, terminal, lo, hi, drag, total, total, body, velocities, forces, MAX_EVENTS)
+
+def _scalar_rows(pos, vel, accel, terminal, lo, hi, drag, dt, idx, forces):
+    contacts = []
+    for body in idx.tolist():
+        p, v = pos[body].tolist(), vel[body].tolist()
+        contacts += _step_one(p, v, accel[body].tolist(), terminal[body].tolist(), lo[body].tolist(),
+                              hi[body].tolist(), drag[body].tolist(), dt, body, vel, forces)
+        pos[body], vel[body] = p, v
+    return np.array(contacts, dtype=CONTACT_DTYPE) if contacts else NO_CONTACTS
+
+def advance_one(pos, vel, accel, terminal, lo, hi, dt, forces=(), drag=(DRAG, 0.0)):
+    """
+    advance() for a single body held in [x, y] lists (pos / vel updated in
+    place, the rest per-axis pairs) in plain floats, for the same result
+    without the per-call cost of the array path.
+    """
+    contacts = _step_one(pos, vel, accel, terminal, lo, hi, drag, dt, 0, None, forces)
+    return np.array(contacts, dtype=CONTACT_DTYPE) if contacts else NO_CONTACTS
+
+
+if __name__ == "__main__":
+    # Step-size independence: the same runs stepped at 1x, 10x and 30x
+    # REFERENCE_DT agree at shared sample times (tests/test_ccd.py), where the old rule
+    # (overlap check, then one Euler step) drifts with the step size.
+    # Then several bounces inside one step, and throughput per step size.
+    import time
+    from scripts.bodies import Bodies
+    from scripts.gravity import Gravity
+    from scripts.bounce import Bounce
+    from scripts.wind import Wind
+
+    W, H = 450, 500
+    SECONDS = 10
+    rng = np.random.default_rng(0)
+    RUNS = 200
+    gravity = rng.uniform(-0.6, 0.6, RUNS)
+    bounce = rng.uniform(0.3, 1.0, RUNS)
+    wind = rng.uniform(-0.4, 0.4, (RUNS, 2))
+    starts = rng.uniform((20, 20), (W - 20, H - 20), (RUNS, 2))
+    speeds = rng.uniform(-10, 10, (RUNS, 2))
+
+    def make_forces():
+        return {"gravity" : Gravity(gravity), "bounce" : Bounce(bounce),
+                "wind_x" : Wind(wind[:, 0]), "wind_y" : Wind(wind[:, 1], "wind_y")}
+
+    def run(multiple, every):
+        bodies = Bodies(make_forces(), capacity=RUNS)
+        bodies.add_many(starts, (30, 30), (10, 10), speeds)
+        samples, contacts = [], 0
+        for i in range(round(SECONDS / REFERENCE_DT) // multiple):
+            contacts += len(bodies.update(REFERENCE_DT * multiple, (W, H)))
+            if (i + 1) * multiple % every == 0:
+                samples.append(bodies.pos.copy())
+        return np.array(samples), contacts
+
+    def run_euler(multiple, every):
+        # the pre-CCD rule: clamp overlapping bodies, flip the velocity, one explicit step
+        pos, vel = starts.copy(), speeds.copy()
+        steps, half = multiple, 15
+        samples = []
+        for i in range(round(SECONDS / REFERENCE_DT) // multiple):
+            bx = (pos[:, 0] + half >= W) | (pos[:, 0] - half <= 0)
+            by = ((pos[:, 1] + half >= H) | (pos[:, 1] - half <= 0)) & ~bx
+            np.clip(pos, half, (W - half - 1, H - half - 1), out=pos)
+            vel[bx, 0] *= -bounce[bx]
+            vel[by, 1] *= -bounce[by]
+            vel += np.stack([wind[:, 0], gravity + wind[:, 1]], axis=1) * steps
+            np.clip(vel, -10, 10, out=vel)
+            vel[:, 0] = np.where(vel[:, 0] >= 0, np.maximum(0, vel[:, 0] - DRAG * steps), np.minimum(0, vel[:, 0] + DRAG * steps))
+            pos += vel * DAMPING * steps
+            if (i + 1) * multiple % every == 0:
+                samples.append(pos.copy())
+        return np.array(samples)
+
+    EVERY = 30
+    ref, _ = run(1, EVERY)
+    euler_ref = run_euler(1, EVERY)
+    print(f"{RUNS} runs, {SECONDS} s, positions compared every {EVERY} reference steps")
+    print(f"{'step':>6} {'ccd max err px':>15} {'euler max err px':>17}")
+    for multiple in (1, 10, 30):
+        traj, _ = run(multiple, EVERY)
+        ccd_err = float(np.abs(traj - ref).max())
+        euler_err = float(np.abs(run_euler(multiple, EVERY) - euler_ref).max())
+        print(f"{multiple:>5}x {ccd_err:>15.2e} {euler_err:>17.1f}")
+
+    # a fast body in a corridor 4 px wider than itself bounces many times per step
+    pos, vel = np.array([[17.0, 100.0]]), np.array([[10.0, 0.0]])
+    hits = advance(pos, vel, np.zeros((1, 2)), np.array([10.0, 10.0]), np.array([15.0, 15.0]), np.array([19.0, 200.0]),
+                   REFERENCE_DT * 10, (Bounce(1.0),), drag=(0.0, 0.0))
+    print(f"corridor, one 10x step: {len(hits)} wall contacts at t = {np.round(hits['time'] * 1000, 2).tolist()} ms")
+
+    N = 10000
+    print(f"{N} bodies, {SECONDS} s simulated")
+    print(f"{'step':>6} {'steps':>6} {'ms':>8}")
+    for multiple in (1, 10):
+        bodies = Bodies({"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}, capacity=N)
+        bodies.add_many(rng.uniform((20, 20), (W - 20, H - 20), (N, 2)), (30, 30), (10, 10), rng.uniform(-10, 10, (N, 2)))
+        count = round(SECONDS / REFERENCE_DT) // multiple
+        t0 = time.perf_counter()
+        for _ in range(count):
+            bodies.update(REFERENCE_DT * multiple, (W, H))
+        print(f"{multiple:>5}x {count:>6} {(time.perf_counter() - t0) * 1000:>8.0f}")
@@ -1,20 +1,124 @@
 import pygame
 from abc import ABC, abstractmethod
 
+# --- COMPOSITOR CONFIGURATION ---
+FULL_REDRAW_RATIO = 0.5     # present the whole frame once dirty area passes this share
+DIRTY_PADDING     = 2       # px around each marked rect, covers antialiased edges
+
+
+class Compositor:
+    """
+    Two-layer compositing for the half-resolution display surface.
+
+    The static layer (banners, labels, slider tracks) is drawn once into
+    a cached surface and only redrawn after invalidate(). Dynamic content
+    is drawn straight onto the display each frame and reported through
+    mark(). begin() erases last frame's dynamic rects from the static
+    layer, and present() scales and presents only the changed regions,
+    falling back to a full-frame scale when that is cheaper or required.
+    """
+
+    def __init__(self, display : pygame.Surface, screen : pygame.Surface, full_redraw_ratio=FULL_REDRAW_RATIO):
+        self.display = display
+        self.screen = screen
+        self.full_redraw_ratio = full_redraw_ratio
+        self.static = pygame.Surface(display.get_size(), pygame.SRCALPHA)
+
+        self.static_valid = False
+        self.full = True
+        self.drawn : list[pygame.Rect] = []      # dynamic rects of the frame being built
+        self.erased : list[pygame.Rect] = []     # last frame's dynamic rects, restored in begin()
+
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def integer_scale(self):
+        sw, sh = self.screen.get_size()
+        dw, dh = self.display.get_size()
+        if sw % dw or sh % dh:
+            return None
+        return sw // dw, sh // dh
+
+    def invalidate(self):
+        """
+        Static layer content changed, rebuild it and present the full frame.
+        """
+        self.static_valid = False
+
+    def force_full(self):
+        self.full = True
+
+    def begin(self, draw_static):
+        if not self.static_valid:
+            self.static.fill((0, 0, 0))
+            draw_static(self.static)
+            self.static_valid = True
+            self.display.blit(self.static, (0, 0))
+            self.full = True
+            self.erased = []
+        else:
+            for r in self.drawn:
+                self.display.blit(self.static, r, r)
+            self.erased = self.drawn
+        self.drawn = []
+
+    def mark(self, rect):
+        if rect is not None:
+            self.drawn.append(pygame.Rect(rect).inflate(DIRTY_PADDING * 2, DIRTY_PADDING * 2).clip(self.display.get_rect()))
+
+    @staticmethod
+    def merge(rects):
+        merged : list[pygame.Rect] = []
+        for r in rects:
+            if not r.w or not r.h:
+                continue
+            r = r.copy()
+            i = r.collidelist(merged)
+            while i != -1:
+                r.union_ip(merged.pop(i))
+                i = r.collidelist(merged)
+            merged.append(r)
+        return merged
+
+    def present(self):
+        scale = self.integer_scale()
+        rects = self.merge(self.erased + self.drawn)
+        area = sum(r.w * r.h for r in rects)
+        full_area = self.display.get_width() * self.display.get_height()
+
+        if self.full or scale is None or area > full_area * self.full_redraw_ratio:
+            self.screen.blit(pygame.transform.scale(self.display, self.screen.get_size()), (0, 0))
+            pygame.display.update()
+            self.full = False
+            self.full_frames += 1
+            return
+
+        sx, sy = scale
+        screen_rects = []
+        for r in rects:
+            target = pygame.Rect(r.x * sx, r.y * sy, r.w * sx, r.h * sy)
+            self.screen.blit(pygame.transform.scale(self.display.subsurface(r), target.size), target)
+            screen_rects.append(target)
+        if screen_rects:
+            pygame.display.update(screen_rects)
+        self.partial_frames += 1
+
+
 class Engine(ABC):
 
     def __init__(self, dim=(600, 400), font_size=(20)):
         self.screen = pygame.display.set_mode(dim)
         self.display = pygame.Surface((dim[0]//2, dim[1]//2), pygame.SRCALPHA)
+        self.compositor = Compositor(self.display, self.screen)
 
         self.clock = pygame.time.Clock()
         pygame.init()
-        
+
         self.font = pygame.font.Font(size=font_size)
         pygame.font.init()
-    
+
     @abstractmethod
     def run(self):
         raise NotImplementedError
 
-        
+
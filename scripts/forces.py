@@ -1,11 +1,14 @@
-from scripts.physicsobj import PhysicsObj
-from abc import ABC, abstractmethod
-
 class Force:
 
     def __init__(self, force : float) -> None:
         self.force = force
-    
-    @abstractmethod
-    def apply_force(self, physics_obj, args : set[str]=set()) -> None:
-        raise NotImplementedError
\ No newline at end of file
+
+    def acceleration(self) -> tuple:
+        # constant (ax, ay) in px per REFERENCE_DT per REFERENCE_DT over a step;
+        # self.force may be an array with one value per body of a Bodies store
+        return 0.0, 0.0
+
+    def on_contact(self, velocities, body, axis) -> None:
+        # called by the integrator at the moment of each wall contact:
+        # velocities is the (n, 2) array, body / axis index the rows and axes that hit
+        pass
@@ -0,0 +1,343 @@
+import numpy as np
+
+from scripts.tracking import NUM_LANDMARKS
+
+# --- CONFIGURATION & INDICES ---
+HAND_LABELS     = ("LEFT", "RIGHT")
+GESTURE_HISTORY = 8          # landmark frames kept per hand
+VELOCITY_SPAN   = 3          # frames back the palm velocity is measured over
+
+WRIST_IDX       = 0
+THUMB_TIP_IDX   = 4
+INDEX_TIP_IDX   = 8
+MIDDLE_MCP_IDX  = 9
+PALM_IDX        = (0, 5, 9, 13, 17)
+# (tip, pip) per finger; a finger is extended when its tip is further from
+# the wrist than its pip joint
+FINGERS         = ((4, 2), (8, 6), (12, 10), (16, 14), (20, 18))
+
+PINCH_ON_THRESH    = 0.15    # thumb-index distance in hand scales
+PINCH_OFF_THRESH   = 0.20
+PINCH_FRAMES_REQ   = 3       # debounce frames
+EXTENDED           = 1.3     # tip / pip distance from the wrist
+CURLED             = 1.0
+SWIPE_SPEED        = 3.0     # hand scales per second
+FLICK_SPEED        = 8.0
+
+# --- FEATURES ---
+# one column per feature, computed for every hand in one pass; velocities
+# are in screen orientation (the camera image is mirrored for display)
+FEATURES = ("scale", "pinch", "thumb", "index", "middle", "ring", "pinky", "palm_vx", "palm_vy", "tip_speed")
+FEATURE_INDEX = {name : i for i, name in enumerate(FEATURES)}
+
+INF = float("inf")
+
+# name : (clauses, debounce frames); a clause is (feature, on band, off band).
+# A gesture turns on once every clause has been inside its on band for
+# `frames` observations and off once any clause has left its (wider) off
+# band for as many.
+DEFAULT_GESTURES = {
+    "pinch"       : ([("pinch", (-INF, PINCH_ON_THRESH), (-INF, PINCH_OFF_THRESH))], PINCH_FRAMES_REQ),
+    "open_palm"   : ([(f, (EXTENDED, INF), (CURLED, INF)) for f in ("index", "middle", "ring", "pinky")], 5),
+    "fist"        : ([(f, (-INF, CURLED), (-INF, EXTENDED)) for f in ("index", "middle", "ring", "pinky")], 5),
+    "swipe_left"  : ([("index", (EXTENDED, INF), (CURLED, INF)), ("middle", (EXTENDED, INF), (CURLED, INF)),
+                      ("ring", (-INF, CURLED), (-INF, EXTENDED)), ("pinky", (-INF, CURLED), (-INF, EXTENDED)),
+                      ("palm_vx", (-INF, -SWIPE_SPEED), (-INF, -SWIPE_SPEED / 2))], 2),
+    "swipe_right" : ([("index", (EXTENDED, INF), (CURLED, INF)), ("middle", (EXTENDED, INF), (CURLED, INF)),
+                      ("ring", (-INF, CURLED), (-INF, EXTENDED)), ("pinky", (-INF, CURLED), (-INF, EXTENDED)),
+                      ("palm_vx", (SWIPE_SPEED, INF), (SWIPE_SPEED / 2, INF))], 2),
+    "flick"       : ([("tip_speed", (FLICK_SPEED, INF), (FLICK_SPEED / 2, INF))], 1),
+}
+
+
+# landmark pairs measured in one gather: hand scale, pinch, then every
+# fingertip and every pip joint to the wrist
+_PAIRS = np.array([(WRIST_IDX, MIDDLE_MCP_IDX), (THUMB_TIP_IDX, INDEX_TIP_IDX)]
+                  + [(tip, WRIST_IDX) for tip, _ in FINGERS] + [(pip, WRIST_IDX) for _, pip in FINGERS])
+_MOVING = np.array(PALM_IDX + (INDEX_TIP_IDX,))
+
+
+def hand_features(newest, older, dt):
+    """
+    Feature table (hands, len(FEATURES)) from the newest landmarks, the
+    landmarks VELOCITY_SPAN frames earlier and the time between them
+    ((hands, 21, 2), (hands, 21, 2), (hands,)).
+    """
+    out = np.empty((len(newest), len(FEATURES)), dtype=np.float64)
+    d = newest[:, _PAIRS[:, 0]] - newest[:, _PAIRS[:, 1]]
+    dist = np.sqrt(np.einsum("hpk,hpk->hp", d, d))
+    scale = dist[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 0] = scale
+        out[:, 1] = np.where(scale > 0, dist[:, 1] / scale, INF)
+        out[:, 2:7] = np.where(dist[:, 7:] > 0, dist[:, 2:7] / dist[:, 7:], 0.0)
+        rate = np.where((scale > 0) & (dt > 0), 1.0 / (scale * dt), 0.0)
+
+    moved = newest[:, _MOVING] - older[:, _MOVING]
+    palm = moved[:, :len(PALM_IDX)].mean(axis=1) * rate[:, None]
+    out[:, 7] = -palm[:, 0]
+    out[:, 8] = palm[:, 1]
+    out[:, 9] = np.hypot(moved[:, -1, 0], moved[:, -1, 1]) * rate
+    return out
+
+
+class GestureEngine:
+    """
+    Every registered gesture for every hand, evaluated together.
+
+    update() pushes a tracker result's hands into a shared
+    (hands, GESTURE_HISTORY, 21, 2) landmark ring, computes one feature
+    table for all hands and checks all gestures' clauses in one
+    vectorized pass: registering more gestures adds table rows, not
+    Python work per frame. Each (hand, gesture) keeps its own debounce
+    counter, which moves one step per observation towards switching and
+    flips the state once it reaches the gesture's frame count. Hands
+    missing from a result keep their state until reset().
+    """
+
+    def __init__(self, gestures=DEFAULT_GESTURES, labels=HAND_LABELS, history=GESTURE_HISTORY):
+        self.labels = tuple(labels)
+        self.slot = {label : i for i, label in enumerate(self.labels)}
+        n = len(self.labels)
+        # float64 so features match the scalar math they replace
+        self.landmarks = np.zeros((n, history, NUM_LANDMARKS, 2), dtype=np.float64)
+        self.timestamps = np.zeros((n, history), dtype=np.float64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.features = np.zeros((n, len(FEATURES)), dtype=np.float64)
+
+        self.names = []
+        self.index = {}
+        self._specs = []
+        self._tables = None
+        self.frames = np.zeros(0, dtype=np.int64)
+        self.counters = np.zeros((n, 0), dtype=np.int64)
+        self.active = np.zeros((n, 0), dtype=bool)
+        self.changed = np.zeros((n, 0), dtype=bool)
+        self._active_names = {label : () for label in self.labels}
+        for name, (clauses, frames) in gestures.items():
+            self.register(name, clauses, frames)
+
+    def register(self, name, clauses, frames=1):
+        """
+        Adds (or replaces) a gesture; clauses as in DEFAULT_GESTURES.
+        """
+        if name in self.index:
+            self.unregister(name)
+        self.names.append(name)
+        self.index[name] = len(self.names) - 1
+        self.frames = np.append(self.frames, frames)
+        n = len(self.labels)
+        self.counters = np.concatenate([self.counters, np.zeros((n, 1), dtype=np.int64)], axis=1)
+        self.active = np.concatenate([self.active, np.zeros((n, 1), dtype=bool)], axis=1)
+        self.changed = np.concatenate([self.changed, np.zeros((n, 1), dtype=bool)], axis=1)
+        self._specs.append([(FEATURE_INDEX[f], on, off) for f, on, off in clauses])
+        self._build()
+
+    def unregister(self, name):
+        i = self.index.pop(name)
+        del self.names[i], self._specs[i]
+        self.index = {n : j for j, n in enumerate(self.names)}
+        self.frames = np.delete(self.frames, i)
+        self.counters = np.delete(self.counters, i, axis=1)
+        self.active = np.delete(self.active, i, axis=1)
+        self.changed = np.delete(self.changed, i, axis=1)
+        self._build()
+
+    def _build(self):
+        # clause tables padded to the longest gesture; padding always passes
+        width = max((len(s) for s in self._specs), default=1)
+        shape = (len(self._specs), width)
+        feature = np.zeros(shape, dtype=np.intp)
+        bands = np.empty(shape + (4,), dtype=np.float64)
+        bands[:] = (-INF, INF, -INF, INF)
+        for g, spec in enumerate(self._specs):
+            for c, (f, on, off) in enumerate(spec):
+                feature[g, c] = f
+                bands[g, c] = (*on, *off)
+        self._tables = (feature, bands[..., 0], bands[..., 1], bands[..., 2], bands[..., 3])
+
+    def reset(self, label=None):
+        rows = slice(None) if label is None else self.slot[label]
+        self.count[rows] = 0
+        self.counters[rows] = 0
+        self.active[rows] = False
+        self.changed[rows] = False
+
+    def update(self, hands, timestamp):
+        """
+        hands: TrackingResult.hands, (label, (21, 2) normalized landmarks) pairs.
+        """
+        present = np.zeros(len(self.labels), dtype=bool)
+        T = self.landmarks.shape[1]
+        for label, landmarks_norm in hands:
+            h = self.slot[label]
+            i = self.count[h] % T
+            self.landmarks[h, i] = landmarks_norm
+            self.timestamps[h, i] = timestamp
+            self.count[h] += 1
+            present[h] = True
+        self.changed[:] = False
+        if not present.any():
+            return
+
+        rows = np.flatnonzero(present)
+        count = self.count[rows]
+        newest = (count - 1) % T
+        older = (count - 1 - np.minimum(VELOCITY_SPAN, count - 1)) % T
+        features = hand_features(self.landmarks[rows, newest], self.landmarks[rows, older],
+                                 self.timestamps[rows, newest] - self.timestamps[rows, older])
+        self.features[rows] = features
+        self._debounce(rows, features)
+
+    def _debounce(self, rows, features):
+        feature, on_lo, on_hi, off_lo, off_hi = self._tables
+        vals = features[:, feature]                               # (hands, gestures, clauses)
+        on = ((vals > on_lo) & (vals < on_hi)).all(axis=2)
+        off = ~((vals >= off_lo) & (vals <= off_hi)).all(axis=2)
+
+        active = self.active[rows]
+        counters = self.counters[rows]
+        counters += (~active & on).astype(np.int64) - (active & off)
+        np.clip(counters, -self.frames, self.frames, out=counters)
+        flip = np.where(active, counters <= -self.frames, counters >= self.frames)
+
+        self.counters[rows] = counters
+        self.active[rows] = active ^ flip
+        self.changed[rows] = flip
+        for h in rows:
+            self._active_names[self.labels[h]] = tuple(self.names[g] for g in np.flatnonzero(self.active[h]))
+
+    def is_active(self, label, name):
+        return bool(self.active[self.slot[label], self.index[name]])
+
+    def just_started(self, label, name):
+        g = self.index[name]
+        h = self.slot[label]
+        return bool(self.changed[h, g] and self.active[h, g])
+
+    def active_names(self, label):
+        return self._active_names[label]
+
+    def feature(self, label, name):
+        return float(self.features[self.slot[label], FEATURE_INDEX[name]])
+
+
+if __name__ == "__main__":
+    # 1) pinch decisions against the scalar PinchDetector rule this engine
+    #    replaced, 2) each default gesture on a synthetic hand, 3) cost per
+    #    update as gestures are added, next to evaluating the same clause
+    #    tables with a Python loop per hand and gesture.
+    import math
+    import time
+
+    def reference_pinch(frames):
+        state = {label : (0, False) for label in HAND_LABELS}
+        out = []
+        for hands in frames:
+            for label, lm in hands:
+                pc, pinched = state[label]
+                scale = math.hypot(*(lm[MIDDLE_MCP_IDX] - lm[WRIST_IDX]))
+                rel = math.hypot(*(lm[INDEX_TIP_IDX] - lm[THUMB_TIP_IDX])) / scale if scale > 0 else INF
+                if pinched:
+                    pc -= rel > PINCH_OFF_THRESH
+                else:
+                    pc += rel < PINCH_ON_THRESH
+                pc = max(-PINCH_FRAMES_REQ, min(PINCH_FRAMES_REQ, pc))
+                if not pinched and pc >= PINCH_FRAMES_REQ:
+                    pinched = True
+                elif pinched and pc <= -PINCH_FRAMES_REQ:
+                    pinched = False
+                state[label] = (pc, pinched)
+                out.append((label, pinched, rel))
+        return out
+
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, 0.04, size=(21, 2))
+    frames = []
+    for i in range(3000):
+        hands = []
+        for label, phase in (("LEFT", 0.0), ("RIGHT", 1.7)):
+            if rng.random() < 0.1:
+                continue    # dropped hand
+            lm = base + (0.5 + 0.3 * np.sin(i / 90 + phase), 0.5 + 0.2 * np.cos(i / 70 + phase))
+            lm[4] = lm[8] + (lm[4] - lm[8]) * (0.5 + 0.5 * np.sin(i / 25 + phase)) + rng.normal(0, 0.002, 2)
+            hands.append((label, lm.astype(np.float32)))
+        frames.append(tuple(hands))
+
+    engine = GestureEngine()
+    got = []
+    for i, hands in enumerate(frames):
+        engine.update(hands, i / 30)
+        got.extend((label, engine.is_active(label, "pinch"), engine.feature(label, "pinch")) for label, _ in hands)
+    want = reference_pinch(frames)
+    assert [g[:2] for g in got] == [w[:2] for w in want]
+    assert max(abs(g[2] - w[2]) for g, w in zip(got, want)) < 1e-9
+    print(f"pinch: {len(got)} decisions identical to the scalar detector, "
+          f"{sum(w[1] for w in want)} pinched")
+
+    # a hand: wrist at the origin, fingers fanned upwards, each finger
+    # either extended (tip beyond pip) or curled back towards the wrist
+    def pose(extended, center, size=0.1):
+        lm = np.zeros((21, 2))
+        for f, angle in enumerate((-1.0, -0.35, 0.0, 0.3, 0.6)):
+            d = np.array((np.sin(angle), -np.cos(angle)))
+            reach = (1.0, 1.5, 1.9, 2.2) if extended[f] else (1.0, 1.4, 1.1, 0.8)
+            for j, r in enumerate(reach):
+                lm[1 + 4 * f + j] = d * r * size
+        return (lm + center).astype(np.float32)
+
+    OPEN, FIST, TWO = (1, 1, 1, 1, 1), (0, 0, 0, 0, 0), (0, 1, 1, 0, 0)
+    scripts = {
+        "open_palm"  : [pose(OPEN, (0.5, 0.6))] * 8,
+        "fist"       : [pose(FIST, (0.5, 0.6))] * 8,
+        # camera x grows = the hand moves left on the mirrored screen
+        "swipe_left" : [pose(TWO, (0.3 + 0.015 * i, 0.6)) for i in range(8)],
+        "swipe_right": [pose(TWO, (0.7 - 0.015 * i, 0.6)) for i in range(8)],
+        "flick"      : [pose(OPEN, (0.5, 0.6))] * 6 + [pose(OPEN, (0.5, 0.6 - 0.15 * k)) for k in (1, 2)],
+    }
+    for name, poses in scripts.items():
+        engine = GestureEngine()
+        seen = set()
+        for i, lm in enumerate(poses):
+            engine.update((("RIGHT", lm),), i / 30)
+            seen.update(engine.active_names("RIGHT"))
+        # a flick is thrown with an open hand
+        assert name in seen and seen <= {name, "open_palm" if name == "flick" else name}, (name, seen)
+        print(f"{name:>12}: recognised, active during the script: {sorted(seen)}")
+
+    def python_loop(engine, features):
+        # the same clause tables, evaluated per hand, gesture and clause
+        for h in range(len(features)):
+            row = features[h].tolist()
+            for g, spec in enumerate(engine._specs):
+                on = all(lo < row[f] < hi for f, (lo, hi), _ in spec)
+                off = not all(lo <= row[f] <= hi for f, _, (lo, hi) in spec)
+                active, n, frames = engine.active[h, g], engine.counters[h, g], engine.frames[g]
+                n = max(-frames, min(frames, n + (not active and on) - (active and off)))
+                engine.counters[h, g] = n
+                if (not active and n >= frames) or (active and n <= -frames):
+                    engine.active[h, g] = not active
+
+    UPDATES = 2000
+    poses = [pose(OPEN if i % 40 < 20 else FIST, (0.5 + 0.1 * np.sin(i / 9), 0.6)) for i in range(64)]
+    print(f"\n{'gestures':>9} {'engine us':>10} {'python loop us':>15}   per update, 2 hands")
+    for count in (1, 6, 12, 24, 48, 96):
+        gestures = {f"{name}_{k}" : spec for k in range(count // len(DEFAULT_GESTURES) + 1)
+                    for name, spec in DEFAULT_GESTURES.items()}
+        gestures = dict(list(gestures.items())[:count])
+        engine = GestureEngine(gestures)
+        t0 = time.perf_counter()
+        for i in range(UPDATES):
+            lm = poses[i % len(poses)]
+            engine.update((("LEFT", lm), ("RIGHT", lm)), i / 30)
+        vec_us = (time.perf_counter() - t0) / UPDATES * 1e6
+
+        loop = GestureEngine(gestures)
+        t0 = time.perf_counter()
+        for i in range(UPDATES):
+            lm = poses[i % len(poses)]
+            both = np.stack((lm, lm)).astype(np.float64)
+            feats = hand_features(both, both, np.ones(2))
+            python_loop(loop, feats)
+        loop_us = (time.perf_counter() - t0) / UPDATES * 1e6
+        print(f"{count:>9} {vec_us:>10.1f} {loop_us:>15.1f}")
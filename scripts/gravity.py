@@ -1,10 +1,9 @@
 from scripts.forces import Force
-from scripts.physicsobj import PhysicsObj
 
 class Gravity(Force):
 
     def __init__(self, pull_force) -> None:
         super().__init__(pull_force)
 
-    def apply_force(self, physics_obj : PhysicsObj, args : set[str]=set()) -> None:
-        physics_obj.velocities[1] = physics_obj.velocities[1] + self.force
\ No newline at end of file
+    def acceleration(self) -> tuple:
+        return 0.0, self.force
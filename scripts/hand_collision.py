@@ -0,0 +1,176 @@
+import numpy as np
+
+from scripts.physicsobj import REFERENCE_DT
+
+# --- CONFIGURATION ---
+# landmark index pairs of mp.solutions.hands.HAND_CONNECTIONS, sorted
+BONES = np.array([(0, 1), (0, 5), (0, 17), (1, 2), (2, 3), (3, 4), (5, 6), (5, 9), (6, 7), (7, 8),
+                  (9, 10), (9, 13), (10, 11), (11, 12), (13, 14), (13, 17), (14, 15), (15, 16),
+                  (17, 18), (18, 19), (19, 20)], dtype=np.intp)
+BONE_RADIUS       = 3.0      # capsule radius around each bone, display px
+MAX_SWEEP_SAMPLES = 32       # cap on time samples per sweep
+HAND_RESTITUTION  = 0.8
+
+
+# --- SWEPT CAPSULES ---
+def sweep_samples(prev_pts, pts, min_gap):
+    """
+    Time samples in (0, 1] spaced so no bone moves further than min_gap
+    between two of them; consecutive capsules then overlap and nothing
+    can slip through between samples.
+    """
+    travel = float(np.sqrt(((pts - prev_pts) ** 2).sum(axis=1).max()))
+    count = int(min(MAX_SWEEP_SAMPLES, max(1, np.ceil(travel / max(min_gap, 1e-6)))))
+    return np.arange(1, count + 1) / count
+
+def swept_bone_contacts(prev_pts, pts, pos, radius, bone_radius=BONE_RADIUS):
+    """
+    Sweeps every bone capsule from prev_pts to pts ((21, 2) pixel arrays)
+    against circles (pos (N, 2), radius (N,)) in one pass.
+
+    Returns (body, bone, t, u, normal, depth) for each body hit, at the
+    earliest sample t in (0, 1] it is touched; u is the contact parameter
+    along the bone and normal points from the bone to the body centre.
+    """
+    prev_pts = np.asarray(prev_pts, dtype=np.float64)
+    pts = np.asarray(pts, dtype=np.float64)
+    reach = radius + bone_radius
+
+    # cull bodies outside the swept hand's bounds
+    lo = np.minimum(prev_pts.min(axis=0), pts.min(axis=0)) - bone_radius
+    hi = np.maximum(prev_pts.max(axis=0), pts.max(axis=0)) + bone_radius
+    body = np.flatnonzero(((pos + reach[:, None] >= lo) & (pos - reach[:, None] <= hi)).all(axis=1))
+    if not len(body):
+        empty = np.empty(0)
+        return body, body, empty, empty, np.empty((0, 2)), empty
+
+    t = sweep_samples(prev_pts, pts, bone_radius + radius[body].min())
+    lm = prev_pts + (pts - prev_pts) * t[:, None, None]            # (S, 21, 2)
+    a, b = lm[:, BONES[:, 0]], lm[:, BONES[:, 1]]                     # (S, K, 2)
+    ab = b - a
+    ab_len2 = np.maximum((ab ** 2).sum(axis=2), 1e-12)
+
+    c = pos[body]                                                     # (M, 2)
+    ac = c[None, None] - a[:, :, None]                                # (S, K, M, 2)
+    u = np.clip((ac * ab[:, :, None]).sum(axis=3) / ab_len2[:, :, None], 0, 1)
+    delta = ac - ab[:, :, None] * u[..., None]
+    dist = np.sqrt((delta ** 2).sum(axis=3))                          # (S, K, M)
+    depth = reach[body] - dist
+
+    # earliest touching sample per body, then its deepest bone
+    touching = (depth > 0).any(axis=1)                                # (S, M)
+    hit = touching.any(axis=0)
+    body = body[hit]
+    m = np.flatnonzero(hit)
+    s = touching[:, hit].argmax(axis=0)
+    k = depth[s, :, m].argmax(axis=1)
+
+    delta, dist, depth, u = delta[s, k, m], dist[s, k, m], depth[s, k, m], u[s, k, m]
+    normal = np.zeros_like(delta)
+    np.divide(delta, dist[:, None], out=normal, where=dist[:, None] > 0)
+    normal[dist == 0] = (0, -1)
+    return body, k, t[s], u, normal, depth
+
+def resolve_hand_contacts(pos, velocities, prev_pts, pts, contacts, frame_time, restitution=HAND_RESTITUTION):
+    """
+    Hand is immovable: pushes each hit body out of the bone it touched and
+    reflects the approaching part of its velocity relative to the bone's
+    own velocity at the contact point. Velocities are px per REFERENCE_DT.
+    """
+    body, k, t, u, normal, depth = contacts
+    if not len(body):
+        return
+
+    # landmark velocity over the frame, in the bodies' velocity units
+    lm_vel = (np.asarray(pts, dtype=np.float64) - prev_pts) * (REFERENCE_DT / max(frame_time, 1e-6))
+    hand_vel = lm_vel[BONES[k, 0]] * (1 - u)[:, None] + lm_vel[BONES[k, 1]] * u[:, None]
+
+    pos[body] += normal * depth[:, None]
+    rel = np.einsum("ij,ij->i", velocities[body] - hand_vel, normal)
+    approaching = rel < 0
+    velocities[body[approaching]] -= normal[approaching] * ((1 + restitution) * rel[approaching])[:, None]
+
+
+class HandCollider:
+    """
+    Remembers each hand's previous pixel landmarks so every frame can sweep
+    from there. A hand that was missing last frame is tested statically.
+    """
+
+    def __init__(self, bone_radius=BONE_RADIUS, restitution=HAND_RESTITUTION):
+        self.bone_radius = bone_radius
+        self.restitution = restitution
+        self.prev = {}
+
+    def reset(self):
+        self.prev = {}
+
+    def collide(self, hands, pos, velocities, radius, frame_time):
+        """
+        hands: {track: (21, 2) pixel array, empty when absent}; tracks left
+        out are forgotten. Updates pos and velocities in place and returns
+        the number of bodies hit.
+        """
+        hits = 0
+        for label in self.prev.keys() - hands.keys():
+            del self.prev[label]
+        for label, pts in hands.items():
+            if not len(pts):
+                self.prev.pop(label, None)
+                continue
+            prev = self.prev.get(label, pts)
+            contacts = swept_bone_contacts(prev, pts, pos, radius, self.bone_radius)
+            resolve_hand_contacts(pos, velocities, prev, pts, contacts, frame_time, self.restitution)
+            self.prev[label] = np.array(pts, dtype=np.float64)
+            hits += len(contacts[0])
+        return hits
+
+
+if __name__ == "__main__":
+    # Tunneling check and benchmark: a hand swiping 120 px per frame across
+    # a field of balls. The old test (any landmark inside the ball's rect on
+    # the current frame) is run on the same swipe for comparison.
+    import time
+    import mediapipe as mp
+
+    assert set(map(tuple, BONES.tolist())) == set(mp.solutions.hands.HAND_CONNECTIONS)
+
+    rng = np.random.default_rng(0)
+    hand = np.stack([np.cos(np.arange(21) * 0.3) * (4 + np.arange(21)),
+                     np.sin(np.arange(21) * 0.3) * (4 + np.arange(21))], axis=1)
+    SWIPE = 120.0
+    FRAMES = 50
+
+    # one ball right between two frames of the swipe
+    prev_pts, pts = hand + (100, 200), hand + (100 + SWIPE, 200)
+    ball = np.array([[100 + SWIPE / 2, 200.0]])
+    r = np.array([8.0])
+    point_hit = bool(((np.abs(pts - ball) <= r).all(axis=1)).any())
+    swept_hit = len(swept_bone_contacts(prev_pts, pts, ball, r)[0]) > 0
+    print(f"ball between frames: point test {'hit' if point_hit else 'missed'}, swept capsules {'hit' if swept_hit else 'missed'}")
+    assert swept_hit and not point_hit
+
+    vel0 = np.zeros((1, 2))
+    resolve_hand_contacts(ball.copy(), vel0, prev_pts, pts, swept_bone_contacts(prev_pts, pts, ball, r), 1 / 60)
+    print(f"impulse from a {SWIPE:.0f} px/frame swipe: ball velocity {vel0[0].round(1).tolist()} px/frame")
+
+    print(f"{'bodies':>8} {'swept ms':>9} {'hits':>6} {'point ms':>9} {'hits':>6}")
+    for n in (1, 100, 1000, 10000):
+        pos = rng.uniform(0, 1000, size=(n, 2))
+        radius = np.full(n, 8.0)
+
+        t0 = time.perf_counter()
+        swept = 0
+        for f in range(FRAMES):
+            prev_pts, pts = hand + (f * SWIPE / 6, 500), hand + ((f + 1) * SWIPE / 6, 500)
+            swept += len(swept_bone_contacts(prev_pts, pts, pos, radius)[0])
+        swept_ms = (time.perf_counter() - t0) * 1000 / FRAMES
+
+        t0 = time.perf_counter()
+        point = 0
+        for f in range(FRAMES):
+            pts = hand + ((f + 1) * SWIPE / 6, 500)
+            point += int((np.abs(pts[:, None] - pos[None]) <= radius[None, :, None]).all(axis=2).any(axis=0).sum())
+        point_ms = (time.perf_counter() - t0) * 1000 / FRAMES
+
+        print(f"{n:>8} {swept_ms:>9.3f} {swept:>6} {point_ms:>9.3f} {point:>6}")
@@ -0,0 +1,105 @@
+import numpy as np
+
+# --- CONFIGURATION ---
+PROCESS_NOISE     = 20.0     # white-noise acceleration density, normalized units^2 / s^3
+MEASUREMENT_NOISE = 4e-6     # landmark jitter variance, normalized units^2
+MAX_PREDICT_TIME  = 0.1      # never extrapolate further than this past the last measurement (s)
+LOST_TIMEOUT      = 0.2      # drop a hand that has not been measured for this long (s)
+
+
+class HandFilter:
+    """
+    Constant-velocity Kalman filter over the 21 landmarks of one hand.
+
+    Every coordinate shares the same motion model, measurement noise and
+    timing, so a single 2x2 covariance serves all 42 of them and one
+    update is a handful of array ops on (21, 2) position/velocity arrays.
+
+    Measurement times come from the tracker's clock, prediction horizons
+    from the caller's: predict(horizon) extrapolates `horizon` seconds past
+    the last correction, so both clocks never have to agree.
+    """
+
+    def __init__(self, process_noise=PROCESS_NOISE, measurement_noise=MEASUREMENT_NOISE):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.pos = None                        # (21, 2) float32, filtered landmarks
+        self.vel = None                        # (21, 2) float32, per landmark, units / s
+        self.P = np.zeros((2, 2))              # shared [pos, vel] covariance
+        self.timestamp = None
+
+    @property
+    def active(self):
+        return self.pos is not None
+
+    def correct(self, landmarks, timestamp):
+        z = np.asarray(landmarks, dtype=np.float32)
+        if self.pos is None:
+            self.pos = z.copy()
+            self.vel = np.zeros_like(z)
+            self.P = np.array([[self.r, 0.0], [0.0, 1.0]])
+            self.timestamp = timestamp
+            return self.pos
+
+        dt = max(timestamp - self.timestamp, 0.0)
+        self.timestamp = timestamp
+
+        # predict to the measurement time
+        self.pos += self.vel * dt
+        (p00, p01), (_, p11) = self.P
+        q = self.q
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+
+        # correct with the measured position
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        innovation = z - self.pos
+        self.pos += k0 * innovation
+        self.vel += k1 * innovation
+        self.P = np.array([[(1 - k0) * p00, (1 - k0) * p01],
+                           [(1 - k0) * p01, p11 - k1 * p01]])
+        return self.pos
+
+    def predict(self, horizon, out=None):
+        """
+        Landmarks `horizon` seconds after the last measurement, capped at
+        MAX_PREDICT_TIME. Written into out when given.
+        """
+        out = np.multiply(self.vel, min(max(horizon, 0.0), MAX_PREDICT_TIME), out=out)
+        out += self.pos
+        return out
+
+
+if __name__ == "__main__":
+    # Accuracy check: a hand moving on a smooth path, measured with jitter at
+    # 60, 30 or 20 Hz, rendered at 60 Hz.
+    # Compares the error of holding the last measurement against the filter.
+    RENDER_HZ = 60
+    DURATION = 20
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, 0.04, size=(21, 2))
+
+    def truth(t):
+        return base + np.array([0.5 + 0.3 * np.sin(t * 1.7), 0.5 + 0.2 * np.cos(t * 2.3)])
+
+    for infer_hz in (60, 30, 20):
+        hold_err, filt_err = [], []
+        f = HandFilter()
+        last, last_t = None, None
+        every = RENDER_HZ // infer_hz
+        for i in range(DURATION * RENDER_HZ):
+            t = i / RENDER_HZ
+            if i % every == 0:
+                last = truth(t) + rng.normal(0, MEASUREMENT_NOISE ** 0.5, (21, 2))
+                last_t = t
+                f.correct(last, t)
+            target = truth(t)
+            hold_err.append(np.abs(last - target).mean())
+            filt_err.append(np.abs(f.predict(t - last_t) - target).mean())
+        print(f"inference {infer_hz:>2} Hz: hold-last error {np.mean(hold_err) * 1000:.2f}, "
+              f"filtered error {np.mean(filt_err) * 1000:.2f} (x1e-3 normalized)")
@@ -0,0 +1,230 @@
+import numpy as np
+
+from scripts.hand_filter import LOST_TIMEOUT
+from scripts.recording import HANDEDNESS
+
+# --- CONFIGURATION ---
+TRACK_GATE      = 1.5           # max distance of a match, in hand scales
+HANDEDNESS_COST = 0.5           # added to a match the detector labels as the other hand
+PALM_IDX        = (0, 5, 9, 13, 17)
+WRIST_IDX       = 0
+MIDDLE_MCP_IDX  = 9
+
+INF = float("inf")
+
+
+def match(cost, gate=TRACK_GATE):
+    """
+    One-to-one matching of rows (detections) to columns (tracks), cheapest
+    pairs first, pairs above `gate` never matched. Done as rounds of mutual
+    nearest neighbours, a few array ops per round; the cheapest remaining
+    pair is always mutual, so every round matches at least one and the
+    result equals greedy matching on the sorted costs. Returns (rows, cols).
+    """
+    cost = np.where(cost <= gate, cost, INF)
+    rows, cols = [], []
+    arange = np.arange(cost.shape[0])
+    while cost.size:
+        best_col = cost.argmin(axis=1)
+        best_row = cost.argmin(axis=0)
+        mutual = (best_row[best_col] == arange) & np.isfinite(cost[arange, best_col])
+        r = np.flatnonzero(mutual)
+        if not len(r):
+            break
+        c = best_col[r]
+        rows.append(r)
+        cols.append(c)
+        cost[r, :] = INF
+        cost[:, c] = INF
+    if not rows:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+class HandTracks:
+    """
+    Persistent identities for up to `capacity` hands.
+
+    Every track lives in a fixed slot; slot-indexed arrays hold its ID,
+    handedness, palm position and velocity, so per-hand state elsewhere
+    (landmark histories, filters, gestures) can be arrays indexed by slot
+    too. assign() predicts each track's palm to the result's timestamp,
+    matches detections to tracks by distance in hand scales (plus a
+    penalty when the detector's left/right label disagrees) and opens new
+    tracks in free slots for the rest; with no slot free, the rest take
+    over tracks left unmatched, keeping their IDs. A track is closed once it has not
+    been matched for `timeout` seconds; its slot may be reused, its ID
+    never is. Nothing is allocated per track, so hands coming and going
+    cost the same as hands staying.
+    """
+
+    def __init__(self, capacity, gate=TRACK_GATE, timeout=LOST_TIMEOUT):
+        self.capacity = capacity
+        self.gate = gate
+        self.timeout = timeout
+        self.active = np.zeros(capacity, dtype=bool)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.handedness = np.zeros(capacity, dtype=np.uint8)      # index into HANDEDNESS
+        self.anchor = np.zeros((capacity, 2), dtype=np.float64)   # palm center, normalized
+        self.velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self.scale = np.ones(capacity, dtype=np.float64)
+        self.last_seen = np.zeros(capacity, dtype=np.float64)
+        self.next_id = 0
+
+        # slots opened (or taken over) / closed by the latest assign(), for
+        # resetting per-slot state
+        self.opened = np.zeros(0, dtype=np.intp)
+        self.closed = np.zeros(0, dtype=np.intp)
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def label(self, slot):
+        return HANDEDNESS[self.handedness[slot]]
+
+    def assign(self, hands, timestamp):
+        """
+        hands: TrackingResult.hands. Returns the slot of every detection,
+        -1 for detections left over when every slot holds a track matched
+        in this result.
+        """
+        self.closed = np.flatnonzero(self.active & (timestamp - self.last_seen > self.timeout))
+        self.active[self.closed] = False
+
+        slots = np.full(len(hands), -1, dtype=np.intp)
+        if not hands:
+            self.opened = slots
+            return slots
+
+        lm = np.stack([landmarks_norm for _, landmarks_norm in hands]).astype(np.float64)
+        anchor = lm[:, PALM_IDX].mean(axis=1)
+        scale = np.linalg.norm(lm[:, WRIST_IDX] - lm[:, MIDDLE_MCP_IDX], axis=1)
+        side = np.array([HANDEDNESS.index(label) for label, _ in hands], dtype=np.uint8)
+
+        live = np.flatnonzero(self.active)
+        if len(live):
+            ahead = (timestamp - self.last_seen[live])[:, None]
+            predicted = self.anchor[live] + self.velocity[live] * ahead
+            dist = np.linalg.norm(anchor[:, None] - predicted[None], axis=2)
+            cost = dist / np.maximum(np.maximum(scale[:, None], self.scale[live][None]), 1e-6)
+            cost += HANDEDNESS_COST * (side[:, None] != self.handedness[live][None])
+            rows, cols = match(cost, self.gate)
+            slots[rows] = live[cols]
+
+        new = np.flatnonzero(slots < 0)
+        free = np.flatnonzero(~self.active)[:len(new)]
+        slots[new[:len(free)]] = free
+        self.ids[free] = np.arange(self.next_id, self.next_id + len(free))
+        self.next_id += len(free)
+        self.active[free] = True
+
+        # No free slot left: a detection outside the gate while a track went
+        # unmatched is that hand moving faster than the gate (a swipe), not
+        # an extra hand. Hand it the unmatched track, ungated and cheapest
+        # first, instead of dropping it until the track times out.
+        left = new[len(free):]
+        reseeded = np.zeros(0, dtype=np.intp)
+        if len(left) and len(live):
+            idle = np.flatnonzero(~np.isin(live, slots))
+            rows, cols = match(cost[left][:, idle], INF)
+            reseeded = live[idle[cols]]
+            slots[left[rows]] = reseeded
+
+        self.opened = np.concatenate([free, reseeded])
+        self.velocity[self.opened] = 0
+        self.last_seen[self.opened] = timestamp
+
+        seen = slots >= 0
+        s = slots[seen]
+        dt = (timestamp - self.last_seen[s])[:, None]
+        moved = np.divide(anchor[seen] - self.anchor[s], dt, out=np.zeros((len(s), 2)), where=dt > 0)
+        self.velocity[s] = np.where(dt > 0, moved, self.velocity[s])
+        self.anchor[s] = anchor[seen]
+        self.scale[s] = scale[seen]
+        self.handedness[s] = side[seen]
+        self.last_seen[s] = timestamp
+        return slots
+
+
+if __name__ == "__main__":
+    # Replayed synthetic class sessions with 2, 8 and 16 hands drifting
+    # around their own spots, close enough to pass each other, leaving
+    # and coming back, in shuffled detection order and mostly labelled
+    # the same hand. Every result goes through AR.ingest (tracks, filters,
+    # gestures); reports identity errors against the ground truth and the
+    # per-result cost on steady frames vs frames where hands come or go.
+    import os
+    import tempfile
+    import time
+    from scripts.ar import AR
+    from scripts.recording import LandmarkRecorder, ReplaySource, to_result
+    from scripts.tracking import TrackingResult
+
+    FRAMES = 1800                 # 60 s at 30 FPS
+    SCALE = 0.04                  # wrist to middle knuckle, normalized
+
+    def session(n, rng):
+        base = rng.normal(0, SCALE * 0.6, size=(21, 2))
+        base -= base[WRIST_IDX]
+        base[MIDDLE_MCP_IDX] = (0, -SCALE)
+        side = int(np.ceil(np.sqrt(n)))
+        home = np.array([((i % side + 0.5) / side, (i // side + 0.5) / side) for i in range(n)])
+        phase = rng.uniform(0, 2 * np.pi, (n, 2))
+        speed = rng.uniform(0.5, 1.5, (n, 2))
+        labels = rng.choice(2, n, p=(0.2, 0.8))
+        away = np.zeros(n, dtype=np.int64)            # frames left until a hand returns
+        results, truth = [], []
+        for f in range(FRAMES):
+            t = f / 30
+            leave = (away == 0) & (rng.random(n) < 0.004)
+            away[leave] = rng.integers(3, 90, leave.sum())      # brief dropouts and real exits
+            visible = np.flatnonzero(away == 0)
+            away[away > 0] -= 1
+            center = home + 0.35 / side * np.sin(t * speed + phase)
+            hands, ids = [], []
+            for i in rng.permutation(visible):
+                label = labels[i] if rng.random() > 0.05 else 1 - labels[i]
+                lm = base + center[i] + rng.normal(0, 0.002, (21, 2))
+                hands.append((HANDEDNESS[label], lm.astype(np.float32)))
+                ids.append(i)
+            results.append(TrackingResult(f, t, tuple(hands)))
+            truth.append(ids)
+        return results, truth
+
+    rng = np.random.default_rng(0)
+    print(f"{'hands':>5} {'tracks':>6} {'id errors':>9} {'label clashes':>13} "
+          f"{'steady p50/p99 us':>18} {'come/go p50/p99 us':>19}")
+    for n in (2, 8, 16):
+        results, truth = session(n, rng)
+        path = os.path.join(tempfile.mkdtemp(), f"class_{n}.phyl")
+        rec = LandmarkRecorder(path, n)
+        for r in results:
+            rec.write(r)
+        rec.close()
+
+        replay = ReplaySource(path, realtime=False)
+        ar = AR(replay, max_hands=n)
+        owner, last = {}, {}          # track ID -> true hand, true hand -> (track ID, time)
+        errors, times, churn = 0, [], []
+        prev = set()
+        for f in range(FRAMES):
+            result = to_result(replay.frames[f])      # recorded clock, dropouts keep their length
+            t0 = time.perf_counter()
+            ar.ingest(result)
+            times.append(time.perf_counter() - t0)
+            seen = set(truth[f])
+            churn.append(seen != prev)
+            prev = seen
+            for i, track in zip(truth[f], ar.tracks.ids[ar.slots].tolist()):
+                if owner.setdefault(track, i) != i:
+                    errors += 1           # one ID on two hands
+                if i in last and last[i][0] != track and result.timestamp - last[i][1] <= LOST_TIMEOUT:
+                    errors += 1           # hand changed ID without being gone
+                last[i] = (track, result.timestamp)
+        clashes = sum(len(set(l for l, _ in r.hands)) < len(r.hands) for r in results)
+        times, churn = np.array(times) * 1e6, np.array(churn)
+        steady, moving = times[~churn], times[churn]
+        print(f"{n:>5} {ar.tracks.next_id:>6} {errors:>9} {clashes:>13} "
+              f"{np.percentile(steady, 50):>9.0f} /{np.percentile(steady, 99):>5.0f}   "
+              f"{np.percentile(moving, 50):>9.0f} /{np.percentile(moving, 99):>5.0f}")
+        ar.close()
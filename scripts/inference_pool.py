@@ -0,0 +1,355 @@
+import multiprocessing
+import queue
+import time
+import cv2
+import numpy as np
+
+from multiprocessing import shared_memory
+from scripts.capture import negotiate
+from scripts.hand_filter import LOST_TIMEOUT
+from scripts.logger import get_logger_info
+from scripts.tracking import TrackingResult, create_hands, parse_hands
+
+# --- CONFIGURATION ---
+FRAME_SHAPE   = (480, 640, 3)   # frames are stored at this size in the rings
+RING_SLOTS    = 4               # frames kept per camera
+JOBS_PER_CAM  = 2               # queued frames per camera before capture starts dropping
+IDLE_WAIT     = 0.005
+RESULT_WAIT   = 0.1             # inference workers re-check the stop flag this often
+
+
+# --- FRAME SOURCES ---
+# read(out) fills the (H, W, 3) uint8 array `out` in place and returns whether a frame came
+class CameraSource:
+    def __init__(self, index=0, shape=FRAME_SHAPE):
+        self.shape = shape
+        self.cap = cv2.VideoCapture(index)
+        negotiate(self.cap, (shape[1], shape[0]))
+
+    def read(self, out):
+        ret, img = self.cap.read(out)
+        if ret and img is not out:
+            # driver ignored the requested size, scale into the slot instead
+            cv2.resize(img, (self.shape[1], self.shape[0]), dst=out)
+        return ret
+
+    def release(self):
+        self.cap.release()
+
+class SyntheticSource:
+    """
+    Camera stand-in: a bright disc circling over noise, optionally paced to fps.
+    """
+
+    def __init__(self, shape=FRAME_SHAPE, fps=None, seed=0):
+        self.fps = fps
+        self.noise = np.random.default_rng(seed).integers(0, 64, size=shape, dtype=np.uint8)
+        self.count = 0
+        self.next_due = time.perf_counter()
+
+    def read(self, out):
+        if self.fps:
+            delay = self.next_due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_due = max(self.next_due + 1 / self.fps, time.perf_counter())
+        h, w = out.shape[:2]
+        np.copyto(out, self.noise)
+        angle = self.count / 30
+        cv2.circle(out, (int(w / 2 + w / 4 * np.cos(angle)), int(h / 2 + h / 4 * np.sin(angle))), h // 8, (220, 200, 180), -1)
+        self.count += 1
+        return True
+
+    def release(self):
+        pass
+
+
+# --- SHARED FRAME RING ---
+class FrameRing:
+    """
+    RING_SLOTS frames of one camera in a single shared memory block.
+
+    Header: per-slot sequence number and capture timestamp, then the
+    [captured, dropped] counters. A slot's sequence number is -1 while the
+    capture process writes it, so a reader that sees the same number
+    before and after using the slot knows the frame was not torn.
+    """
+
+    def __init__(self, shape=FRAME_SHAPE, slots=RING_SLOTS, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header = slots * 16 + 16
+        frame_bytes = int(np.prod(self.shape))
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header + slots * frame_bytes)
+        else:
+            # spawned workers share the owner's resource tracker, so attaching
+            # here does not unlink the block when a worker exits
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        self.seq = np.ndarray((slots,), np.int64, buf, 0)
+        self.timestamps = np.ndarray((slots,), np.float64, buf, slots * 8)
+        self.counters = np.ndarray((2,), np.int64, buf, slots * 16)
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, buf, header)
+        if name is None:
+            self.seq[:] = -1
+            self.counters[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        # the numpy views pin the buffer, drop them before closing
+        del self.seq, self.timestamps, self.counters, self.frames
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# --- WORKER PROCESSES ---
+def _capture_main(camera, source_factory, ring_name, shape, slots, jobs, stop):
+    ring = FrameRing(shape, slots, ring_name)
+    source = source_factory()
+    n = 0
+    try:
+        while not stop.is_set():
+            slot = n % slots
+            ring.seq[slot] = -1
+            # the source writes straight into shared memory
+            if not source.read(ring.frames[slot]):
+                stop.wait(IDLE_WAIT)
+                continue
+            ring.timestamps[slot] = time.perf_counter()
+            ring.seq[slot] = n
+            ring.counters[0] += 1
+            try:
+                jobs.put_nowait((camera, n))
+            except queue.Full:
+                ring.counters[1] += 1
+            n += 1
+    except Exception as e:
+        get_logger_info('ERROR', f'CAPTURE WORKER {camera} STOPPED: {e}', True)
+    finally:
+        source.release()
+        ring.close()
+
+def _inference_main(ring_names, shape, slots, model_factory, jobs, results, stop):
+    rings = [FrameRing(shape, slots, name) for name in ring_names]
+    rgb = np.empty(shape, dtype=np.uint8)
+    # one model per camera: a tracking-mode model fed frames of several
+    # cameras would carry hands from one camera's frame into the next
+    models = {}
+    try:
+        while not stop.is_set():
+            try:
+                camera, n = jobs.get(timeout=RESULT_WAIT)
+            except queue.Empty:
+                continue
+
+            ring = rings[camera]
+            slot = n % slots
+            if ring.seq[slot] != n:
+                results.put((camera, None))
+                continue
+            timestamp = float(ring.timestamps[slot])
+            cv2.cvtColor(ring.frames[slot], cv2.COLOR_BGR2RGB, dst=rgb)
+            if ring.seq[slot] != n:
+                # capture lapped the ring while we converted: torn frame
+                results.put((camera, None))
+                continue
+            if camera not in models:
+                models[camera] = model_factory()
+            results.put((camera, TrackingResult(n, timestamp, parse_hands(models[camera].process(rgb)))))
+    except Exception as e:
+        get_logger_info('ERROR', f'INFERENCE WORKER STOPPED: {e}', True)
+    finally:
+        for model in models.values():
+            if hasattr(model, "close"):
+                model.close()
+        for ring in rings:
+            ring.close()
+
+
+# --- MERGING ---
+def side_by_side(cameras):
+    """
+    Default viewports: the merged view split into equal vertical strips,
+    camera 0 leftmost. A viewport is (x, y, w, h), normalized.
+    """
+    return [(i / cameras, 0.0, 1 / cameras, 1.0) for i in range(cameras)]
+
+def merge_hands(results, viewports, now, max_age=LOST_TIMEOUT):
+    """
+    Hands of the per-camera results (None for a camera without one) as one
+    tuple, landmarks mapped from each camera's frame into its viewport, so
+    hands seen by different cameras never land on top of each other.
+    Results captured more than max_age before now are left out. Returns
+    (newest timestamp used or None, hands).
+    """
+    timestamp, hands = None, []
+    for result, (x, y, w, h) in zip(results, viewports):
+        if result is None or now - result.timestamp > max_age:
+            continue
+        timestamp = result.timestamp if timestamp is None else max(timestamp, result.timestamp)
+        scale = np.array((w, h), dtype=np.float32)
+        offset = np.array((x, y), dtype=np.float32)
+        hands += [(label, landmarks_norm * scale + offset) for label, landmarks_norm in result.hands]
+    return timestamp, tuple(hands)
+
+
+# --- INFERENCE POOL ---
+class InferencePool:
+    """
+    Multi-camera hand tracking across processes.
+
+    One capture process per source writes frames into that camera's
+    shared FrameRing and queues only (camera, frame number). `workers`
+    inference processes each own a Hands model per camera, created on the
+    camera's first frame, so a model only ever tracks across frames of one
+    camera; they read frames in place from the rings and send back
+    landmark arrays. The simulation process polls
+    like a TrackingWorker: poll() merges the newest result of every camera
+    into one TrackingResult, each camera's hands mapped into its viewport
+    (side by side by default, see merge_hands) and cameras whose newest
+    result is older than LOST_TIMEOUT left out. Factories must be
+    picklable (top-level callables or functools.partial), processes are
+    spawned.
+    """
+
+    def __init__(self, source_factories, workers=2, model_factory=create_hands, shape=FRAME_SHAPE, slots=RING_SLOTS,
+                 viewports=None):
+        self.source_factories = list(source_factories)
+        self.viewports = list(viewports) if viewports is not None else side_by_side(len(self.source_factories))
+        self.workers = workers
+        self.model_factory = model_factory
+        self.shape = tuple(shape)
+        self.slots = slots
+
+        ctx = multiprocessing.get_context("spawn")
+        self.rings = [FrameRing(self.shape, slots) for _ in self.source_factories]
+        self.jobs = ctx.Queue(maxsize=JOBS_PER_CAM * len(self.source_factories))
+        self.results = ctx.Queue()
+        self.stop = ctx.Event()
+
+        self.processes = [
+            ctx.Process(target=_capture_main, name=f"Capture-{i}", daemon=True,
+                        args=(i, factory, ring.name, self.shape, slots, self.jobs, self.stop))
+            for i, (factory, ring) in enumerate(zip(self.source_factories, self.rings))
+        ] + [
+            ctx.Process(target=_inference_main, name=f"Inference-{i}", daemon=True,
+                        args=([r.name for r in self.rings], self.shape, slots, model_factory, self.jobs, self.results, self.stop))
+            for i in range(workers)
+        ]
+
+        self.latest : list[TrackingResult | None] = [None] * len(self.rings)
+        self.frames_processed = 0
+        self.frames_stale = 0
+        self.merged_id = 0
+
+    def start(self):
+        for p in self.processes:
+            p.start()
+        return self
+
+    @property
+    def frames_captured(self):
+        return int(sum(r.counters[0] for r in self.rings))
+
+    @property
+    def frames_dropped(self):
+        return int(sum(r.counters[1] for r in self.rings))
+
+    def poll_cameras(self):
+        """
+        Non-blocking. Returns {camera: newest TrackingResult} for cameras with new results.
+        """
+        fresh = {}
+        while True:
+            try:
+                camera, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if result is None:
+                self.frames_stale += 1
+                continue
+            self.frames_processed += 1
+            if self.latest[camera] is None or result.frame_id > self.latest[camera].frame_id:
+                self.latest[camera] = fresh[camera] = result
+        return fresh
+
+    def poll(self):
+        """
+        Non-blocking. Newest hands of every camera as one TrackingResult, or
+        None when no camera has anything new (or only stale results).
+        """
+        if not self.poll_cameras():
+            return None
+        timestamp, hands = merge_hands(self.latest, self.viewports, time.perf_counter())
+        if timestamp is None:
+            # only results from before LOST_TIMEOUT arrived, nothing to report
+            return None
+        self.merged_id += 1
+        return TrackingResult(self.merged_id, timestamp, hands)
+
+    def close(self, timeout=2.0):
+        self.stop.set()
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        for q in (self.jobs, self.results):
+            q.cancel_join_thread()
+            q.close()
+        for ring in self.rings:
+            ring.close(unlink=True)
+
+
+if __name__ == "__main__":
+    # Throughput scaling: CAMERAS synthetic sources (30 fps, or the rate given
+    # on the command line) feeding the real Hands model, with a growing number
+    # of inference processes. Pick a rate the workers cannot keep up with to
+    # measure saturated throughput.
+    import functools
+    import os
+    import sys
+
+    CAMERAS = 4
+    CAMERA_FPS = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    DURATION = 4.0
+    cpus = os.cpu_count() or 1
+
+    # merging: the same hand seen by two cameras lands in two strips, a
+    # camera gone quiet for longer than LOST_TIMEOUT is left out
+    hand = ("LEFT", np.full((21, 2), 0.5, dtype=np.float32))
+    now = time.perf_counter()
+    merged = merge_hands([TrackingResult(0, now, (hand,)), TrackingResult(0, now - 0.01, (hand,))], side_by_side(2), now)
+    assert merged[0] == now and [lm[0].tolist() for _, lm in merged[1]] == [[0.25, 0.5], [0.75, 0.5]]
+    merged = merge_hands([TrackingResult(0, now - LOST_TIMEOUT - 0.01, (hand,)), None], side_by_side(2), now)
+    assert merged == (None, ())
+    sources = [functools.partial(SyntheticSource, FRAME_SHAPE, CAMERA_FPS, seed) for seed in range(CAMERAS)]
+
+    print(f"{CAMERAS} synthetic cameras {FRAME_SHAPE[1]}x{FRAME_SHAPE[0]} @ {CAMERA_FPS:g} fps, {cpus} CPU(s)")
+    print(f"{'workers':>8} {'frames/s':>9} {'speedup':>8} {'captured':>9} {'dropped':>8} {'stale':>6}")
+    base = None
+    for workers in sorted({1, 2, 4, cpus}):
+        pool = InferencePool(sources, workers).start()
+        # let every worker load its model before timing
+        while pool.frames_processed < workers * 2:
+            pool.poll_cameras()
+            time.sleep(0.01)
+        start, count = time.perf_counter(), pool.frames_processed
+        per_camera = [0] * CAMERAS
+        while time.perf_counter() - start < DURATION:
+            for camera in pool.poll_cameras():
+                per_camera[camera] += 1
+            time.sleep(0.005)
+        rate = (pool.frames_processed - count) / (time.perf_counter() - start)
+        captured, dropped, stale = pool.frames_captured, pool.frames_dropped, pool.frames_stale
+        pool.close()
+
+        assert all(per_camera), "a camera never produced a result"
+        base = base or rate
+        print(f"{workers:>8} {rate:>9.1f} {rate / base:>7.2f}x {captured:>9} {dropped:>8} {stale:>6}")
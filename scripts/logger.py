@@ -1,18 +1,184 @@
+import atexit
+import os
+import queue
+import threading
+import time
 from colorama import Fore, Style
 
-LOG_DIR = 'logs.txt'
+# next to app.py, whatever directory the app is started from
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs.txt')
 CORE_COLOR = Fore.BLUE
 APP_COLOR = Fore.YELLOW
 ERROR_COLOR = Fore.RED
 
 COLORS = {'CORE' : CORE_COLOR, 'APP' : APP_COLOR, 'ERROR' : ERROR_COLOR}
 
-def dumps(text):
-    with open(LOG_DIR, 'a') as fp:
+# --- WRITER CONFIGURATION ---
+FLUSH_INTERVAL  = 0.5            # seconds between batched writes
+COLLAPSE_WINDOW = 2.0            # repeats of a message are folded into one line over this long
+MAX_LOG_BYTES   = 1 << 20        # rotate logs.txt once it would grow past this
+LOG_BACKUPS     = 3              # logs.txt.1 .. logs.txt.3
+RATE_LIMITS     = {'CORE' : 10, 'APP' : 10, 'ERROR' : 5}   # lines per second per category
+
+
+def rotate(path=LOG_DIR, backups=LOG_BACKUPS):
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f'{path}.{i}'):
+            os.replace(f'{path}.{i}', f'{path}.{i + 1}')
+    if os.path.exists(path):
+        os.replace(path, f'{path}.1')
+
+def dumps(text, path=LOG_DIR):
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    if size and size + len(text) > MAX_LOG_BYTES:
+        rotate(path)
+
+    with open(path, 'a') as fp:
         fp.write(text)
 
-def get_logger_info(type, text, dump=False):
-    print(f"{COLORS[type]}[{type:^5}] {text}{Style.RESET_ALL}")
 
-    if dump:
-        dumps(f'\n[{type:^5}] {text}')
+class LogWriter:
+    """
+    Background writer behind get_logger_info.
+
+    Callers only enqueue. The writer thread folds every repeat of a
+    message within COLLAPSE_WINDOW of its first into one line ("NO HANDS
+    DETECTED x60"), other messages in between or not, drops lines above
+    each category's rate limit (reporting how many were suppressed), and
+    appends to the log file in batches.
+    """
+
+    def __init__(self, path=LOG_DIR):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+
+        # (type, text, dump) -> [repeats, first seen] of the messages being collapsed
+        self.pending = {}
+
+        self.tokens = dict(RATE_LIMITS)
+        self.suppressed = {type : 0 for type in RATE_LIMITS}
+        self.refilled = time.monotonic()
+
+        self.console = []
+        self.lines = []
+
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, type, text, dump):
+        self.queue.put((type, text, dump))
+
+    def flush(self, timeout=2.0):
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def _refill(self, now):
+        elapsed = now - self.refilled
+        self.refilled = now
+        for type, limit in RATE_LIMITS.items():
+            self.tokens[type] = min(limit, self.tokens[type] + elapsed * limit)
+
+    def _emit(self, now, everything=False):
+        for record, (count, since) in list(self.pending.items()):
+            if everything or now - since >= COLLAPSE_WINDOW:
+                del self.pending[record]
+                self._emit_one(record, count)
+
+    def _emit_one(self, record, count):
+        type, text, dump = record
+        if type in self.tokens:
+            if self.tokens[type] < 1:
+                self.suppressed[type] += count
+                return
+            self.tokens[type] -= 1
+            if self.suppressed[type]:
+                text = f'{text} (+{self.suppressed[type]} suppressed)'
+                self.suppressed[type] = 0
+
+        if count > 1:
+            text = f'{text} x{count}'
+        self.console.append(f"{COLORS.get(type, '')}[{type:^5}] {text}{Style.RESET_ALL}")
+        if dump:
+            self.lines.append(f'\n[{type:^5}] {text}')
+
+    def _report_suppressed(self):
+        for type, count in self.suppressed.items():
+            if count:
+                self.console.append(f"{COLORS[type]}[{type:^5}] {count} messages suppressed{Style.RESET_ALL}")
+                self.lines.append(f'\n[{type:^5}] {count} messages suppressed')
+                self.suppressed[type] = 0
+
+    def _add(self, record, now):
+        if record in self.pending:
+            self.pending[record][0] += 1
+        else:
+            self.pending[record] = [1, now]
+
+    def _write(self):
+        if self.console:
+            print('\n'.join(self.console))
+            self.console = []
+        if self.lines:
+            try:
+                dumps(''.join(self.lines), self.path)
+            except OSError as e:
+                print(f'{ERROR_COLOR}[ERROR] LOG WRITE FAILED: {e}{Style.RESET_ALL}')
+            self.lines = []
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                items = [self.queue.get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.monotonic()
+            self._refill(now)
+            waiters = []
+            for item in items:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    self._add(item, now)
+
+            self._emit(now, everything=bool(waiters) or not running)
+            if not running:
+                self._report_suppressed()
+            self._write()
+            for done in waiters:
+                done.set()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = LogWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+def flush():
+    if _writer is not None:
+        _writer.flush()
+
+def get_logger_info(type, text, dump=False):
+    get_writer().submit(type, text, dump)
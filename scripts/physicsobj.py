@@ -1,5 +1,12 @@
 import pygame
-from abc import ABC, abstractmethod
+from abc import abstractmethod
+
+# --- STEP CONSTANTS ---
+# velocities are in pixels per REFERENCE_DT, the frame length the demo was tuned at;
+# a step of dt scales every per-step quantity by dt / REFERENCE_DT
+REFERENCE_DT      = 1 / 60
+DRAG              = 0.1       # horizontal slow-down per reference step
+DAMPING           = 0.9       # share of the velocity applied to the position
 
 class PhysicsObj(object):
 
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+import pygame
+
+# --- CONFIGURATION ---
+RING_SIZE   = 8192       # spans kept for trace export
+HUD_SMOOTH  = 0.1        # EMA factor for the overlay numbers
+HUD_COLOR   = (255, 255, 0)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """
+    Named timing spans kept in a fixed-size ring buffer.
+
+    `with profiler.span("name"):` costs one attribute check and returns a
+    shared no-op context while disabled, so the spans stay in the code.
+    """
+
+    def __init__(self, capacity=RING_SIZE, enabled=False):
+        self.enabled = enabled
+        self.capacity = capacity
+
+        self.names : list[str] = []
+        self.name_ids : dict[str, int] = {}
+        self.name_idx = np.zeros(capacity, dtype=np.int32)
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.durations = np.zeros(capacity, dtype=np.int64)
+        self.threads = np.zeros(capacity, dtype=np.int64)
+        self.cursor = 0
+
+        self.averages : dict[str, float] = {}     # smoothed ms per span name
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def record(self, name, start_ns, end_ns):
+        dur = end_ns - start_ns
+        with self._lock:
+            idx = self.name_ids.get(name)
+            if idx is None:
+                idx = self.name_ids[name] = len(self.names)
+                self.names.append(name)
+
+            i = self.cursor % self.capacity
+            self.name_idx[i] = idx
+            self.starts[i] = start_ns
+            self.durations[i] = dur
+            self.threads[i] = threading.get_ident()
+            self.cursor += 1
+
+            ms = dur / 1e6
+            avg = self.averages.get(name)
+            self.averages[name] = ms if avg is None else avg + (ms - avg) * HUD_SMOOTH
+
+    def export_trace(self, path=None):
+        """
+        Writes the ring buffer as Chrome trace-event JSON (chrome://tracing, Perfetto).
+        """
+        if path is None:
+            path = time.strftime("trace_%Y%m%d_%H%M%S.json")
+
+        with self._lock:
+            count = min(self.cursor, self.capacity)
+            order = np.arange(self.cursor - count, self.cursor) % self.capacity
+            names = list(self.names)
+            name_idx = self.name_idx[order]
+            starts = self.starts[order]
+            durations = self.durations[order]
+            threads = self.threads[order]
+
+        origin = int(starts.min()) if count else 0
+        pid = os.getpid()
+        events = [{"name" : names[n], "ph" : "X", "pid" : pid, "tid" : int(tid),
+                   "ts" : (int(s) - origin) / 1000, "dur" : int(d) / 1000}
+                  for n, s, d, tid in zip(name_idx, starts, durations, threads)]
+        thread_names = {t.ident : t.name for t in threading.enumerate()}
+        events += [{"name" : "thread_name", "ph" : "M", "pid" : pid, "tid" : int(tid),
+                    "args" : {"name" : thread_names.get(int(tid), str(tid))}}
+                   for tid in set(threads.tolist())]
+
+        with open(path, "w") as fp:
+            json.dump({"traceEvents" : events, "displayTimeUnit" : "ms"}, fp)
+        return path
+
+    def render_hud(self, surf, font):
+        if not self.enabled or not self.averages:
+            return None
+        lines = [f"{name:<16}{ms:7.2f} ms" for name, ms in sorted(self.averages.items())]
+        surfs = [font.render(line, True, HUD_COLOR) for line in lines]
+        width = max(s.get_width() for s in surfs) + 8
+        height = sum(s.get_height() for s in surfs) + 8
+
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        y = 4
+        for s in surfs:
+            panel.blit(s, (4, y))
+            y += s.get_height()
+        return surf.blit(panel, (surf.get_width() - width, surf.get_height() - height))
+
+
+profiler = Profiler(enabled=os.environ.get("PHYPY_PROFILE", "") not in ("", "0"))
+
+
+if __name__ == "__main__":
+    # Overhead check: a disabled span must cost next to nothing.
+    N = 200_000
+    prof = Profiler()
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        pass
+    empty = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        with prof.span("stage"):
+            pass
+    disabled = time.perf_counter() - t0
+
+    prof.enabled = True
+    t0 = time.perf_counter()
+    for _ in range(N):
+        with prof.span("stage"):
+            pass
+    enabled = time.perf_counter() - t0
+
+    print(f"disabled span {(disabled - empty) / N * 1e9:.0f} ns, enabled span {(enabled - empty) / N * 1e9:.0f} ns")
@@ -0,0 +1,203 @@
+import os
+import time
+import numpy as np
+
+from scripts.tracking import TrackingResult, NUM_LANDMARKS
+
+# --- FILE LAYOUT ---
+# header : FILE_MAGIC, version, max_hands, landmark count   (HEADER_DTYPE, 16 bytes)
+# body   : one fixed-size FRAME record per tracker result   (frame_dtype(max_hands))
+FILE_MAGIC    = b"PHYL"
+FILE_VERSION  = 1
+MAX_HANDS     = 2
+
+HANDEDNESS = ("LEFT", "RIGHT")
+
+HEADER_DTYPE = np.dtype([
+    ("magic",     "S4"),
+    ("version",   "<u2"),
+    ("max_hands", "<u2"),
+    ("landmarks", "<u2"),
+    ("reserved",  "V6"),
+])
+
+def frame_dtype(max_hands=MAX_HANDS):
+    return np.dtype([
+        ("timestamp",  "<f8"),
+        ("frame_id",   "<u4"),
+        ("n_hands",    "u1"),
+        ("handedness", "u1",  (max_hands,)),
+        ("pinched",    "u1",  (max_hands,)),
+        ("landmarks",  "<f4", (max_hands, NUM_LANDMARKS, 2)),
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Appends tracker results (plus the pinch state AR derived from them)
+    to a binary file that ReplaySource can memory-map back.
+    """
+
+    def __init__(self, path, max_hands=MAX_HANDS):
+        self.path = path
+        self.max_hands = max_hands
+        self.record = np.zeros(1, dtype=frame_dtype(max_hands))
+        self.frames = 0
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (FILE_MAGIC, FILE_VERSION, max_hands, NUM_LANDMARKS, b"")
+        self.fp = open(path, "wb")
+        self.fp.write(header.tobytes())
+
+    def write(self, result : TrackingResult, pinched : tuple[bool, ...]=()):
+        """
+        pinched: one flag per entry of result.hands (several hands can share a label).
+        """
+        rec = self.record[0]
+        rec["timestamp"] = result.timestamp
+        rec["frame_id"] = result.frame_id
+        rec["landmarks"] = 0
+        hands = result.hands[:self.max_hands]
+        rec["n_hands"] = len(hands)
+        for i, (label, landmarks_norm) in enumerate(hands):
+            rec["handedness"][i] = HANDEDNESS.index(label)
+            rec["pinched"][i] = i < len(pinched) and pinched[i]
+            rec["landmarks"][i] = landmarks_norm
+        self.fp.write(self.record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self.fp.close()
+
+
+def load_recording(path):
+    """
+    Memory-maps a recording. Nothing is read until frames are touched,
+    so multi-hour files open instantly.
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header[0]["magic"] != FILE_MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    if header[0]["version"] != FILE_VERSION or header[0]["landmarks"] != NUM_LANDMARKS:
+        raise ValueError(f"{path}: unsupported recording version {header[0]['version']}")
+
+    dtype = frame_dtype(int(header[0]["max_hands"]))
+    count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+
+
+def to_result(rec) -> TrackingResult:
+    hands = tuple(
+        (HANDEDNESS[rec["handedness"][i]], np.array(rec["landmarks"][i]))
+        for i in range(rec["n_hands"])
+    )
+    return TrackingResult(int(rec["frame_id"]), float(rec["timestamp"]), hands)
+
+
+# --- REPLAY SOURCE ---
+class ReplaySource:
+    """
+    Drop-in replacement for TrackingWorker that plays a recording back.
+
+    realtime=True paces frames by their recorded timestamps and, like the
+    live worker, skips frames the render loop was too slow to pick up.
+    realtime=False hands out the next frame on every poll().
+    Frames are stamped on the time.perf_counter() clock the live worker
+    stamps frames with: realtime frames are shifted so the first one was
+    captured at start(), the others are stamped at poll(), since the
+    render loop sets their pace and would otherwise fall further behind
+    the recording every frame until hands age out.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.frames = load_recording(path)
+        self.realtime = realtime
+        self.loop = loop
+
+        self.cursor = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.started = None
+        self.offset = 0.0         # recorded timestamp -> this process' perf_counter clock
+
+    @property
+    def finished(self):
+        return not self.loop and self.cursor >= len(self.frames)
+
+    def start(self):
+        self._restart()
+        return self
+
+    def _restart(self):
+        self.started = time.perf_counter()
+        if len(self.frames):
+            self.offset = self.started - float(self.frames["timestamp"][0])
+
+    def poll(self):
+        n = len(self.frames)
+        if n == 0:
+            return None
+        if self.loop and self.cursor >= n:
+            self.cursor = 0
+            self._restart()
+        if self.cursor >= n:
+            return None
+
+        if not self.realtime:
+            i = self.cursor
+        else:
+            elapsed = time.perf_counter() - self.started
+            due = self.frames["timestamp"][0] + elapsed
+            last_due = int(np.searchsorted(self.frames["timestamp"], due, "right")) - 1
+            if last_due < self.cursor:
+                return None
+            i = last_due
+            self.frames_dropped += i - self.cursor
+
+        self.cursor = i + 1
+        self.frames_processed += 1
+        result = to_result(self.frames[i])
+        if not self.realtime:
+            return result._replace(timestamp=time.perf_counter())
+        return result._replace(timestamp=result.timestamp + self.offset)
+
+    def close(self):
+        self.frames = self.frames[:0]
+
+
+if __name__ == "__main__":
+    # Load/replay throughput on a synthetic multi-hour file.
+    import tempfile
+
+    FRAMES = 3 * 60 * 60 * 30     # three hours at 30 FPS
+    rng = np.random.default_rng(0)
+    path = os.path.join(tempfile.mkdtemp(), "session.phyl")
+
+    # header from the recorder; the bulk body is written directly, the
+    # recorder's per-frame path is not what is measured here
+    LandmarkRecorder(path).close()
+    body = np.zeros(FRAMES, dtype=frame_dtype())
+    body["timestamp"] = np.arange(FRAMES) / 30
+    body["frame_id"] = np.arange(FRAMES)
+    body["n_hands"] = 1
+    body["landmarks"] = rng.random((21, 2))
+    with open(path, "r+b") as fp:
+        fp.seek(HEADER_DTYPE.itemsize)
+        body.tofile(fp)
+    del body
+
+    t0 = time.perf_counter()
+    replay = ReplaySource(path, realtime=False).start()
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    count = 0
+    while replay.poll() is not None and count < 100_000:
+        count += 1
+    rate = count / (time.perf_counter() - t0)
+
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"{len(replay.frames)} frames, {size_mb:.0f} MB, {frame_dtype().itemsize} bytes/frame")
+    print(f"open {load_ms:.2f} ms, fast replay {rate:.0f} frames/s")
@@ -0,0 +1,206 @@
+import numpy as np
+
+# --- CONFIGURATION ---
+ROI_PADDING    = 0.6     # crop grows by this share of the hand box on every side
+ROI_MIN_SIDE   = 0.25    # smallest crop side, as a share of the frame side
+ROI_KEEP_INSET = 0.15    # keep last crop while hands stay this far inside its border
+INFERENCE_SIZE = 320     # longest side handed to the model, in pixels (None: no downscale)
+
+
+def hands_box(hands):
+    """
+    Normalized (x0, y0, x1, y1) around every landmark of every hand, or None.
+    """
+    if not hands:
+        return None
+    pts = np.concatenate([lm for _, lm in hands])
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
+
+def pad_box(box, padding=ROI_PADDING, min_side=ROI_MIN_SIDE):
+    x0, y0, x1, y1 = box
+    w = max((x1 - x0) * (1 + 2 * padding), min_side)
+    h = max((y1 - y0) * (1 + 2 * padding), min_side)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return (max(0.0, cx - w / 2), max(0.0, cy - h / 2),
+            min(1.0, cx + w / 2), min(1.0, cy + h / 2))
+
+def box_contains(outer, inner, inset=ROI_KEEP_INSET):
+    ox0, oy0, ox1, oy1 = outer
+    mx, my = (ox1 - ox0) * inset, (oy1 - oy0) * inset
+    x0, y0, x1, y1 = inner
+    return x0 >= ox0 + mx and y0 >= oy0 + my and x1 <= ox1 - mx and y1 <= oy1 - my
+
+def next_roi(prev_roi, hands):
+    """
+    Crop for the next frame: None (full-frame search) when no hands are
+    tracked, last frame's crop while the hands sit well inside it, else a
+    fresh padded box. Holding the crop steady keeps Mediapipe's own
+    frame-to-frame tracking valid.
+    """
+    box = hands_box(hands)
+    if box is None:
+        return None
+    if prev_roi is not None and box_contains(prev_roi, box):
+        return prev_roi
+    return pad_box(box)
+
+def prepare(frame, roi=None, inference_size=INFERENCE_SIZE, scratch=None):
+    """
+    Crops frame to roi (normalized, None = whole frame) and downscales the
+    crop so its longest side is at most inference_size, into a reused
+    buffer when a capture.Scratch is given. Returns the image and the
+    (x, y, w, h) pixel window it covers.
+    """
+    H, W = frame.shape[:2]
+    if roi is None:
+        x, y, w, h = 0, 0, W, H
+    else:
+        x, y = int(roi[0] * W), int(roi[1] * H)
+        w, h = max(1, int(roi[2] * W) - x), max(1, int(roi[3] * H) - y)
+
+    img = frame[y:y + h, x:x + w]
+    if inference_size and max(w, h) > inference_size:
+        import cv2
+        s = inference_size / max(w, h)
+        size = (max(1, round(w * s)), max(1, round(h * s)))
+        dst = scratch.get("resize", (size[1], size[0], img.shape[2])) if scratch is not None else None
+        img = cv2.resize(img, size, dst=dst, interpolation=cv2.INTER_LINEAR)
+    return img, (x, y, w, h)
+
+def to_frame_coords(hands, window, frame_shape):
+    """
+    Maps landmarks normalized to the crop back to full-frame normalized coords.
+    """
+    x, y, w, h = window
+    H, W = frame_shape[:2]
+    if (x, y, w, h) == (0, 0, W, H):
+        return hands
+    scale = np.array((w / W, h / H), dtype=np.float32)
+    offset = np.array((x / W, y / H), dtype=np.float32)
+    return tuple((label, lm * scale + offset) for label, lm in hands)
+
+
+if __name__ == "__main__":
+    # Replay-based accuracy check: pinch decisions on landmarks that went through
+    # the crop -> inference-resolution -> full-frame mapping must match the
+    # decisions on full-resolution landmarks. Pass a recording path to use
+    # real sessions, otherwise a synthetic pinching hand is generated.
+    import sys
+    import time
+    import cv2
+    from scripts.gestures import GestureEngine
+
+    FRAME_SHAPE = (720, 1280)
+
+    if len(sys.argv) > 1:
+        from scripts.recording import ReplaySource
+        replay = ReplaySource(sys.argv[1], realtime=False).start()
+        frames = []
+        while (res := replay.poll()) is not None:
+            frames.append(res.hands)
+    else:
+        rng = np.random.default_rng(0)
+        base = rng.normal(0, 0.04, size=(21, 2))
+        frames = []
+        for i in range(3000):
+            center = np.array([0.5 + 0.3 * np.sin(i / 90), 0.5 + 0.2 * np.cos(i / 70)])
+            lm = base + center
+            # thumb tip (4) closes onto index tip (8) on a slow cycle
+            lm[4] = lm[8] + (lm[4] - lm[8]) * (0.5 + 0.5 * np.sin(i / 25)) + rng.normal(0, 0.001, 2)
+            frames.append((("RIGHT", lm.astype(np.float32)),))
+
+    full, cropped = GestureEngine(), GestureEngine()
+    roi, agree, total, crop_area = None, 0, 0, []
+    for i, hands in enumerate(frames):
+        # quantize to the inference pixel grid the model would have seen
+        window = prepare(np.empty(FRAME_SHAPE + (1,), np.uint8), roi)[1]
+        x, y, w, h = window
+        s = min(1.0, INFERENCE_SIZE / max(w, h))
+        frame_px = np.array((FRAME_SHAPE[1], FRAME_SHAPE[0]), dtype=np.float32)
+        seen = tuple((label, (np.round((lm * frame_px - (x, y)) * s) / ((w * s), (h * s))).astype(np.float32))
+                     for label, lm in hands)
+        mapped = to_frame_coords(seen, window, FRAME_SHAPE)
+        crop_area.append(w * h / (FRAME_SHAPE[0] * FRAME_SHAPE[1]))
+
+        full.update(hands, i / 30)
+        cropped.update(mapped, i / 30)
+        for label, _ in hands:
+            agree += full.is_active(label, "pinch") == cropped.is_active(label, "pinch")
+            total += 1
+        roi = next_roi(roi, mapped)
+
+    print(f"pinch agreement {agree}/{total} ({100 * agree / max(total, 1):.2f}%), mean crop {100 * np.mean(crop_area):.0f}% of frame")
+
+    # Real model on rendered frames: a drawn open hand (palm, fingers,
+    # forearm) wandering, turning and changing size over a noisy
+    # background, with known landmark positions. The full-frame path
+    # (use_roi=False) and the crop path (next_roi, full search every
+    # FULL_FRAME_EVERY and on a miss, as TrackingWorker does) each get their
+    # own tracking-mode model; reports detection rate, landmark error
+    # against the drawn points and the mean model time per frame.
+    from scripts.tracking import FULL_FRAME_EVERY, create_hands, parse_hands
+
+    TEMPLATE = np.array([(0, 0), (-0.45, -0.25), (-0.75, -0.55), (-0.95, -0.85), (-1.1, -1.1),
+                         (-0.35, -1.0), (-0.42, -1.5), (-0.46, -1.8), (-0.5, -2.05),
+                         (0, -1.05), (0, -1.6), (0, -1.95), (0, -2.25),
+                         (0.3, -0.98), (0.36, -1.5), (0.4, -1.8), (0.43, -2.05),
+                         (0.55, -0.85), (0.66, -1.25), (0.72, -1.5), (0.78, -1.72)])
+    FINGERS = (((1, 2, 3, 4), 0.32), ((5, 6, 7, 8), 0.25), ((9, 10, 11, 12), 0.26),
+               ((13, 14, 15, 16), 0.24), ((17, 18, 19, 20), 0.2))
+    SKIN = (120, 150, 205)
+
+    def draw_hand(img, center, scale, angle):
+        c, s = np.cos(angle), np.sin(angle)
+        pts = TEMPLATE @ np.array([[c, s], [-s, c]]) * scale + center
+        along = (pts[0] - pts[9]) / np.linalg.norm(pts[0] - pts[9])
+        across = np.array((-along[1], along[0])) * scale
+        arm = (pts[0] + across * 0.45, pts[0] - across * 0.45,
+               pts[0] - across * 0.55 + along * 2 * scale, pts[0] + across * 0.55 + along * 2 * scale)
+        cv2.fillPoly(img, [np.array(arm, np.int32)], (110, 140, 195), cv2.LINE_AA)
+        palm = (pts[0] + across * 0.45, pts[1], pts[5], pts[9], pts[13], pts[17], pts[0] - across * 0.5)
+        cv2.fillPoly(img, [np.array(palm, np.int32)], SKIN, cv2.LINE_AA)
+        px = np.round(pts).astype(int).tolist()
+        for joints, width in FINGERS:
+            for k, (a, b) in enumerate(zip(joints, joints[1:])):
+                cv2.line(img, px[a], px[b], SKIN, max(1, int(scale * width * (1 - 0.12 * k))), cv2.LINE_AA)
+            cv2.circle(img, px[joints[-1]], int(scale * width * 0.38), SKIN, -1, cv2.LINE_AA)
+        return pts
+
+    rng = np.random.default_rng(1)
+    background = cv2.GaussianBlur(rng.integers(60, 90, FRAME_SHAPE + (3,), dtype=np.uint8), (9, 9), 0)
+    frame_px = np.array((FRAME_SHAPE[1], FRAME_SHAPE[0]))
+    scenes = []
+    for i in range(300):
+        center = frame_px * (0.5 + 0.25 * np.sin(i / 40), 0.6 + 0.1 * np.cos(i / 30))
+        scenes.append((center, 90 + 30 * np.sin(i / 50), 0.3 * np.sin(i / 35)))
+
+    print(f"{'path':<10} {'detected':>9} {'error px p50/p95':>17} {'ms/frame':>9}")
+    for label, use_roi in (("full frame", False), ("roi", True)):
+        model = create_hands(1)
+        roi, since_full, found, errors, spent = None, 0, 0, [], 0.0
+        for center, scale, angle in scenes:
+            frame = background.copy()
+            truth = draw_hand(frame, center, scale, angle)
+            t0 = time.perf_counter()
+            if not use_roi:
+                hands = parse_hands(model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+            else:
+                window = roi if roi is not None and since_full < FULL_FRAME_EVERY else None
+                img, px_window = prepare(frame, window)
+                hands = to_frame_coords(parse_hands(model.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))), px_window, frame.shape)
+                if not hands and window is not None:
+                    window = None
+                    img, px_window = prepare(frame, None)
+                    hands = to_frame_coords(parse_hands(model.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))), px_window, frame.shape)
+                since_full = since_full + 1 if window is not None else 0
+                roi = next_roi(roi, hands)
+            spent += time.perf_counter() - t0
+            if hands:
+                found += 1
+                errors.append(np.linalg.norm(hands[0][1] * frame_px - truth, axis=1).mean())
+        model.close()
+        errors = np.array(errors) if errors else np.zeros(1)
+        print(f"{label:<10} {found:>5}/{len(scenes):<3} {np.percentile(errors, 50):>9.1f} /{np.percentile(errors, 95):>5.1f} "
+              f"{spent / len(scenes) * 1000:>9.2f}")
@@ -0,0 +1,371 @@
+import asyncio
+import json
+import struct
+import time
+import numpy as np
+
+from scripts.bodies import Bodies
+from scripts.gravity import Gravity
+from scripts.bounce import Bounce
+from scripts.wind import Wind
+from scripts.simulation import FixedStepper
+from scripts.logger import get_logger_info
+
+# --- CONFIGURATION ---
+HOST              = "127.0.0.1"
+PORT              = 8765
+TICK_RATE         = 30          # state broadcasts per second, physics runs at REFERENCE_DT
+ARENA             = (450, 500)  # same as the App's display surface
+POS_SCALE         = 8           # positions travel as int16 in 1/8 px
+KEYFRAME_INTERVAL = 90          # ticks between full states, deltas in between
+MAX_CLIENT_BUFFER = 64 * 1024   # bytes queued for a client before it skips ticks
+PARAM_LIMIT       = 1.0         # accepted force magnitude, the App's slider range
+
+# --- WIRE FORMAT ---
+# every message : u8 type, then its header and payload
+# header        : MSG_DELTA: SHORT_HEADER (low byte of the tick, payload bytes), 4 bytes with the type
+#                 others:    HEADER (payload bytes, tick, server time.perf_counter()), 17 bytes with the type
+# MSG_KEYFRAME  : u16 count, count x (i16 x, i16 y), count x (u8 w, u8 h)
+# MSG_DELTA     : changed x u16 index, changed x (i8 dx, i8 dy)                    (1/8 px units)
+# MSG_PARAMS    : utf-8 JSON {force name: value}, server -> client after every change
+#                 and client -> server to change them (tick and time ignored)
+# Deltas go out every tick and carry a few bytes per moving body, so they
+# get the short header; latency is measured on keyframes.
+TYPE = struct.Struct("<B")
+HEADER = struct.Struct("<IId")
+SHORT_HEADER = struct.Struct("<BH")
+COUNT = struct.Struct("<H")
+MSG_KEYFRAME, MSG_DELTA, MSG_PARAMS = 1, 2, 3
+
+
+def make_forces():
+    return {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}
+
+def pack(msg_type, tick, payload, timestamp=None):
+    if msg_type == MSG_DELTA:
+        return TYPE.pack(msg_type) + SHORT_HEADER.pack(tick & 0xFF, len(payload)) + payload
+    return TYPE.pack(msg_type) + HEADER.pack(len(payload), tick, time.perf_counter() if timestamp is None else timestamp) + payload
+
+async def read_message(reader):
+    """
+    Returns (type, tick, server time, payload); deltas carry only the low
+    byte of the tick and no time (None). Raises IncompleteReadError on disconnect.
+    """
+    (msg_type,) = TYPE.unpack(await reader.readexactly(TYPE.size))
+    if msg_type == MSG_DELTA:
+        tick, length = SHORT_HEADER.unpack(await reader.readexactly(SHORT_HEADER.size))
+        timestamp = None
+    else:
+        length, tick, timestamp = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return msg_type, tick, timestamp, await reader.readexactly(length)
+
+def header_size(msg_type):
+    return TYPE.size + (SHORT_HEADER.size if msg_type == MSG_DELTA else HEADER.size)
+
+
+# --- STATE ENCODING ---
+def quantize(pos):
+    return np.round(pos * POS_SCALE).astype(np.int16)
+
+def encode_keyframe(q, size):
+    return COUNT.pack(len(q)) + q.tobytes() + np.clip(size, 0, 255).astype(np.uint8).tobytes()
+
+def encode_delta(q, prev_q):
+    """
+    Delta payload against prev_q, or None when a body moved too far for
+    int8 or too many moved for the short header's length.
+    """
+    diff = q.astype(np.int32) - prev_q
+    changed = np.flatnonzero(diff.any(axis=1))
+    diff = diff[changed]
+    if (diff.size and np.abs(diff).max() > 127) or len(changed) * 4 > 0xFFFF:
+        return None
+    return changed.astype(np.uint16).tobytes() + diff.astype(np.int8).tobytes()
+
+def decode_keyframe(payload):
+    (n,) = COUNT.unpack_from(payload)
+    q = np.frombuffer(payload, np.int16, n * 2, COUNT.size).reshape(n, 2)
+    size = np.frombuffer(payload, np.uint8, n * 2, COUNT.size + n * 4).reshape(n, 2)
+    return q.copy(), size.copy()
+
+def apply_delta(q, payload):
+    n = len(payload) // 4
+    idx = np.frombuffer(payload, np.uint16, n)
+    diff = np.frombuffer(payload, np.int8, n * 2, n * 2).reshape(n, 2)
+    q[idx] += diff
+
+
+# --- SERVER ---
+class Client:
+    __slots__ = ("writer", "needs_keyframe", "skipped")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.needs_keyframe = True
+        self.skipped = 0
+
+class SimulationServer:
+    """
+    Authoritative physics for many viewers.
+
+    Bodies are stepped with the App's forces on a FixedStepper and bounce
+    off each other as well as the walls. Every tick the quantized
+    positions are encoded once as a delta against the previous tick and
+    written to every client; new clients, clients that fell behind
+    (skipped a tick because their socket buffer was full) and every
+    KEYFRAME_INTERVAL ticks get a keyframe instead.
+    """
+
+    def __init__(self, bodies=1, tick_rate=TICK_RATE, arena=ARENA, seed=0):
+        self.width, self.height = arena
+        self.tick_rate = tick_rate
+        self.bodies = Bodies(make_forces(), capacity=max(1, bodies), collide=True)
+        rng = np.random.default_rng(seed)
+        for i in range(bodies):
+            pos = (self.width / 2, self.height / 2) if i == 0 else rng.uniform((20, 20), (self.width - 20, self.height - 20))
+            self.bodies.add(pos, (30, 30), (10, 10), rng.normal(0, 3, 2) if i else (0, 0))
+        self.stepper = FixedStepper()
+
+        self.clients : set[Client] = set()
+        self.tick = 0
+        self.prev_q = None
+        self.bytes_sent = 0
+        self.server = None
+
+    def step(self, dt):
+        self.bodies.update(dt, (self.width, self.height))
+
+    def params(self):
+        return {name : force.force for name, force in self.bodies.forces.items()}
+
+    def set_params(self, changes):
+        for name, value in changes.items():
+            if name in self.bodies.forces and isinstance(value, (int, float)):
+                self.bodies.forces[name].force = max(-PARAM_LIMIT, min(PARAM_LIMIT, float(value)))
+        self.broadcast_params()
+
+    def send(self, client, message):
+        client.writer.write(message)
+        self.bytes_sent += len(message)
+
+    def broadcast_params(self):
+        message = pack(MSG_PARAMS, self.tick, json.dumps(self.params()).encode())
+        for client in self.clients:
+            self.send(client, message)
+
+    async def handle_client(self, reader, writer):
+        client = Client(writer)
+        self.clients.add(client)
+        self.send(client, pack(MSG_PARAMS, self.tick, json.dumps(self.params()).encode()))
+        try:
+            while True:
+                msg_type, _, _, payload = await read_message(reader)
+                if msg_type == MSG_PARAMS:
+                    self.set_params(json.loads(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ValueError, AttributeError) as e:
+            get_logger_info('ERROR', f'BAD CLIENT MESSAGE: {e}', True)
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def broadcast_state(self):
+        q = quantize(self.bodies.pos)
+        keyframe = delta = None
+        if self.prev_q is not None and len(q) == len(self.prev_q) and self.tick % KEYFRAME_INTERVAL:
+            payload = encode_delta(q, self.prev_q)
+            delta = payload and pack(MSG_DELTA, self.tick, payload)
+
+        for client in self.clients:
+            if client.writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # slow reader: skip this tick, it resyncs from a keyframe
+                client.needs_keyframe = True
+                client.skipped += 1
+                continue
+            if delta is None or client.needs_keyframe:
+                if keyframe is None:
+                    keyframe = pack(MSG_KEYFRAME, self.tick, encode_keyframe(q, self.bodies.size))
+                self.send(client, keyframe)
+                client.needs_keyframe = False
+            else:
+                self.send(client, delta)
+        self.prev_q = q
+
+    async def start(self, host=HOST, port=PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def run(self, duration=None):
+        interval = 1 / self.tick_rate
+        start = last = time.perf_counter()
+        next_tick = start + interval
+        while duration is None or last - start < duration:
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+            now = time.perf_counter()
+            self.stepper.advance(now - last, self.step)
+            last = now
+            self.tick += 1
+            self.broadcast_state()
+            next_tick = max(next_tick + interval, now)
+
+    async def close(self):
+        for client in list(self.clients):
+            client.writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+# --- CLIENT ---
+class StateClient:
+    """
+    Viewer side: keeps the decoded positions, sizes and parameters, plus
+    per-keyframe latency and byte counts.
+    """
+
+    def __init__(self):
+        self.q = None
+        self.size = None
+        self.params = {}
+        self.tick = -1
+        self.bytes_received = 0
+        self.latencies : list[float] = []
+        self.reader = self.writer = None
+
+    @property
+    def pos(self):
+        return None if self.q is None else self.q / POS_SCALE
+
+    async def connect(self, host=HOST, port=PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        return self
+
+    def send_params(self, changes):
+        self.writer.write(pack(MSG_PARAMS, 0, json.dumps(changes).encode()))
+
+    def handle(self, msg_type, tick, timestamp, payload):
+        self.bytes_received += header_size(msg_type) + len(payload)
+        if msg_type == MSG_PARAMS:
+            self.params = json.loads(payload)
+            return
+        if msg_type == MSG_KEYFRAME:
+            self.latencies.append(time.perf_counter() - timestamp)
+            self.q, self.size = decode_keyframe(payload)
+            self.tick = tick
+        elif msg_type == MSG_DELTA and self.q is not None:
+            apply_delta(self.q, payload)
+            self.tick += (tick - self.tick) & 0xFF
+
+    async def run(self):
+        try:
+            while True:
+                self.handle(*await read_message(self.reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def view(host=HOST, port=PORT):
+    """
+    Minimal pygame viewer: draws the streamed bodies, arrow keys nudge wind.
+    """
+    import pygame
+
+    async def main():
+        pygame.init()
+        screen = pygame.display.set_mode((ARENA[0] * 2, ARENA[1] * 2))
+        display = pygame.Surface(ARENA)
+        client = await StateClient().connect(host, port)
+        receiver = asyncio.create_task(client.run())
+        keys = {pygame.K_LEFT : ("wind_x", -0.1), pygame.K_RIGHT : ("wind_x", 0.1),
+                pygame.K_UP : ("gravity", -0.1), pygame.K_DOWN : ("gravity", 0.1)}
+        try:
+            while not receiver.done():
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type == pygame.KEYDOWN and event.key in keys:
+                        name, step = keys[event.key]
+                        client.send_params({name : client.params.get(name, 0) + step})
+                display.fill((0, 0, 0))
+                if client.q is not None:
+                    for (x, y), (w, _) in zip(client.pos.tolist(), client.size.tolist()):
+                        pygame.draw.circle(display, (255, 255, 255), (x, y), w // 2)
+                screen.blit(pygame.transform.scale(display, screen.get_size()), (0, 0))
+                pygame.display.update()
+                await asyncio.sleep(1 / 60)
+        finally:
+            client.close()
+            pygame.quit()
+
+    asyncio.run(main())
+
+
+async def load_test(clients=50, bodies=20, seconds=5.0, tick_rate=TICK_RATE):
+    """
+    Runs a server and `clients` StateClients on localhost in this process.
+    """
+    server = SimulationServer(bodies, tick_rate)
+    port = await server.start(HOST, 0)
+    viewers = [await StateClient().connect(HOST, port) for _ in range(clients)]
+    receivers = [asyncio.create_task(v.run()) for v in viewers]
+
+    ticking = asyncio.create_task(server.run(seconds))
+    await asyncio.sleep(seconds / 2)
+    viewers[0].send_params({"wind_x" : 0.5})
+    await ticking
+    await asyncio.sleep(0.2)
+
+    truth = quantize(server.bodies.pos)
+    skipped = sum(c.skipped for c in server.clients)
+    for v in viewers:
+        v.close()
+    await server.close()
+    await asyncio.gather(*receivers)
+
+    lat = np.array([l for v in viewers for l in v.latencies]) * 1000
+    rx = np.array([v.bytes_received for v in viewers]) / seconds
+    raw = bodies * 2 * 8 * tick_rate   # float64 x, y per body per tick
+    return {
+        "clients" : clients,
+        "bodies" : bodies,
+        "ticks" : server.tick,
+        "kB/s per client" : float(rx.mean() / 1000),
+        "raw float64 kB/s" : raw / 1000,
+        "latency p50 ms" : float(np.percentile(lat, 50)),
+        "latency p99 ms" : float(np.percentile(lat, 99)),
+        "in sync" : all(v.q is not None and np.array_equal(v.q, truth) and v.tick == server.tick for v in viewers),
+        "params applied" : all(v.params.get("wind_x") == 0.5 for v in viewers),
+        "skipped ticks" : skipped,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PhyPy simulation server")
+    parser.add_argument("mode", choices=("serve", "view", "loadtest"))
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--bodies", type=int, default=1)
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE)
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    cli = parser.parse_args()
+
+    if cli.mode == "serve":
+        async def serve():
+            server = SimulationServer(cli.bodies, cli.tick_rate)
+            await server.start(cli.host, cli.port)
+            print(f"serving {cli.bodies} bodies on {cli.host}:{cli.port} at {cli.tick_rate:g} ticks/s")
+            await server.run()
+        asyncio.run(serve())
+    elif cli.mode == "view":
+        view(cli.host, cli.port)
+    else:
+        for n in cli.clients:
+            result = asyncio.run(load_test(n, cli.bodies, cli.seconds, cli.tick_rate))
+            print("  ".join(f"{k} {v:.2f}" if isinstance(v, float) else f"{k} {v}" for k, v in result.items()))
@@ -0,0 +1,115 @@
+from scripts.ball import Ball
+from scripts.ccd import NO_CONTACTS
+from scripts.physicsobj import REFERENCE_DT
+from scripts.profiler import profiler
+
+# --- CONFIGURATION ---
+MAX_STEPS_PER_FRAME = 5      # beyond this, leftover frame time is dropped
+
+
+class FixedStepper:
+    """
+    Accumulator for fixed-dt physics.
+
+    advance() runs as many whole steps as the elapsed frame time allows,
+    capped at max_steps so a slow frame cannot snowball into ever more
+    steps. It returns the interpolation factor between the last two states.
+    """
+
+    def __init__(self, dt : float=REFERENCE_DT, max_steps : int=MAX_STEPS_PER_FRAME) -> None:
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time : float, step) -> float:
+        self.accumulator += frame_time
+
+        taken = 0
+        while self.accumulator >= self.dt and taken < self.max_steps:
+            step(self.dt)
+            self.accumulator -= self.dt
+            taken += 1
+        self.steps += taken
+
+        if self.accumulator >= self.dt:
+            # spiral-of-death guard: keep the fractional part, drop the backlog
+            kept = self.accumulator % self.dt
+            self.dropped_time += self.accumulator - kept
+            self.accumulator = kept
+
+        return self.accumulator / self.dt
+
+    def run_headless(self, step, duration : float) -> int:
+        """
+        Steps `duration` seconds of simulated time back to back, no pacing.
+        """
+        count = round(duration / self.dt)
+        for _ in range(count):
+            step(self.dt)
+        self.steps += count
+        return count
+
+
+class Simulation:
+    """
+    Display-free physics core: one Ball inside a width x height arena.
+    """
+
+    def __init__(self, ball : Ball, width : float, height : float) -> None:
+        self.ball = ball
+        self.width = width
+        self.height = height
+        self.prev_pos = list(ball.pos)
+        self.contacts = NO_CONTACTS     # wall contacts of the last step
+        self.contact_listeners = []     # called with each non-empty contacts array
+
+    def sync(self) -> None:
+        # call after moving the ball by hand so interpolation starts from there
+        self.prev_pos = list(self.ball.pos)
+
+    def step(self, dt : float=REFERENCE_DT) -> None:
+        self.prev_pos = list(self.ball.pos)
+        with profiler.span("ball.update"):
+            self.contacts = self.ball.update(dt, (self.width, self.height))
+        if len(self.contacts):
+            for listener in self.contact_listeners:
+                listener(self.contacts)
+
+    def interpolated_pos(self, alpha : float) -> list[float]:
+        prev, cur = self.prev_pos, self.ball.pos
+        return [prev[0] + (cur[0] - prev[0]) * alpha,
+                prev[1] + (cur[1] - prev[1]) * alpha]
+
+
+if __name__ == "__main__":
+    # Headless check: determinism under frame jitter and speed versus real time.
+    import random
+    import time
+    from scripts.gravity import Gravity
+    from scripts.bounce import Bounce
+    from scripts.wind import Wind
+
+    def make_sim():
+        forces = {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}
+        return Simulation(Ball([225, 250], (30, 30), (10, 10), forces), 450, 500)
+
+    # the same simulated time fed as steady 60 FPS frames or as jittery 15-90 FPS
+    # frames must end in exactly the same state
+    steady, jittery = make_sim(), make_sim()
+    steady_stepper, jittery_stepper = FixedStepper(), FixedStepper()
+    for _ in range(600):
+        steady_stepper.advance(1 / 60, steady.step)
+    rng = random.Random(0)
+    while jittery_stepper.steps < steady_stepper.steps:
+        frame = min(rng.uniform(1 / 90, 1 / 15), (steady_stepper.steps - jittery_stepper.steps) * REFERENCE_DT)
+        jittery_stepper.advance(frame + 1e-9, jittery.step)
+    assert steady.ball.pos == jittery.ball.pos and steady.ball.velocities == jittery.ball.velocities
+
+    SECONDS = 600
+    sim = make_sim()
+    t0 = time.perf_counter()
+    steps = FixedStepper().run_headless(sim.step, SECONDS)
+    wall = time.perf_counter() - t0
+    print(f"{steps} steps ({SECONDS} s simulated) in {wall:.3f} s -> {SECONDS / wall:.0f}x real time")
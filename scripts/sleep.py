@@ -0,0 +1,145 @@
+import numpy as np
+
+from scripts.ccd import at_rest, at_rest_one
+
+# --- CONFIGURATION ---
+SLEEP_SPEED = 0.1     # px per reference step; slower bodies at rest start counting down
+SLEEP_TIME  = 0.5     # seconds at rest before a body is put to sleep
+SKIP_SHARE  = 0.25    # share of sleepers above which the step skips them (stepping a sleeper is
+                      # a no-op, but leaving it out costs a gather of the awake rows)
+
+
+def force_values(forces):
+    """
+    The force parameters (slider values) right now, to compare against later.
+    """
+    return [f.force.copy() if isinstance(f.force, np.ndarray) else f.force for f in forces]
+
+def forces_changed(values, forces):
+    for old, force in zip(values, forces):
+        new = force.force
+        if isinstance(new, np.ndarray) or isinstance(old, np.ndarray):
+            if not np.array_equal(old, new):
+                return True
+        elif old != new:
+            return True
+    return False
+
+
+class SleepState:
+    """
+    Sleeping bodies: bodies that stay at rest (ccd.at_rest, slower than
+    SLEEP_SPEED with nothing pushing them) for SLEEP_TIME are frozen with
+    zero velocity and left out of the step. Sleepers wake when something
+    touches their state from outside (a hand impulse, being dragged, a
+    restored snapshot: any velocity or position change), when a force
+    parameter or the arena changes, or on wake() (Bodies wakes both
+    bodies of every body-body contact).
+
+    Arrays are per body row and grow with the owner's storage via resize().
+    """
+
+    def __init__(self, capacity : int=1, speed : float=SLEEP_SPEED, delay : float=SLEEP_TIME) -> None:
+        self.speed = speed
+        self.delay = delay
+        self.still = np.zeros(capacity, dtype=np.float64)          # seconds at rest so far
+        self.asleep = np.zeros(capacity, dtype=bool)
+        self.rest_pos = np.zeros((capacity, 2), dtype=np.float64)  # where each sleeper was frozen
+        self.forces = None
+        self.arena = None
+
+    def resize(self, capacity : int, count : int) -> None:
+        for name in ("still", "asleep", "rest_pos"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:count] = old[:count]
+            setattr(self, name, new)
+
+    def wake(self, rows=slice(None)) -> None:
+        self.still[rows] = 0
+        self.asleep[rows] = False
+
+    def sleeping(self, count : int) -> int:
+        return int(np.count_nonzero(self.asleep[:count]))
+
+    def awake_rows(self, pos, vel, forces, arena):
+        """
+        Applies the wake rules and returns the rows to step: None for all of
+        them, else a sorted index array (possibly empty). With few sleepers
+        it is None too: they are at rest, so stepping them changes nothing.
+        """
+        n = len(pos)
+        asleep = self.asleep[:n]
+        if self.forces is None or arena != self.arena or forces_changed(self.forces, forces):
+            self.forces = force_values(forces)
+            self.arena = arena
+            self.wake(slice(0, n))
+            return None
+        if not asleep.any():
+            return None
+
+        disturbed = asleep & ((vel != 0).any(axis=1) | (pos != self.rest_pos[:n]).any(axis=1))
+        if disturbed.any():
+            self.wake(np.flatnonzero(disturbed))
+        if np.count_nonzero(asleep) <= SKIP_SHARE * n and n > 1:
+            return None
+        return np.flatnonzero(~asleep)
+
+    def awake_one(self, pos, vel, forces, arena) -> bool:
+        """
+        awake_rows() for a single body in row 0, pos / vel as [x, y] lists.
+        True when it is to be stepped.
+        """
+        if self.forces is None or arena != self.arena or forces_changed(self.forces, forces):
+            self.forces = force_values(forces)
+            self.arena = arena
+            self.wake(0)
+            return True
+        if not self.asleep[0]:
+            return True
+        rest = self.rest_pos[0]
+        if vel[0] != 0 or vel[1] != 0 or pos[0] != rest[0] or pos[1] != rest[1]:
+            self.wake(0)
+            return True
+        return False
+
+    def settle(self, rows, pos, vel, accel, lo, hi, dt : float) -> None:
+        """
+        After a step of the given rows: counts down bodies at rest and puts
+        the ones that stayed at rest long enough to sleep.
+        """
+        n = len(pos)
+        # most stepped bodies are moving: the speed test alone clears their count
+        if rows is None:
+            slow = (np.abs(vel) < self.speed).all(axis=1)
+            self.still[:n] *= slow
+            rows = np.flatnonzero(slow)
+        else:
+            slow = (np.abs(vel[rows]) < self.speed).all(axis=1)
+            self.still[rows] *= slow
+            rows = rows[slow]
+        if not len(rows):
+            return
+        resting = at_rest(pos[rows], vel[rows], np.broadcast_to(accel, (n, 2))[rows],
+                          np.broadcast_to(lo, (n, 2))[rows], np.broadcast_to(hi, (n, 2))[rows], self.speed)
+        still = np.where(resting, self.still[rows] + dt, 0.0)
+        self.still[rows] = still
+        fall = rows[still >= self.delay]
+        if len(fall):
+            vel[fall] = 0
+            self.asleep[fall] = True
+            self.rest_pos[fall] = pos[fall]
+
+    def settle_one(self, pos, vel, accel, lo, hi, dt : float) -> None:
+        """
+        settle() for a single body in row 0, pos / vel as [x, y] lists.
+        """
+        if abs(vel[0]) >= self.speed or abs(vel[1]) >= self.speed:
+            self.still[0] = 0
+            return
+        still = self.still[0] + dt if at_rest_one(pos, vel, accel, lo, hi, self.speed) else 0.0
+        self.still[0] = still
+        if still >= self.delay:
+            vel[0] = vel[1] = 0.0
+            self.asleep[0] = True
+            self.rest_pos[0] = pos
@@ -0,0 +1,204 @@
+import math
+import numpy as np
+
+from scripts.physicsobj import REFERENCE_DT
+from scripts.sleep import force_values
+
+# --- CONFIGURATION ---
+HISTORY_SECONDS = 30                 # simulated time kept for rewinding
+FORCE_NAMES     = ("gravity", "bounce", "wind_x", "wind_y")
+
+# --- RECORD LAYOUT ---
+# one fixed-size record per simulation step (117 bytes), float64 so a
+# restored state continues bit for bit like the original
+SNAPSHOT_DTYPE = np.dtype([
+    ("seq",        "<u8"),                            # capture number, one per step
+    ("pos",        "<f8", (2,)),
+    ("prev_pos",   "<f8", (2,)),                      # for interpolated drawing
+    ("velocities", "<f8", (2,)),
+    ("still",      "<f8"),                            # seconds at rest, towards sleeping
+    ("asleep",     "u1"),
+    ("forces",     "<f8", (len(FORCE_NAMES),)),
+    ("sliders",    "<f4", (len(FORCE_NAMES),)),       # App slider x positions
+    ("switches",   "u1",  (len(FORCE_NAMES),)),       # App invert switches
+])
+
+
+class SnapshotRing:
+    """
+    The last `capacity` simulation states in one preallocated array.
+
+    capture() writes the state after a step into the next slot, O(1) and
+    allocation-free; the oldest record is overwritten once the ring is
+    full. Records are addressed by sequence number, so seeking is a
+    modulo. restore() puts a record back into the Simulation (and the
+    App's sliders / switches); stepping on from there reproduces the
+    recorded run exactly as long as no new input (hands) arrives.
+    truncate() drops the records after a restored one, so history
+    continues from the branch point.
+    """
+
+    def __init__(self, capacity : int=round(HISTORY_SECONDS / REFERENCE_DT), dt : float=REFERENCE_DT) -> None:
+        self.records = np.zeros(capacity, dtype=SNAPSHOT_DTYPE)
+        self.capacity = capacity
+        self.dt = dt
+        self.next = 0         # sequence number of the next capture
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def oldest(self) -> int:
+        return self.next - self.count
+
+    @property
+    def newest(self) -> int:
+        return self.next - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.records.nbytes
+
+    def get(self, seq : int):
+        if not self.oldest <= seq <= self.newest:
+            raise IndexError(f"snapshot {seq} not in [{self.oldest}, {self.newest}]")
+        return self.records[seq % self.capacity]
+
+    def seconds_back(self, seconds : float) -> int:
+        """
+        Sequence number of the snapshot `seconds` of simulated time before
+        the newest, clamped to the oldest kept.
+        """
+        return max(self.oldest, self.newest - round(seconds / self.dt))
+
+    def capture(self, sim, controls=None) -> int:
+        seq = self.next
+        rec = self.records[seq % self.capacity]
+        ball = sim.ball
+        rec["seq"] = seq
+        rec["pos"] = ball.pos
+        rec["prev_pos"] = sim.prev_pos
+        rec["velocities"] = ball.velocities
+        rec["still"] = ball.sleep.still[0]
+        rec["asleep"] = ball.sleep.asleep[0]
+        rec["forces"] = [ball.forces[name].force if name in ball.forces else 0.0 for name in FORCE_NAMES]
+        if controls is not None:
+            rec["sliders"] = [controls[name]["slider"].pos[0] for name in FORCE_NAMES]
+            rec["switches"] = [controls[name]["switch"].flip for name in FORCE_NAMES]
+
+        self.next += 1
+        self.count = min(self.count + 1, self.capacity)
+        return seq
+
+    def restore(self, seq : int, sim, controls=None) -> None:
+        rec = self.get(seq)
+        ball = sim.ball
+        ball.pos[:] = rec["pos"].tolist()
+        ball.velocities[:] = rec["velocities"].tolist()
+        sim.prev_pos = rec["prev_pos"].tolist()
+        for name, force in zip(FORCE_NAMES, rec["forces"].tolist()):
+            if name in ball.forces:
+                ball.forces[name].force = force
+        ball.sleep.still[0] = rec["still"]
+        ball.sleep.asleep[0] = rec["asleep"]
+        ball.sleep.rest_pos[0] = rec["pos"]
+        ball.sleep.forces = force_values(ball.forces.values())
+        if controls is not None:
+            for name, x, flip in zip(FORCE_NAMES, rec["sliders"].tolist(), rec["switches"].tolist()):
+                controls[name]["slider"].pos[0] = x
+                controls[name]["switch"].flip = bool(flip)
+
+    def truncate(self, seq : int) -> None:
+        """
+        Forgets every snapshot after seq; the next capture becomes seq + 1.
+        """
+        self.get(seq)
+        self.count -= self.next - seq - 1
+        self.next = seq + 1
+
+    def interpolated_pos(self, cursor : float) -> list[float]:
+        """
+        Ball position at a fractional sequence number, for slow-motion playback.
+        """
+        cursor = min(max(cursor, self.oldest), self.newest)
+        a = math.floor(cursor)
+        pa = self.get(a)["pos"]
+        if a == self.newest:
+            return pa.tolist()
+        t = cursor - a
+        pb = self.get(a + 1)["pos"]
+        return [float(pa[0] + (pb[0] - pa[0]) * t), float(pa[1] + (pb[1] - pa[1]) * t)]
+
+
+if __name__ == "__main__":
+    # Determinism and cost: restore snapshots taken during a run (with hand
+    # impulses injected between steps, like the App does) and check that
+    # re-simulating from each one reproduces the recorded states exactly;
+    # then capture / restore timings and memory per history length, next
+    # to pickling the Ball for every step.
+    import pickle
+    import random
+    import time
+    from scripts.ball import Ball
+    from scripts.simulation import Simulation
+    from scripts.gravity import Gravity
+    from scripts.bounce import Bounce
+    from scripts.wind import Wind
+
+    def make_sim():
+        forces = {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}
+        return Simulation(Ball([225, 250], (30, 30), (10, 10), forces), 450, 500)
+
+    STEPS = 5000
+    rng = random.Random(0)
+    sim, ring = make_sim(), SnapshotRing()
+    kicks = set(rng.sample(range(STEPS), 40))
+    for i in range(STEPS):
+        if i in kicks:
+            # a hand hit between steps: only the snapshots see it
+            sim.ball.velocities[0] += rng.uniform(-8, 8)
+            sim.ball.velocities[1] += rng.uniform(-8, 8)
+            sim.ball.forces["gravity"].force = rng.uniform(-0.5, 0.5)
+        sim.step()
+        ring.capture(sim)
+    assert len(ring) == ring.capacity and ring.oldest == STEPS - ring.capacity
+
+    checked = 0
+    for start in rng.sample(range(ring.oldest, ring.newest - 120), 30):
+        replay = make_sim()
+        ring.restore(start, replay)
+        for seq in range(start + 1, start + 121):
+            if seq in kicks:
+                break
+            replay.step()
+            rec = ring.get(seq)
+            assert replay.ball.pos == rec["pos"].tolist() and replay.ball.velocities == rec["velocities"].tolist(), seq
+            checked += 1
+    print(f"re-simulated {checked} steps from 30 restored snapshots: bit-identical")
+
+    # branching: rewind 10 s, resume, history continues from there
+    branch = ring.seconds_back(10)
+    ring.restore(branch, sim)
+    ring.truncate(branch)
+    sim.step()
+    assert ring.capture(sim) == branch + 1 and ring.newest == branch + 1
+
+    N = 20000
+    t0 = time.perf_counter()
+    for _ in range(N):
+        ring.capture(sim)
+    capture_us = (time.perf_counter() - t0) / N * 1e6
+    t0 = time.perf_counter()
+    for i in range(N):
+        ring.restore(ring.newest - i % 1000, sim)
+    restore_us = (time.perf_counter() - t0) / N * 1e6
+    t0 = time.perf_counter()
+    for _ in range(N):
+        blob = pickle.dumps(sim.ball)
+    pickle_us = (time.perf_counter() - t0) / N * 1e6
+
+    print(f"record {SNAPSHOT_DTYPE.itemsize} B, pickled Ball {len(blob)} B")
+    print(f"capture {capture_us:.1f} us, seek + restore {restore_us:.1f} us, pickle.dumps(ball) {pickle_us:.1f} us")
+    for seconds in (30, 300, 600):
+        print(f"{seconds:>4} s at 60 Hz: {SnapshotRing(round(seconds / REFERENCE_DT)).nbytes / 1e6:.2f} MB")
@@ -0,0 +1,25 @@
+import time
+
+# taken when this module is first imported, app.py imports it before anything heavy
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimeline:
+    """
+    Seconds from PROCESS_START to the first time each startup phase completes.
+    Threads mark their own phases; only the first mark of a name counts.
+    """
+
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.phases : dict[str, float] = {}
+
+    def mark(self, name):
+        if name not in self.phases:
+            self.phases[name] = time.perf_counter() - self.origin
+
+    def report(self):
+        return ", ".join(f"{name} {sec * 1000:.0f} ms" for name, sec in sorted(self.phases.items(), key=lambda p: p[1]))
+
+
+startup = StartupTimeline()
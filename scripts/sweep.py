@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+from collections import namedtuple
+from scripts.bodies import Bodies
+from scripts.gravity import Gravity
+from scripts.bounce import Bounce
+from scripts.wind import Wind
+from scripts.physicsobj import REFERENCE_DT, DRAG, DAMPING
+
+# --- CONFIGURATION ---
+CACHE_DIR     = ".sweep_cache"
+CHUNK_SIZE    = 2048          # runs integrated together; bounds working memory
+ARENA         = (450, 500)    # the App's display surface
+CACHE_VERSION = 3             # bump when the integration rules change
+
+PARAM_DTYPE = np.dtype([
+    ("gravity", "<f8"), ("bounce", "<f8"), ("wind_x", "<f8"), ("wind_y", "<f8"),
+    ("x0", "<f8"), ("y0", "<f8"), ("vx0", "<f8"), ("vy0", "<f8"),
+])
+
+# params       : (runs,) PARAM_DTYPE, one row per combination
+# trajectories : (runs, steps // every + 1, 2) float32 positions, row 0 is the start;
+#                memory-mapped from the cache file when a cache is used
+# cached       : True when loaded from disk without integrating
+SweepResult = namedtuple("SweepResult", ["params", "trajectories", "cached"])
+
+
+def grid(gravity, bounce, wind_x, wind_y, start_pos, start_vel):
+    """
+    Every combination of the given values, in itertools.product order.
+    """
+    axes = [np.asarray(gravity, float), np.asarray(bounce, float), np.asarray(wind_x, float),
+            np.asarray(wind_y, float), np.asarray(start_pos, float).reshape(-1, 2), np.asarray(start_vel, float).reshape(-1, 2)]
+    idx = [i.ravel() for i in np.meshgrid(*(np.arange(len(a)) for a in axes), indexing="ij")]
+
+    params = np.empty(len(idx[0]), dtype=PARAM_DTYPE)
+    for name, axis, i in zip(("gravity", "bounce", "wind_x", "wind_y"), axes, idx):
+        params[name] = axis[i]
+    params["x0"], params["y0"] = axes[4][idx[4]].T
+    params["vx0"], params["vy0"] = axes[5][idx[5]].T
+    return params
+
+def cache_key(params, steps, every, dt, size, terminal_velocities, arena):
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "version" : CACHE_VERSION, "physics" : [REFERENCE_DT, DRAG, DAMPING],
+        "steps" : steps, "every" : every, "dt" : dt, "size" : list(size),
+        "terminal" : list(terminal_velocities), "arena" : list(arena),
+    }).encode())
+    h.update(params.tobytes())
+    return h.hexdigest()[:32]
+
+def integrate(params, steps, out, every=1, dt=REFERENCE_DT, size=(30, 30), terminal_velocities=(10, 10),
+              arena=ARENA, chunk_size=CHUNK_SIZE):
+    """
+    Steps every run exactly like Simulation.step (Ball.update in the arena),
+    chunk_size runs at a time, writing positions into out.
+    """
+    frames = steps // every + 1
+    for start in range(0, len(params), chunk_size):
+        p = params[start:start + chunk_size]
+        # one force value per body: Bodies applies the same rules as Ball
+        forces = {"gravity" : Gravity(p["gravity"]), "bounce" : Bounce(p["bounce"]),
+                  "wind_x" : Wind(p["wind_x"]), "wind_y" : Wind(p["wind_y"], "wind_y")}
+        # every row is a run of its own: no body-body collisions
+        bodies = Bodies(forces, capacity=len(p), collide=False)
+        bodies.add_many(np.stack([p["x0"], p["y0"]], axis=1), size, terminal_velocities,
+                        np.stack([p["vx0"], p["vy0"]], axis=1))
+
+        # fill a contiguous chunk in memory, then write it out in one go
+        chunk = np.empty((len(p), frames, 2), dtype=np.float32)
+        chunk[:, 0] = bodies.pos
+        for i in range(1, steps + 1):
+            bodies.update(dt, arena)
+            if i % every == 0:
+                chunk[:, i // every] = bodies.pos
+        out[start:start + len(p)] = chunk
+    return out
+
+def sweep(gravity=(0.1,), bounce=(0.9,), wind_x=(0.1,), wind_y=(0.1,), start_pos=((225, 250),), start_vel=((0, 0),),
+          steps=600, every=1, dt=REFERENCE_DT, size=(30, 30), terminal_velocities=(10, 10), arena=ARENA,
+          cache_dir=CACHE_DIR, chunk_size=CHUNK_SIZE) -> SweepResult:
+    """
+    Trajectories for every combination of force settings and initial
+    conditions. Results are stored in cache_dir keyed by every input, so
+    a repeated sweep is a memory-mapped load; cache_dir=None skips the cache.
+    Defaults match the App's ball.
+    """
+    params = grid(gravity, bounce, wind_x, wind_y, start_pos, start_vel)
+    shape = (len(params), steps // every + 1, 2)
+    options = dict(every=every, dt=dt, size=size, terminal_velocities=terminal_velocities, arena=arena)
+
+    if cache_dir is None:
+        out = np.empty(shape, dtype=np.float32)
+        return SweepResult(params, integrate(params, steps, out, chunk_size=chunk_size, **options), False)
+
+    path = os.path.join(cache_dir, cache_key(params, steps, **options) + ".npy")
+    if os.path.exists(path):
+        return SweepResult(params, np.load(path, mmap_mode="r"), True)
+
+    # integrate straight into a memory-mapped file, publish it only once complete
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+    integrate(params, steps, out, chunk_size=chunk_size, **options)
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return SweepResult(params, np.load(path, mmap_mode="r"), False)
+
+
+if __name__ == "__main__":
+    # Equivalence with the live Ball + Simulation loop, then a 10,000-run
+    # sweep: integration time, peak Python heap, and the cached reload.
+    import tempfile
+    import time
+    import tracemalloc
+    from scripts.ball import Ball
+    from scripts.simulation import Simulation
+
+    small = sweep(gravity=(0.1, -0.3, 0.6), bounce=(0.9, 0.5), wind_x=(0.1, -0.4), wind_y=(0.1,),
+                  start_pos=((225, 250), (40, 460)), start_vel=((0, 0), (6, -4)), steps=300, cache_dir=None)
+    for p, traj in zip(small.params, small.trajectories):
+        ball = Ball([p["x0"], p["y0"]], (30, 30), (10, 10),
+                    {"gravity" : Gravity(p["gravity"]), "bounce" : Bounce(p["bounce"]),
+                     "wind_x" : Wind(p["wind_x"]), "wind_y" : Wind(p["wind_y"], "wind_y")})
+        ball.velocities = [p["vx0"], p["vy0"]]
+        sim = Simulation(ball, *ARENA)
+        expected = [list(ball.pos)]
+        for _ in range(300):
+            sim.step()
+            expected.append(list(ball.pos))
+        assert np.allclose(traj, expected, atol=1e-3), p
+    print(f"{len(small.params)} runs match the Ball loop")
+
+    values = np.linspace(-1, 1, 10)
+    with tempfile.TemporaryDirectory() as cache:
+        t0 = time.perf_counter()
+        res = sweep(gravity=values, bounce=np.linspace(0.1, 1, 10), wind_x=values, wind_y=values * 0.5,
+                    steps=600, cache_dir=cache)
+        compute = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        again = sweep(gravity=values, bounce=np.linspace(0.1, 1, 10), wind_x=values, wind_y=values * 0.5,
+                      steps=600, cache_dir=cache)
+        load = time.perf_counter() - t0
+        assert again.cached and np.array_equal(again.trajectories[-1], res.trajectories[-1])
+
+        # peak heap on a smaller sweep of its own (two chunks, same sizes):
+        # tracemalloc slows the integration several times over
+        tracemalloc.start()
+        sweep(gravity=values[:3], bounce=np.linspace(0.1, 1, 10), wind_x=values, wind_y=values * 0.5,
+              steps=600, cache_dir=os.path.join(cache, "heap"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{len(res.params)} runs x 600 steps: {compute:.2f} s, "
+              f"{len(res.params) * 600 / compute / 1e6:.2f} M body-steps/s, "
+              f"result {res.trajectories.nbytes / 1e6:.0f} MB on disk, peak heap {peak / 1e6:.0f} MB")
+        print(f"cached reload {load * 1000:.1f} ms")
+
+        # wall contacts are exact, so ten times larger steps land on the same samples
+        t0 = time.perf_counter()
+        coarse = sweep(gravity=values, bounce=np.linspace(0.1, 1, 10), wind_x=values, wind_y=values * 0.5,
+                       steps=60, dt=REFERENCE_DT * 10, cache_dir=None)
+        coarse_time = time.perf_counter() - t0
+        err = float(np.abs(coarse.trajectories - res.trajectories[:, ::10]).max())
+        print(f"same sweep in 60 steps of 10x dt: {coarse_time:.2f} s, max deviation {err:.1e} px")
@@ -0,0 +1,66 @@
+import pygame
+
+from collections import OrderedDict
+
+# --- CONFIGURATION ---
+MAX_CACHE_BYTES = 4 * 1024 * 1024     # pixel memory held by cached surfaces
+
+
+class TextCache:
+    """
+    LRU cache of rendered (and optionally rotated) text surfaces.
+
+    Keyed by (text, font, colour, background, rotation). Least recently
+    used surfaces are evicted once their pixel memory passes max_bytes.
+    Returned surfaces are shared: blit them, never draw on them.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries : OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def surface_bytes(surf):
+        return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+    def render(self, font, text, color, rotation=0, background=None):
+        key = (text, font, tuple(color), None if background is None else tuple(background), rotation)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, True, color, background)
+        if rotation:
+            surf = pygame.transform.rotate(surf, rotation)
+
+        self.entries[key] = surf
+        self.bytes += self.surface_bytes(surf)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= self.surface_bytes(old)
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+
+_fonts : dict[int, pygame.font.Font] = {}
+
+def get_font(size):
+    """
+    Shared default-face font per size, so equal text hits the same cache entry.
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(size=size)
+    return font
+
+
+text_cache = TextCache()
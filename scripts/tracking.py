@@ -0,0 +1,214 @@
+import threading
+import time
+import numpy as np
+
+from collections import namedtuple
+from scripts.capture import Capture, Scratch
+from scripts.logger import get_logger_info
+from scripts.profiler import profiler
+from scripts.roi import INFERENCE_SIZE, next_roi, prepare, to_frame_coords
+from scripts.startup import startup
+
+# --- CONFIGURATION ---
+MAX_NUM_HANDS      = 2
+NUM_LANDMARKS      = 21
+MIN_DETECTION_CONF = 0.2
+MIN_TRACKING_CONF  = 0.2
+IDLE_WAIT          = 0.005   # seconds to back off when the source has no frame
+INFERENCE_RATE     = 30      # max inferences per second, None runs every captured frame
+BUSY_FACTOR        = 2.0     # adaptive: wait at least this many inference durations between runs
+FULL_FRAME_EVERY   = 10      # with a crop, still search the whole frame every this many inferences
+
+
+# --- TRACKING RESULT ---
+# frame_id  : index of the camera frame the landmarks were computed from
+# timestamp : time.perf_counter() taken right after the frame was captured
+# hands     : tuple of (label, landmarks_norm), landmarks_norm a (21, 2) float32 array of (x,y) in [0..1]
+TrackingResult = namedtuple("TrackingResult", ["frame_id", "timestamp", "hands"])
+
+
+# cv2 and mediapipe take seconds to import, the factories import them on the worker thread
+def open_camera(index=0):
+    import cv2
+    return Capture(cv2.VideoCapture(index))
+
+def create_hands(max_num_hands=MAX_NUM_HANDS):
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(
+        max_num_hands=max_num_hands,
+        min_detection_confidence=MIN_DETECTION_CONF,
+        min_tracking_confidence=MIN_TRACKING_CONF
+    )
+
+def parse_hands(res):
+    """
+    Flatten a Mediapipe result into (label, (21, 2) float32 array) tuples.
+    """
+    if not res.multi_hand_landmarks:
+        return ()
+
+    hands = []
+    for lm_set, handedness in zip(res.multi_hand_landmarks, res.multi_handedness):
+        label = handedness.classification[0].label.upper()
+        hands.append((label, np.array([(lm.x, lm.y) for lm in lm_set.landmark], dtype=np.float32)))
+    return tuple(hands)
+
+
+# --- TRACKING WORKER ---
+class TrackingWorker:
+    """
+    Owns the frame source and the Hands model on a background thread.
+
+    Only the newest result is kept. A result that gets replaced before
+    poll() picks it up is counted in frames_dropped and never delivered,
+    so the render loop always sees the freshest hand data and never waits.
+
+    With use_roi, inference runs on a downscaled crop around the hands
+    found in the previous frame (see scripts.roi) once all max_hands are
+    tracked. The whole frame is searched while fewer are (a hand entering
+    outside the crop would never be seen otherwise), every
+    FULL_FRAME_EVERY inferences, and as soon as the crop loses the hands.
+    It is off by default: Mediapipe's tracking mode already runs the
+    landmark model on a crop around the last hand, and on rendered hands
+    (python -m scripts.roi) feeding it moving crops of our own was slower
+    and less accurate than the whole frame.
+
+    Inference runs at most inference_rate times a second, and with
+    adaptive also backs off while a single inference gets slow (a busy
+    CPU). Frames in between are still read, so the next inference sees a
+    fresh frame, and counted in frames_skipped; the render side predicts
+    the hands across the gap.
+
+    Frames are read-only views into the source's preallocated slots (see
+    scripts.capture) and the crop, resize and colour conversion write into
+    reused scratch buffers, so steady-state tracking allocates no frame
+    buffers; allocations counts the ones made.
+
+    The camera and model are opened on the worker thread as well, so
+    start() returns at once; `loading` stays True until the first result
+    is published or the worker gives up.
+    """
+
+    def __init__(self, source_factory=open_camera, model_factory=create_hands, use_roi=False, inference_size=INFERENCE_SIZE,
+                 inference_rate=INFERENCE_RATE, adaptive=True, max_hands=MAX_NUM_HANDS):
+        self.source_factory = source_factory
+        self.model_factory = model_factory
+        self.use_roi = use_roi
+        self.max_hands = max_hands
+        self.inference_size = inference_size
+        self.roi = None
+        self.min_interval = 1 / inference_rate if inference_rate else 0.0
+        self.adaptive = adaptive
+
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+        self.loading = True
+        self.scratch = Scratch()
+        self.source = None
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._unread = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="TrackingWorker", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def poll(self):
+        """
+        Non-blocking. Returns the newest unread TrackingResult or None.
+        """
+        with self._lock:
+            if not self._unread:
+                return None
+            self._unread = False
+            return self._latest
+
+    def close(self, timeout=1.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def allocations(self):
+        # frame-sized buffers created so far by the source and the inference path
+        return self.scratch.allocations + getattr(self.source, "allocations", 0)
+
+    def _publish(self, result):
+        with self._lock:
+            if self._unread:
+                self.frames_dropped += 1
+            self._latest = result
+            self._unread = True
+            self.frames_processed += 1
+        if self.loading:
+            self.loading = False
+            startup.mark("tracker.first_result")
+
+    def _rgb(self, img):
+        import cv2
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.scratch.get("rgb", img.shape))
+
+    def _infer(self, model, frame, roi):
+        if not self.use_roi:
+            return parse_hands(model.process(self._rgb(frame)))
+        img, window = prepare(frame, roi, self.inference_size, self.scratch)
+        hands = parse_hands(model.process(self._rgb(img)))
+        return to_frame_coords(hands, window, frame.shape)
+
+    def _run(self):
+        source = model = None
+        try:
+            source = self.source = self.source_factory()
+            startup.mark("tracker.camera")
+            model = self.model_factory()
+            startup.mark("tracker.model")
+            self._loop(source, model)
+        except Exception as e:
+            get_logger_info('ERROR', f'TRACKING WORKER STOPPED: {e}', True)
+        finally:
+            self.loading = False
+            if source is not None:
+                source.release()
+            if hasattr(model, "close"):
+                model.close()
+
+    def _loop(self, source, model):
+        frame_id = 0
+        next_inference = 0.0
+        tracked = 0
+        since_full = 0
+        while not self._stop.is_set():
+            with profiler.span("cap.read"):
+                ret, frame = source.read()
+            if not ret:
+                self._stop.wait(IDLE_WAIT)
+                continue
+            timestamp = time.perf_counter()
+            if timestamp < next_inference:
+                self.frames_skipped += 1
+                frame_id += 1
+                continue
+
+            roi = self.roi
+            if tracked < self.max_hands or since_full >= FULL_FRAME_EVERY:
+                roi = None
+            with profiler.span("hands.process"):
+                hands = self._infer(model, frame, roi)
+                if not hands and roi is not None:
+                    # lost inside the crop, search the whole frame this tick
+                    roi = None
+                    hands = self._infer(model, frame, None)
+            tracked = len(hands)
+            since_full = since_full + 1 if roi is not None else 0
+            cost = time.perf_counter() - timestamp
+            next_inference = timestamp + max(self.min_interval, cost * BUSY_FACTOR if self.adaptive else 0.0)
+            if self.use_roi:
+                self.roi = next_roi(self.roi, hands)
+
+            self._publish(TrackingResult(frame_id, timestamp, hands))
+            frame_id += 1
+
@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+
+from scripts.ball import Ball
+from scripts.bodies import Bodies
+from scripts.bounce import Bounce
+from scripts.gravity import Gravity
+from scripts.physicsobj import REFERENCE_DT
+from scripts.sleep import SleepState
+from scripts.wind import Wind
+
+W, H = 450, 500
+
+
+def make_forces():
+    return {"gravity" : Gravity(0.1), "bounce" : Bounce(0.9), "wind_x" : Wind(0.1), "wind_y" : Wind(0.1, "wind_y")}
+
+def settle(n, sleeping, seconds=20, seed=0):
+    rng = np.random.default_rng(seed)
+    bodies = Bodies({"gravity" : Gravity(0.3), "bounce" : Bounce(0.5)}, capacity=n)
+    if not sleeping:
+        bodies.sleep = SleepState(n, delay=math.inf)
+    bodies.add_many(rng.uniform([20, 20], [W - 20, H - 20], size=(n, 2)), (30, 30), (10, 10), rng.uniform(-5, 5, (n, 2)))
+    for _ in range(round(seconds / REFERENCE_DT)):
+        bodies.update(arena=(W, H))
+    return bodies
+
+
+def test_bodies_match_a_loop_of_balls():
+    starts = np.random.default_rng(0).uniform([20, 20], [W - 20, H - 20], size=(50, 2))
+    balls = [Ball(list(p), (30, 30), (10, 10), make_forces()) for p in starts]
+    bodies = Bodies(make_forces(), capacity=len(starts))
+    for p in starts:
+        bodies.add(p, (30, 30), (10, 10))
+    for _ in range(50):
+        for ball in balls:
+            ball.update(arena=(W, H))
+        bodies.update(arena=(W, H))
+    assert np.allclose(bodies.pos, [b.pos for b in balls])
+
+def test_sleeping_does_not_change_the_result():
+    settled = settle(200, sleeping=True)
+    assert settled.sleeping_count
+    assert np.array_equal(settled.pos, settle(200, sleeping=False).pos)
+
+def test_hand_impulse_wakes_one_body_and_a_force_change_wakes_all():
+    settled = settle(100, sleeping=True)
+    # a hand hits body 0
+    settled.velocities[0] = (4.0, -6.0)
+    settled.update(arena=(W, H))
+    assert settled.awake_count == 1 and not settled.sleep.asleep[0]
+    # a slider changes gravity
+    settled.forces["gravity"].force = 0.4
+    settled.update(arena=(W, H))
+    assert settled.sleeping_count == 0
+
+def test_colliding_bodies_bounce_apart():
+    pair = Bodies({}, capacity=2, collide=True)
+    pair.add_many([(100, 250), (160, 250)], (30, 30), (10, 10), [(5, 0), (-5, 0)])
+    for _ in range(30):
+        pair.update(arena=(W, H))
+    assert pair.pos[0, 0] + 30 <= pair.pos[1, 0] and pair.velocities[0, 0] < 0 < pair.velocities[1, 0]
+
+def test_body_dropped_onto_a_sleeper_wakes_it():
+    drop = Bodies({"gravity" : Gravity(0.3)}, capacity=2, collide=True)
+    drop.add((W / 2, H - 16), (30, 30), (10, 10))
+    for _ in range(60):
+        drop.update(arena=(W, H))
+    assert drop.sleeping_count == 1
+
+    drop.add((W / 2, H - 120), (30, 30), (10, 10))
+    while not len(drop.body_contacts[0]):
+        assert drop.sleep.asleep[0]
+        drop.update(arena=(W, H))
+    assert drop.sleeping_count == 0
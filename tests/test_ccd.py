@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from scripts.bodies import Bodies
+from scripts.bounce import Bounce
+from scripts.ccd import advance, advance_one, arena_bounds, SCALAR_ROWS
+from scripts.gravity import Gravity
+from scripts.physicsobj import REFERENCE_DT
+from scripts.wind import Wind
+
+W, H = 450, 500
+
+
+def random_runs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "gravity" : rng.uniform(-0.6, 0.6, n),
+        "bounce" : rng.uniform(0.3, 1.0, n),
+        "wind" : rng.uniform(-0.4, 0.4, (n, 2)),
+        "starts" : rng.uniform((20, 20), (W - 20, H - 20), (n, 2)),
+        "speeds" : rng.uniform(-10, 10, (n, 2)),
+    }
+
+def make_forces(runs):
+    return {"gravity" : Gravity(runs["gravity"]), "bounce" : Bounce(runs["bounce"]),
+            "wind_x" : Wind(runs["wind"][:, 0]), "wind_y" : Wind(runs["wind"][:, 1], "wind_y")}
+
+def trajectory(runs, multiple, seconds=5, every=30):
+    bodies = Bodies(make_forces(runs), capacity=len(runs["starts"]))
+    bodies.add_many(runs["starts"], (30, 30), (10, 10), runs["speeds"])
+    samples = []
+    for i in range(round(seconds / REFERENCE_DT) // multiple):
+        bodies.update(REFERENCE_DT * multiple, (W, H))
+        if (i + 1) * multiple % every == 0:
+            samples.append(bodies.pos.copy())
+    return np.array(samples)
+
+
+@pytest.mark.parametrize("multiple", (10, 30))
+def test_result_does_not_depend_on_the_step_size(multiple):
+    runs = random_runs(100)
+    reference = trajectory(runs, 1)
+    assert np.abs(trajectory(runs, multiple) - reference).max() < 1e-6
+
+def test_several_bounces_inside_one_step():
+    # a fast body in a corridor 4 px wider than itself
+    pos, vel = np.array([[17.0, 100.0]]), np.array([[10.0, 0.0]])
+    hits = advance(pos, vel, np.zeros((1, 2)), np.array([10.0, 10.0]), np.array([15.0, 15.0]), np.array([19.0, 200.0]),
+                   REFERENCE_DT * 10, (Bounce(1.0),), drag=(0.0, 0.0))
+    assert len(hits) > 10 and np.all(np.diff(hits["time"]) > 0)
+    assert 15 <= pos[0, 0] <= 19
+
+def test_scalar_path_matches_the_array_path():
+    n = SCALAR_ROWS * 8
+    runs = random_runs(n, seed=1)
+    lo, hi = arena_bounds((30, 30), W, H)
+    accel = np.stack([runs["wind"][:, 0], runs["gravity"] + runs["wind"][:, 1]], axis=1)
+    pos, vel = runs["starts"].copy(), runs["speeds"].copy()
+    scalar = [(p.tolist(), v.tolist()) for p, v in zip(pos, vel)]
+
+    for _ in range(20):
+        hits = advance(pos, vel, accel, 10.0, lo, hi, REFERENCE_DT * 10, (Bounce(runs["bounce"]),))
+        count = 0
+        for i, (p, v) in enumerate(scalar):
+            count += len(advance_one(p, v, accel[i].tolist(), (10.0, 10.0), lo.tolist(), hi.tolist(),
+                                     REFERENCE_DT * 10, (Bounce(float(runs["bounce"][i])),)))
+        assert count == len(hits)
+    # bit for bit, not just close
+    assert np.array_equal(pos, [p for p, _ in scalar]) and np.array_equal(vel, [v for _, v in scalar])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from scripts.hand_filter import HandFilter, MAX_PREDICT_TIME, MEASUREMENT_NOISE
+
+RENDER_HZ = 60
+
+
+def tracking_errors(infer_hz, seconds=20):
+    """
+    A hand moving on a smooth path, measured with jitter at infer_hz and
+    rendered at 60 Hz. Returns the mean error of holding the last
+    measurement and of the filter's prediction.
+    """
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, 0.04, size=(21, 2))
+
+    def truth(t):
+        return base + np.array([0.5 + 0.3 * np.sin(t * 1.7), 0.5 + 0.2 * np.cos(t * 2.3)])
+
+    hold_err, filt_err = [], []
+    f = HandFilter()
+    last = last_t = None
+    every = RENDER_HZ // infer_hz
+    for i in range(seconds * RENDER_HZ):
+        t = i / RENDER_HZ
+        if i % every == 0:
+            last = truth(t) + rng.normal(0, MEASUREMENT_NOISE ** 0.5, (21, 2))
+            last_t = t
+            f.correct(last, t)
+        target = truth(t)
+        hold_err.append(np.abs(last - target).mean())
+        filt_err.append(np.abs(f.predict(t - last_t) - target).mean())
+    return np.mean(hold_err), np.mean(filt_err)
+
+
+@pytest.mark.parametrize("infer_hz", (60, 30, 20))
+def test_filter_beats_holding_the_last_measurement(infer_hz):
+    hold, filtered = tracking_errors(infer_hz)
+    assert filtered < hold
+
+def test_filter_gain_grows_as_inference_slows():
+    gains = [np.divide(*tracking_errors(hz)) for hz in (60, 30, 20)]
+    assert gains == sorted(gains) and gains[-1] > 2
+
+def test_first_measurement_is_taken_as_is_and_prediction_is_capped():
+    f = HandFilter()
+    assert not f.active
+    z = np.full((21, 2), 0.5, dtype=np.float32)
+    assert np.array_equal(f.correct(z, 1.0), z)
+    f.correct(z + 0.01, 1.1)                    # moving right and down
+    far = f.predict(10.0)
+    assert np.array_equal(far, f.predict(MAX_PREDICT_TIME))
+    assert np.array_equal(f.predict(-1.0), f.pos)
+    f.reset()
+    assert not f.active
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import numpy as np
+
+from scripts.ar import AR
+from scripts.hand_filter import LOST_TIMEOUT
+from scripts.hand_tracks import HandTracks, match, MIDDLE_MCP_IDX, WRIST_IDX, TRACK_GATE
+from scripts.recording import HANDEDNESS, LandmarkRecorder, ReplaySource
+from scripts.tracking import TrackingResult
+
+LEFT, RIGHT = HANDEDNESS
+
+
+def open_hand(scale=0.08):
+    hand = np.zeros((21, 2), dtype=np.float32)
+    hand[MIDDLE_MCP_IDX] = (0, -scale)
+    return hand
+
+
+def test_match_equals_greedy_matching_on_sorted_costs():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        cost = rng.uniform(0, 2, rng.integers(1, 8, 2))
+        rows, cols = match(cost.copy())
+
+        greedy, used_r, used_c = set(), set(), set()
+        for flat in np.argsort(cost, axis=None, kind="stable"):
+            r, c = np.unravel_index(flat, cost.shape)
+            if cost[r, c] <= TRACK_GATE and r not in used_r and c not in used_c:
+                greedy.add((int(r), int(c)))
+                used_r.add(r)
+                used_c.add(c)
+        assert set(zip(rows.tolist(), cols.tolist())) == greedy
+
+def test_ids_follow_approaching_hands_and_are_never_reused():
+    tracks = HandTracks(2)
+    hand = open_hand()
+    for f in range(10):
+        x = f * 0.02
+        slots = tracks.assign(((LEFT, hand + (0.3 + x, 0.5)), (RIGHT, hand + (0.7 - x, 0.5))), f / 30)
+        assert slots.tolist() == [0, 1]
+    assert tracks.next_id == 2 and len(tracks) == 2
+
+    # both hands gone for longer than the timeout: their slots are reused, their IDs never
+    later = 10 / 30 + LOST_TIMEOUT + 0.1
+    slots = tracks.assign(((LEFT, hand + (0.5, 0.5)),), later)
+    assert sorted(tracks.closed.tolist()) == [0, 1] and tracks.opened.tolist() == slots.tolist()
+    assert tracks.ids[slots[0]] == 2 and len(tracks) == 1
+
+def test_fast_swipe_keeps_its_track_when_slots_are_full():
+    # one of two hands (scale 0.08) jumps 0.15 per 33 ms frame, past the gate
+    hand = open_hand()
+    tracks = HandTracks(2)
+    for f in range(6):
+        x = 0.2 + (0.15 * (f - 1) if f >= 2 else 0)
+        slots = tracks.assign(((RIGHT, hand + (0.8, 0.5)), (LEFT, hand + (x, 0.5))), f * 0.033)
+        assert slots.tolist() == [0, 1] and tracks.ids.tolist() == [0, 1], f
+    assert tracks.next_id == 2
+
+def test_class_session_has_no_identity_errors():
+    # 8 hands drifting around their spots, leaving and coming back, in
+    # shuffled detection order and sometimes mislabelled, through AR.ingest
+    n, frames, scale = 8, 900, 0.04
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, scale * 0.6, size=(21, 2))
+    base -= base[WRIST_IDX]
+    base[MIDDLE_MCP_IDX] = (0, -scale)
+    side = int(np.ceil(np.sqrt(n)))
+    home = np.array([((i % side + 0.5) / side, (i // side + 0.5) / side) for i in range(n)])
+    phase = rng.uniform(0, 2 * np.pi, (n, 2))
+    labels = rng.choice(2, n, p=(0.2, 0.8))
+    away = np.zeros(n, dtype=np.int64)
+
+    path = os.path.join(tempfile.mkdtemp(), "class.phyl")
+    LandmarkRecorder(path, n).close()
+    ar = AR(ReplaySource(path), max_hands=n)
+    owner, last, errors = {}, {}, 0
+    for f in range(frames):
+        t = f / 30
+        leave = (away == 0) & (rng.random(n) < 0.004)
+        away[leave] = rng.integers(3, 90, leave.sum())
+        visible = np.flatnonzero(away == 0)
+        away[away > 0] -= 1
+        center = home + 0.35 / side * np.sin(t + phase)
+        order = rng.permutation(visible)
+        hands = tuple((HANDEDNESS[labels[i] if rng.random() > 0.05 else 1 - labels[i]],
+                       (base + center[i] + rng.normal(0, 0.002, (21, 2))).astype(np.float32)) for i in order)
+        ar.ingest(TrackingResult(f, t, hands))
+        for i, track in zip(order.tolist(), ar.tracks.ids[ar.slots].tolist()):
+            errors += owner.setdefault(track, i) != i                       # one ID on two hands
+            errors += i in last and last[i][0] != track and t - last[i][1] <= LOST_TIMEOUT
+            last[i] = (track, t)
+    ar.close()
+    assert errors == 0
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+import pytest
+
+from scripts.recording import LandmarkRecorder, ReplaySource, load_recording
+from scripts.tracking import TrackingResult
+
+
+@pytest.fixture
+def session(tmp_path):
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / "session.phyl")
+    sample = [TrackingResult(i, i / 30, (("LEFT", rng.random((21, 2)).astype(np.float32)),
+                                         ("RIGHT", rng.random((21, 2)).astype(np.float32))))
+              for i in range(3)]
+    rec = LandmarkRecorder(path)
+    for r in sample:
+        rec.write(r, (True, False))
+    rec.close()
+    return path, sample
+
+
+def test_round_trip(session):
+    path, sample = session
+    replay = ReplaySource(path, realtime=False).start()
+    for r in sample:
+        got = replay.poll()
+        assert got.frame_id == r.frame_id and [label for label, _ in got.hands] == ["LEFT", "RIGHT"]
+        assert all(np.array_equal(a, b) for (_, a), (_, b) in zip(got.hands, r.hands))
+    assert replay.poll() is None
+    assert load_recording(path)["pinched"][0].tolist() == [1, 0]
+
+def test_realtime_frames_are_stamped_on_this_process_clock(session):
+    replay = ReplaySource(session[0]).start()
+    got = replay.poll()
+    # never ahead of the clock the live worker stamps frames with
+    assert got.frame_id == 0 and replay.started <= got.timestamp <= time.perf_counter()
+
+def test_fast_replay_stamps_frames_when_polled(session):
+    # a consumer slower than the recording never sees frames age
+    replay = ReplaySource(session[0], realtime=False).start()
+    for _ in range(3):
+        time.sleep(0.05)
+        before = time.perf_counter()
+        got = replay.poll()
+        assert before <= got.timestamp <= time.perf_counter()
+
+def test_loop_restarts_from_the_first_frame(session):
+    replay = ReplaySource(session[0], realtime=False, loop=True).start()
+    ids = [replay.poll().frame_id for _ in range(7)]
+    assert ids == [0, 1, 2, 0, 1, 2, 0] and not replay.finished
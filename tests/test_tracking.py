@@ -0,0 +1,124 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from scripts.tracking import TrackingWorker, INFERENCE_RATE, FULL_FRAME_EVERY
+
+
+# --- FAKES ---
+# stand-ins for the webcam and Mediapipe, so the worker runs without either
+class FakeSource:
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.released = False
+
+    def read(self):
+        time.sleep(self.delay)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+def fake_result(hands):
+    lm_sets = [SimpleNamespace(landmark=[SimpleNamespace(x=x0 + i / 210, y=0.5) for i in range(21)]) for _, x0 in hands]
+    handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label)]) for label, _ in hands]
+    return SimpleNamespace(multi_hand_landmarks=lm_sets, multi_handedness=handedness)
+
+class FakeModel:
+    def process(self, rgb):
+        return fake_result([("Left", 0.1)])
+
+class TwoHandModel:
+    """
+    A second hand appears after `enter` inferences, outside any crop around
+    the first: only a full-frame search (or a crop spanning both) sees it.
+    """
+
+    def __init__(self, enter=5):
+        self.enter = enter
+        self.calls = self.crops = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        self.crops += rgb.shape[:2] != (48, 64)
+        if self.calls > self.enter and rgb.shape[1] == 64:
+            return fake_result([("Left", 0.1), ("Right", 0.8)])
+        return fake_result([("Left", 0.1)])
+
+
+def collect(worker, seconds, interval):
+    results = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        res = worker.poll()
+        if res is not None:
+            results.append(res)
+        time.sleep(interval)
+    worker.close()
+    return results
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+# --- TESTS ---
+def test_results_arrive_in_order_with_timestamps():
+    source = FakeSource()
+    worker = TrackingWorker(lambda: source, FakeModel).start()
+    received = collect(worker, 0.5, 1 / 60)
+
+    assert received, "worker never published a result"
+    assert all(a.frame_id < b.frame_id and a.timestamp < b.timestamp for a, b in zip(received, received[1:]))
+    assert received[-1].hands[0][0] == "LEFT" and received[-1].hands[0][1].shape == (21, 2)
+    assert worker.frames_processed == len(received) + worker.frames_dropped + (1 if worker._unread else 0)
+
+def test_close_stops_the_thread_and_releases_the_source():
+    source = FakeSource()
+    worker = TrackingWorker(lambda: source, FakeModel).start()
+    wait_for(lambda: worker.frames_processed)
+    worker.close()
+    assert not worker._thread.is_alive() and source.released
+
+def test_newest_result_wins():
+    worker = TrackingWorker(FakeSource, FakeModel, inference_rate=None).start()
+    wait_for(lambda: worker.frames_processed >= 5)
+    worker.close()
+
+    processed = worker.frames_processed
+    newest = worker.poll()
+    # every result but the last was replaced before anyone read it
+    assert newest is not None and newest is worker._latest
+    assert worker.frames_dropped == processed - 1
+    assert worker.poll() is None
+
+def test_poll_returns_none_without_a_new_result():
+    worker = TrackingWorker(lambda: FakeSource(delay=0.2), FakeModel).start()
+    wait_for(lambda: worker.frames_processed)
+    first = worker.poll()
+    assert first is not None
+    assert worker.poll() is None
+    worker.close()
+
+def test_inference_is_rate_limited_and_reuses_buffers():
+    # the source runs at ~500 Hz, inference is capped at INFERENCE_RATE
+    worker = TrackingWorker(FakeSource, FakeModel).start()
+    collect(worker, 0.5, 1 / 60)
+    assert worker.frames_skipped and worker.frames_processed <= 0.5 * INFERENCE_RATE + 1
+    # the RGB buffer is sized once, by the first frame
+    assert worker.allocations == 1, worker.allocations
+
+def test_roi_finds_a_hand_entering_outside_the_crop():
+    model = TwoHandModel()
+    worker = TrackingWorker(FakeSource, lambda: model, use_roi=True, inference_rate=None, max_hands=2).start()
+    results = collect(worker, 0.3, 1 / 240)
+
+    counts = [len(r.hands) for r in results]
+    first = counts.index(2)
+    assert results[first].frame_id <= results[0].frame_id + model.enter + 2, "new hand found late"
+    assert set(counts[first:]) == {2}, counts
+    # the crop (now spanning both hands) runs, with a full search every FULL_FRAME_EVERY
+    assert model.crops and model.calls - model.crops >= model.calls // (FULL_FRAME_EVERY + 1), (model.calls, model.crops)